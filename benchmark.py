@@ -0,0 +1,417 @@
+# benchmark.py
+# Benchmarks de desempenho do solucionador em catálogos sintéticos.
+# Uso: python benchmark.py [--seed N] {grafo,memoria,paralelo,reinicios,backjumping,melhoria,exato,cache,carregamento,escala} [opções]
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+import gerador
+import main
+
+
+#Catálogo sintético de n_aulas aulas, pelo gerador de gerador.py, para os benchmarks que medem o custo
+#por aula. tamanho_grupo é o número de aulas por professor e, em média, por turma, de modo que aumentar
+#n_aulas aumenta o número de cursos, e não o tamanho de cada grupo. O número de cursos sai da média de
+#aulas por turma, com folga, e o catálogo é cortado nas primeiras n_aulas aulas.
+def gerar_catalogo_sintetico(n_aulas, tamanho_grupo=8, seed=0):
+    periodos = 10
+    disciplinas = max(1, round(tamanho_grupo / (1 + gerador.FRACAO_DUAS_AULAS)))
+    cursos = math.ceil(1.1 * n_aulas / (disciplinas * (1 + gerador.FRACAO_DUAS_AULAS) * periodos))
+    while True:
+        df = gerador.gerar_catalogo(cursos=cursos, periodos=periodos, disciplinas=disciplinas,
+                                    carga_professor=tamanho_grupo, fracao_lab=0.3, fracao_optativas=1 / 3,
+                                    seed=seed)
+        if len(df) >= n_aulas: return df.head(n_aulas).reset_index(drop=True)
+        cursos += 1
+
+
+#Instância mais apertada derivada do dataset real: uma fração dos professores de cada turno
+#tem suas aulas repassadas a outro professor do mesmo turno, aumentando os conflitos de professor.
+#A fusão só acontece se o professor resultante não passar do número de aulas que cabem em uma
+#semana do turno (um slot por vez), para não gerar instâncias trivialmente inviáveis.
+def apertar_instancia(df, fracao, seed=0):
+    rng = random.Random(seed)
+    df = df.copy()
+    for turno in main.TURNOS:
+        slots_turno = [s for s in main.SLOTS if s.turno == turno]
+        capacidade = 0
+        for d in range(len(main.DIAS)):
+            ocupado = 0
+            for s in sorted((s for s in slots_turno if s.dia == d), key=lambda s: s.mascara):
+                if not ocupado & s.mascara:
+                    ocupado |= s.mascara
+                    capacidade += 1
+        profs = sorted(p for p, c in df.groupby('Professor')['Curso'].first().items() if (turno == 'SIN') == ('SIN' in c))
+        for p in rng.sample(profs, int(len(profs) * fracao)):
+            carga = df['Professor'].value_counts()
+            destinos = [q for q in profs if q != p and q in carga and carga[q] + carga.get(p, 0) <= capacidade]
+            if destinos and p in carga:
+                df.loc[df['Professor'] == p, 'Professor'] = rng.choice(destinos)
+    return df
+
+
+def benchmark_grafo(tamanhos, tamanho_grupo):
+    print(f"{'aulas':>8} {'arestas':>9} {'tempo (s)':>10} {'us/aula':>9}")
+    for n in tamanhos:
+        df = main.processar_trilhas_optativas(gerar_catalogo_sintetico(n, tamanho_grupo))
+        inicio = time.perf_counter()
+        G = main.construir_grafo_conflitos(df)
+        tempo = time.perf_counter() - inicio
+        print(f"{n:>8} {G.number_of_edges():>9} {tempo:>10.3f} {tempo / n * 1e6:>9.1f}")
+
+
+#Mede o pico de memória (RSS) de cada estrutura usada pelo solucionador em um processo
+#separado, já que ru_maxrss só cresce ao longo da vida do processo.
+def benchmark_memoria(n_aulas, modo=None):
+    if modo is None:
+        print(f"{'estrutura':>12} {'RSS grafo (MB)':>15} {'RSS pico (MB)':>14} {'tempo (s)':>10}")
+        for m in ('complemento', 'indice'):
+            saida = subprocess.run([sys.executable, __file__, 'memoria', '--aulas', str(n_aulas), '--modo', m],
+                                   capture_output=True, text=True, check=True).stdout
+            print(saida.strip().splitlines()[-1])
+        return
+
+    import networkx as nx
+    df = main.processar_trilhas_optativas(gerar_catalogo_sintetico(n_aulas))
+    G = main.construir_grafo_conflitos(df)
+    rss_grafo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    inicio = time.perf_counter()
+    estrutura = nx.complement(G) if modo == 'complemento' else main.IndiceConflitos(G)
+    tempo = time.perf_counter() - inicio
+    rss_pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{modo:>12} {rss_grafo:>15.1f} {rss_pico:>14.1f} {tempo:>10.3f}")
+
+
+#Soluções por segundo do multistart com diferentes números de processos, no dataset real (sem a poda
+#pelo melhor score, que descartaria as soluções que não o superam).
+def benchmark_paralelo(lista_workers, tempo, seed=0):
+    df = main.carregar_dados()
+    prefs = main.gerar_preferencias_ficticias(df)
+    instancia = main.construir_instancia(df, prefs)
+    print(f"{'workers':>8} {'tentativas/s':>13} {'soluções/s':>11} {'speedup':>8}")
+    base = None
+    for w in lista_workers:
+        solucoes = [0]
+        def contar(score, grade):
+            solucoes[0] += 1
+        tentativas = main.otimizar(instancia, tempo, contar, workers=w, seed=seed, podar=False)['tentativas']
+        taxa = solucoes[0] / tempo
+        base = base or taxa
+        print(f"{w:>8} {tentativas / tempo:>13.1f} {taxa:>11.1f} {taxa / base:>8.2f}")
+
+
+#Custo de preparação por reinício (reset do solucionador) e reinícios por segundo em modo serial, com
+#cada reinício indo até uma grade completa ou um beco sem saída (sem a poda pelo melhor score).
+def benchmark_reinicios(tamanhos, tempo, seed=0):
+    casos = [('dataset', main.carregar_dados())]
+    casos += [(f"sintetico_{n}", main.processar_trilhas_optativas(gerar_catalogo_sintetico(n))) for n in tamanhos]
+    print(f"{'instância':>16} {'reset (ms)':>11} {'reinícios/s':>12}")
+    for nome, df in casos:
+        instancia = main.construir_instancia(df, main.gerar_preferencias_ficticias(df))
+        solver = main.SolucionadorTimetabling(instancia)
+        inicio = time.perf_counter()
+        n = 0
+        while time.perf_counter() - inicio < 1:
+            solver.reset()
+            n += 1
+        reset = (time.perf_counter() - inicio) / n
+        tentativas = main.otimizar(instancia, tempo, lambda score, grade: None, seed=seed, podar=False)['tentativas']
+        print(f"{nome:>16} {reset * 1e3:>11.3f} {tentativas / tempo:>12.1f}")
+
+
+#Taxa de sucesso por segundo de CPU de cada modo de busca no dataset real e em versões apertadas. A
+#poda pelo melhor score fica desligada, então cada falha é um beco sem saída da construção.
+def benchmark_backjumping(fracoes, tempo, seed=0):
+    base = pd.read_csv(main.ARQUIVO_DADOS)
+    print(f"{'instância':>14} {'modo':>12} {'tentativas':>11} {'sucessos':>9} {'taxa':>6} {'sucessos/CPU-s':>15} {'melhor':>7}")
+    for fracao in fracoes:
+        df = main.processar_trilhas_optativas(apertar_instancia(base, fracao) if fracao else base.copy())
+        prefs = main.gerar_preferencias_ficticias(df)
+        instancia = main.construir_instancia(df, prefs)
+        main.ordenar_slots_por_popularidade(instancia)
+        nome = f"+{fracao:.0%} turmas" if fracao else "dataset"
+        for modo in ('gulosa', 'backjumping'):
+            scores = []
+            cpu = time.process_time()
+            est = main.otimizar(instancia, tempo, lambda score, grade: scores.append(score), modo=modo, seed=seed,
+                                podar=False)
+            cpu = time.process_time() - cpu
+            taxa = len(scores) / max(est['tentativas'], 1)
+            melhor = max(scores) if scores else '-'
+            print(f"{nome:>14} {modo:>12} {est['tentativas']:>11} {len(scores):>9} {taxa:>6.1%} "
+                  f"{len(scores) / cpu:>15.2f} {melhor:>7}")
+
+
+#Curva melhor score x tempo de parede, só com reinícios e com a busca local após cada grade completa.
+#A repetição r usa a semente seed + r, então os dois modos são comparados nas mesmas sementes.
+def benchmark_melhoria(marcos, repeticoes, seed=0):
+    df = main.carregar_dados()
+    prefs = main.gerar_preferencias_ficticias(df)
+    instancia = main.construir_instancia(df, prefs)
+    main.ordenar_slots_por_popularidade(instancia)
+    print(f"limite do score: {instancia.potencial_total}")
+    print(f"{'modo':>12} {'semente':>8} " + " ".join(f"{f'{t:g}s':>6}" for t in marcos))
+    for nome, melhoria in (('reinicios', False), ('recozimento', True)):
+        for s in range(seed, seed + repeticoes):
+            pontos = []
+            inicio = time.time()
+            main.otimizar(instancia, max(marcos), lambda score, grade: pontos.append((time.time() - inicio, score)),
+                          melhoria=melhoria, seed=s)
+            curva = [max((score for t, score in pontos if t <= marco), default=None) for marco in marcos]
+            print(f"{nome:>12} {s:>8} " + " ".join(f"{'-' if c is None else c:>6}" for c in curva))
+
+
+#Heurística (reinícios + busca local) vs motores exatos por tamanho de instância: score, limitante
+#provado, gap e tempo até a primeira solução viável. Os motores partem da melhor grade da heurística.
+def benchmark_exato(tamanhos, tempo_heuristica, tempo_exato, motores, seed=0):
+    import exato
+    casos = [('dataset', main.carregar_dados())]
+    casos += [(f"sintetico_{n}", main.processar_trilhas_optativas(gerar_catalogo_sintetico(n))) for n in tamanhos]
+    motores = [m for m in motores if exato.motor_disponivel(m)]
+    print(f"{'instância':>16} {'motor':>10} {'partida':>8} {'score':>7} {'limitante':>10} {'gap':>7} {'1ª viável (s)':>14} {'tempo (s)':>10}")
+    for nome, df in casos:
+        prefs = main.gerar_preferencias_ficticias(df)
+        instancia = main.construir_instancia(df, prefs)
+        main.ordenar_slots_por_popularidade(instancia)
+        melhor = [None, None]
+        primeira = []
+        inicio = time.time()
+        def guardar(score, grade):
+            if not primeira: primeira.append(time.time() - inicio)
+            if grade is not None and (melhor[0] is None or score > melhor[0]): melhor[:] = [score, dict(grade)]
+        main.otimizar(instancia, tempo_heuristica, guardar, melhoria=True, componentes=main.decompor_componentes(instancia),
+                      seed=seed)
+        print(f"{nome:>16} {'heuristica':>10} {'-':>8} {str(melhor[0]):>7} {'-':>10} {'-':>7} "
+              f"{(f'{primeira[0]:.1f}' if primeira else '-'):>14} {tempo_heuristica:>10.1f}")
+        for motor in motores:
+            for partida, grade in (('vazia', None), ('heur.', melhor[1])):
+                if partida == 'heur.' and grade is None: continue
+                r = exato.resolver_exato(instancia, motor, tempo_exato, grade_inicial=grade, seed=seed)
+                gap = '-' if r.gap is None else f"{r.gap:.1%}"
+                t1 = '-' if r.tempo_primeira is None else f"{r.tempo_primeira:.1f}"
+                print(f"{nome:>16} {motor:>10} {partida:>8} {str(r.score):>7} {str(r.limite):>10} {gap:>7} "
+                      f"{t1:>14} {r.tempo:>10.1f}")
+
+
+#Tempo de preparação até a instância pronta para a busca (catálogo, trilhas, grafo de conflitos e
+#tabelas da instância): sem cache, com o cache vazio (processa e grava) e com o cache já gravado.
+def benchmark_cache(tamanhos):
+    with tempfile.TemporaryDirectory() as pasta:
+        casos = [('dataset', main.ARQUIVO_DADOS)]
+        for n in tamanhos:
+            caminho = os.path.join(pasta, f"sintetico_{n}.csv")
+            gerar_catalogo_sintetico(n).to_csv(caminho, index=False)
+            casos.append((f"sintetico_{n}", caminho))
+        print(f"{'instância':>16} {'sem cache (s)':>14} {'frio (s)':>9} {'quente (s)':>11} {'arquivo (KB)':>13}")
+        for nome, caminho in casos:
+            tempos = []
+            pasta_cache = os.path.join(pasta, f"cache_{nome}")
+            for usar_cache in (False, True, True):
+                inicio = time.perf_counter()
+                df, indice = main.carregar_catalogo(caminho, usar_cache, pasta_cache)
+                main.construir_instancia(df, main.gerar_preferencias_ficticias(df), indice)
+                tempos.append(time.perf_counter() - inicio)
+            tamanho = sum(os.path.getsize(os.path.join(pasta_cache, f)) for f in os.listdir(pasta_cache)) / 1024
+            print(f"{nome:>16} {tempos[0]:>14.3f} {tempos[1]:>9.3f} {tempos[2]:>11.3f} {tamanho:>13.1f}")
+
+
+#Tempo de carregamento por etapa em catálogos grandes: leitura do CSV com as trilhas, grafo de
+#conflitos e tabelas da instância, e a memória do DataFrame com os tipos de catalogo.TIPOS_COLUNAS
+#comparada à leitura sem tipos.
+def benchmark_carregamento(tamanhos):
+    with tempfile.TemporaryDirectory() as pasta:
+        print(f"{'aulas':>8} {'leitura (s)':>12} {'grafo (s)':>10} {'instância (s)':>14} "
+              f"{'memória (MB)':>13} {'sem tipos (MB)':>15}")
+        for n in tamanhos:
+            caminho = os.path.join(pasta, f"sintetico_{n}.csv")
+            gerar_catalogo_sintetico(n).to_csv(caminho, index=False)
+            inicio = time.perf_counter()
+            df = main.carregar_dados(caminho)
+            t_leitura = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            _, indice = main.construir_grafos_multicamadas(df)
+            t_grafo = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            main.construir_instancia(df, main.gerar_preferencias_ficticias(df), indice)
+            t_instancia = time.perf_counter() - inicio
+            memoria = df.memory_usage(deep=True).sum() / 2**20
+            sem_tipos = main.processar_trilhas_optativas(pd.read_csv(caminho)).memory_usage(deep=True).sum() / 2**20
+            print(f"{n:>8} {t_leitura:>12.3f} {t_grafo:>10.3f} {t_instancia:>14.3f} {memoria:>13.1f} {sem_tipos:>15.1f}")
+
+
+#Suíte de escala: catálogos do gerador com fator x os cursos do dataset (os demais parâmetros fixos),
+#cada um medido em um processo separado para o pico de RSS ser só dele. Por tamanho, grava o tempo
+#do grafo de conflitos e da instância, o pico de memória, reinícios por segundo, o tempo até a primeira
+#grade viável e a curva melhor score x tempo, em JSON, junto com a versão do código (commit do git),
+#para comparar versões do solucionador com --comparar.
+def benchmark_escala(fatores, tempo, marcos, saida, melhoria=True, seed=0, comparar=None):
+    resultados = []
+    print(f"{'fator':>6} {'aulas':>7} {'arestas':>8} {'grafo (s)':>10} {'RSS (MB)':>9} {'reinícios/s':>12} "
+          f"{'1ª viável (s)':>14} {'melhor':>7} {'limite':>7}")
+    for fator in fatores:
+        comando = [sys.executable, __file__, '--seed', str(seed), 'escala', '--fator', str(fator), '--tempo', str(tempo),
+                   '--melhoria', 'recozimento' if melhoria else 'nenhuma', '--marcos'] + [str(m) for m in marcos]
+        r = json.loads(subprocess.run(comando, capture_output=True, text=True, check=True).stdout.strip().splitlines()[-1])
+        resultados.append(r)
+        primeira = '-' if r['primeira_viavel_s'] is None else f"{r['primeira_viavel_s']:.2f}"
+        print(f"{fator:>6} {r['aulas']:>7} {r['arestas']:>8} {r['grafo_s']:>10.3f} {r['rss_pico_mb']:>9.1f} "
+              f"{r['reinicios_por_s']:>12.1f} {primeira:>14} {str(r['melhor_score']):>7} {r['limite_score']:>7}")
+
+    relatorio = {'data': datetime.now().isoformat(timespec='seconds'), 'versao': versao_codigo(),
+                 'python': platform.python_version(), 'seed': seed, 'tempo': tempo, 'melhoria': melhoria,
+                 'marcos': marcos, 'resultados': resultados}
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, indent=2, ensure_ascii=False)
+    print(f"Resultados salvos em '{saida}'.")
+    if comparar:
+        comparar_escala(comparar, relatorio)
+
+
+#Mede um tamanho da suíte de escala (no processo filho) e devolve o resultado como dict.
+def medir_escala(fator, tempo, marcos, melhoria, seed):
+    df = main.processar_trilhas_optativas(gerador.gerar_catalogo(cursos=2 * fator, seed=seed))
+    inicio = time.perf_counter()
+    G, indice = main.construir_grafos_multicamadas(df)
+    t_grafo = time.perf_counter() - inicio
+    rss_grafo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    prefs = main.gerar_preferencias_ficticias(df)
+    inicio = time.perf_counter()
+    instancia = main.construir_instancia(df, prefs, indice)
+    t_instancia = time.perf_counter() - inicio
+    main.ordenar_slots_por_popularidade(instancia)
+    componentes = main.decompor_componentes(instancia)
+
+    pontos = []
+    inicio = time.perf_counter()
+    est = main.otimizar(instancia, tempo, lambda score, grade: pontos.append((time.perf_counter() - inicio, score)),
+                        melhoria=melhoria, componentes=componentes, seed=seed)
+    return {
+        'fator': fator, 'aulas': len(df), 'arestas': G.number_of_edges(), 'componentes': len(componentes),
+        'grafo_s': t_grafo, 'instancia_s': t_instancia,
+        'rss_grafo_mb': rss_grafo, 'rss_pico_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'tentativas': est['tentativas'], 'falhas': est['falhas'], 'reinicios_por_s': est['tentativas'] / tempo,
+        'primeira_viavel_s': pontos[0][0] if pontos else None,
+        'melhor_score': max((score for _, score in pontos), default=None),
+        'limite_score': instancia.potencial_total,
+        'curva': [[marco, max((score for t, score in pontos if t <= marco), default=None)] for marco in marcos],
+    }
+
+
+#Commit do git em que o código medido está (com '+alterado' se houver mudanças não commitadas).
+def versao_codigo():
+    try:
+        git = ['git', '-C', main.BASE_DIR]
+        commit = subprocess.run(git + ['rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                check=True).stdout.strip()
+        alterado = subprocess.run(git + ['status', '--porcelain', '--untracked-files=no'], capture_output=True,
+                                  text=True, check=True).stdout.strip()
+        return commit + ('+alterado' if alterado else '')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+#Compara a execução atual com um JSON anterior da suíte, tamanho a tamanho (razão atual / anterior).
+def comparar_escala(caminho, atual):
+    with open(caminho, encoding='utf-8') as f: anterior = json.load(f)
+    por_fator = {r['fator']: r for r in anterior['resultados']}
+    print(f"\nComparação com '{caminho}' (versão {anterior.get('versao')}):")
+    print(f"{'fator':>6} {'grafo':>8} {'RSS':>8} {'reinícios/s':>12} {'1ª viável':>10} {'melhor':>15}")
+    def razao(novo, velho):
+        return '-' if novo is None or not velho else f"{novo / velho:.2f}x"
+    for r in atual['resultados']:
+        a = por_fator.get(r['fator'])
+        if a is None: continue
+        print(f"{r['fator']:>6} {razao(r['grafo_s'], a['grafo_s']):>8} {razao(r['rss_pico_mb'], a['rss_pico_mb']):>8} "
+              f"{razao(r['reinicios_por_s'], a['reinicios_por_s']):>12} "
+              f"{razao(r['primeira_viavel_s'], a['primeira_viavel_s']):>10} "
+              f"{str(a['melhor_score']) + ' -> ' + str(r['melhor_score']):>15}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks do University Timetabling Solver")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="semente das buscas; em 'melhoria', as repetições usam as sementes seguintes")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_grafo = sub.add_parser('grafo', help="tempo de construção do grafo de conflitos")
+    p_grafo.add_argument('--tamanhos', type=int, nargs='+', default=[1000, 2000, 4000, 8000, 16000])
+    p_grafo.add_argument('--tamanho-grupo', type=int, default=8)
+
+    p_mem = sub.add_parser('memoria', help="pico de RSS do grafo complemento vs índice compacto")
+    p_mem.add_argument('--aulas', type=int, default=5000)
+    p_mem.add_argument('--modo', choices=['complemento', 'indice'], help=argparse.SUPPRESS)
+
+    p_par = sub.add_parser('paralelo', help="escala de soluções/s do multistart por número de processos")
+    p_par.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    p_par.add_argument('--tempo', type=float, default=10)
+
+    p_rei = sub.add_parser('reinicios', help="custo de preparação e taxa de reinícios do solucionador")
+    p_rei.add_argument('--tamanhos', type=int, nargs='*', default=[2000])
+    p_rei.add_argument('--tempo', type=float, default=5)
+
+    p_bj = sub.add_parser('backjumping', help="sucessos por segundo de CPU: busca gulosa vs backjumping")
+    p_bj.add_argument('--fracoes', type=float, nargs='+', default=[0, 0.3, 0.4, 0.5])
+    p_bj.add_argument('--tempo', type=float, default=10)
+
+    p_mel = sub.add_parser('melhoria', help="melhor score ao longo do tempo: reinícios vs busca local")
+    p_mel.add_argument('--marcos', type=float, nargs='+', default=[0.5, 1, 2, 5, 10, 15])
+    p_mel.add_argument('--repeticoes', type=int, default=3)
+
+    p_ex = sub.add_parser('exato', help="heurística vs motores exatos: score, limitante e gap por tamanho")
+    p_ex.add_argument('--tamanhos', type=int, nargs='*', default=[500, 1000, 1500])
+    p_ex.add_argument('--tempo-heuristica', type=float, default=5)
+    p_ex.add_argument('--tempo-exato', type=float, default=20)
+    p_ex.add_argument('--motores', nargs='+', default=['cpsat', 'cbc'])
+
+    p_cache = sub.add_parser('cache', help="preparação da instância sem cache, com cache frio e quente")
+    p_cache.add_argument('--tamanhos', type=int, nargs='*', default=[1000, 5000, 20000])
+
+    p_carga = sub.add_parser('carregamento', help="tempo de carregamento por etapa e memória do catálogo")
+    p_carga.add_argument('--tamanhos', type=int, nargs='*', default=[10000, 100000])
+
+    p_esc = sub.add_parser('escala', help="suíte de escala com o gerador: grafo, memória, reinícios/s, primeira "
+                                          "viável e score x tempo, em JSON")
+    p_esc.add_argument('--fatores', type=int, nargs='+', default=[1, 10, 100],
+                       help="múltiplos do número de cursos do dataset")
+    p_esc.add_argument('--tempo', type=float, default=10)
+    p_esc.add_argument('--marcos', type=float, nargs='+', default=[0.5, 1, 2, 5, 10])
+    p_esc.add_argument('--melhoria', choices=['recozimento', 'nenhuma'], default='recozimento')
+    p_esc.add_argument('--saida', default='escala.json')
+    p_esc.add_argument('--comparar', metavar='ANTERIOR.json', help="compara com um JSON anterior da suíte")
+    p_esc.add_argument('--fator', type=int, help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+    if args.comando == 'grafo':
+        benchmark_grafo(args.tamanhos, args.tamanho_grupo)
+    elif args.comando == 'memoria':
+        benchmark_memoria(args.aulas, args.modo)
+    elif args.comando == 'paralelo':
+        benchmark_paralelo(args.workers, args.tempo, args.seed)
+    elif args.comando == 'reinicios':
+        benchmark_reinicios(args.tamanhos, args.tempo, args.seed)
+    elif args.comando == 'backjumping':
+        benchmark_backjumping(args.fracoes, args.tempo, args.seed)
+    elif args.comando == 'melhoria':
+        benchmark_melhoria(args.marcos, args.repeticoes, args.seed)
+    elif args.comando == 'exato':
+        benchmark_exato(args.tamanhos, args.tempo_heuristica, args.tempo_exato, args.motores, args.seed)
+    elif args.comando == 'cache':
+        benchmark_cache(args.tamanhos)
+    elif args.comando == 'carregamento':
+        benchmark_carregamento(args.tamanhos)
+    elif args.comando == 'escala' and args.fator is not None:
+        print(json.dumps(medir_escala(args.fator, args.tempo, args.marcos, args.melhoria == 'recozimento', args.seed)))
+    elif args.comando == 'escala':
+        benchmark_escala(args.fatores, args.tempo, args.marcos, args.saida, args.melhoria == 'recozimento', args.seed,
+                         args.comparar)
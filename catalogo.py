@@ -0,0 +1,127 @@
+# catalogo.py
+# Leitura do catálogo de aulas (dataset_processado.csv), compartilhada pelo solucionador (main.py)
+# e pela visualização (visualizar_grade.py), para que as duas vejam as mesmas trilhas.
+# O pandas só é importado na leitura do catálogo: o cadastro de salas, pequeno, é lido com o módulo csv.
+import csv
+
+
+# Tipos explícitos das colunas: identificadores repetidos (disciplina, curso, professor, lab) viram
+# categorias, com um código inteiro por valor distinto, e os números usam o menor inteiro que basta.
+# Alunos (matriculados, para a capacidade da sala) e Recursos (recursos exigidos da sala, separados por
+# ';') são opcionais: sem elas, qualquer sala comum serve para a aula.
+TIPOS_COLUNAS = {
+    'ID_Aula': 'str',
+    'ID_Disciplina': 'category',
+    'Nome': 'str',
+    'Curso': 'category',
+    'Periodo': 'int16',
+    'Professor': 'category',
+    'Lab_Requerido': 'category',
+    'CH_Aula': 'int8',
+    'Alunos': 'Int16',
+    'Recursos': 'str',
+}
+
+# Colunas do cadastro de salas (salas.csv): nome, capacidade e recursos da sala separados por ';'
+# (ex.: 'projetor;computadores', opcional). Os laboratórios de Lab_Requerido entram com o mesmo nome.
+TIPOS_SALAS = {
+    'Sala': str,
+    'Capacidade': int,
+    'Recursos': str,
+}
+
+
+#Funcão identifica matérias optativas e atribui 'Trilhas' (1 ou 2) para permitir paralelismo.
+#Tipo_Real é 'OP' para optativas e 'OB' para obrigatórias; Trilha é um inteiro anulável (Int8), nulo
+#para as aulas sem trilha.
+def processar_trilhas_optativas(df):
+    import numpy as np
+
+    df['Tipo_Real'] = np.where(df['Nome'].str.contains('_OP_', regex=False), 'OP', 'OB')
+
+    # Aplica trilhas apenas para períodos avançados (>= 5), onde optativas são mais comuns.
+    # Em cada turma (Curso + Período), as disciplinas optativas são numeradas na ordem em que aparecem
+    # no catálogo: Disciplina A -> Trilha 1, Disciplina B -> Trilha 2, Disciplina C -> Trilha 1, etc.
+    chave = ['Curso', 'Periodo', 'ID_Disciplina']
+    optativas = df.loc[(df['Tipo_Real'] == 'OP') & (df['Periodo'].astype(int) >= 5), chave]
+    disciplinas = optativas.drop_duplicates()
+    ordem = disciplinas.groupby(['Curso', 'Periodo'], observed=True, sort=False).cumcount()
+    trilhas = disciplinas.assign(Trilha=ordem % 2 + 1)
+    df['Trilha'] = df[chave].merge(trilhas, on=chave, how='left')['Trilha'].astype('Int8').array
+
+    print("Trilhas de optativas processadas com sucesso.")
+    return df
+
+
+def carregar_dados(caminho):
+    import pandas as pd
+
+    try:
+        df = pd.read_csv(caminho, dtype=TIPOS_COLUNAS)
+        df = processar_trilhas_optativas(df)
+        return df
+    except Exception as e:
+        print(f"Erro ao carregar dados: {e}")
+        return None
+
+
+#Lê o cadastro de salas como uma lista de dicionários (coluna -> valor, com None nas células vazias),
+#ordenada da menor para a maior capacidade (ordem usada pelo índice de salas livres do solucionador,
+#que escolhe sempre a menor sala que serve).
+def carregar_salas(caminho):
+    try:
+        with open(caminho, newline='', encoding='utf-8') as f:
+            salas = [{coluna: tipo(linha[coluna]) if linha.get(coluna) else None
+                      for coluna, tipo in TIPOS_SALAS.items()} for linha in csv.DictReader(f)]
+        for sala in salas:
+            if sala['Sala'] is None or sala['Capacidade'] is None:
+                raise ValueError("toda sala precisa de nome e capacidade")
+        return sorted(salas, key=lambda sala: (sala['Capacidade'], sala['Sala']))
+    except Exception as e:
+        print(f"Erro ao carregar salas: {e}")
+        return None
+
+
+#Lê as preferências dos professores (preferencias.csv), uma linha por preferência, com as colunas
+#   Professor;
+#   Horario: nome de um slot (SEG_M1_M2), um dia (SEX) ou unidades de hora em todos os dias (N3_N4_N5);
+#   Peso: inteiro, positivo para preferir e negativo para evitar o horário, ou 'indisponivel';
+#   Max_Dias (opcional): dias da semana com aula, no máximo; uma linha só com Professor e Max_Dias vale.
+#Um horário repetido para o mesmo professor (com pesos diferentes, ou com peso e 'indisponivel') é erro.
+#Devolve {professor: {'pesos': {horário: peso}, 'indisponivel': [horários], 'max_dias': n ou None}}; a
+#validação dos horários fica com o solucionador (main.ler_preferencias), que conhece a tabela de slots.
+def carregar_preferencias(caminho):
+    try:
+        prefs = {}
+        with open(caminho, newline='', encoding='utf-8') as f:
+            for n, linha in enumerate(csv.DictReader(f), start=2):
+                professor = (linha.get('Professor') or '').strip()
+                if not professor: raise ValueError(f"linha {n}: sem professor")
+                p = prefs.setdefault(professor, {'pesos': {}, 'indisponivel': [], 'max_dias': None})
+                horario, peso = (linha.get('Horario') or '').strip().upper(), (linha.get('Peso') or '').strip()
+                if horario:
+                    if not peso: raise ValueError(f"linha {n}: horário {horario} sem peso")
+                    if horario in p['pesos'] or horario in p['indisponivel']:
+                        raise ValueError(f"linha {n}: horário {horario} repetido para {professor}")
+                    if peso.lower() == 'indisponivel':
+                        p['indisponivel'].append(horario)
+                    else:
+                        try:
+                            p['pesos'][horario] = int(peso)
+                        except ValueError:
+                            raise ValueError(f"linha {n}: peso '{peso}' não é um inteiro nem 'indisponivel'")
+                if (linha.get('Max_Dias') or '').strip():
+                    max_dias = int(linha['Max_Dias'])
+                    if max_dias < 1 or p['max_dias'] not in (None, max_dias):
+                        raise ValueError(f"linha {n}: Max_Dias inválido ou diferente do já dado para {professor}")
+                    p['max_dias'] = max_dias
+        return prefs
+    except Exception as e:
+        print(f"Erro ao carregar preferências: {e}")
+        return None
+
+
+#Recursos de uma célula (texto separado por ';' ou nulo) como conjunto.
+def recursos(valor):
+    if valor is None or valor != valor: return frozenset()  # valor != valor: NaN
+    return frozenset(r.strip() for r in str(valor).split(';') if r.strip())
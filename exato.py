@@ -0,0 +1,223 @@
+# exato.py
+# Motores exatos para o mesmo problema resolvido pela busca de main.py, com limitante (bound) e gap.
+# O problema é exportado como um modelo linear 0-1 independente de motor, e cada motor só importa a
+# sua biblioteca quando é usado:  pip install ortools  (cpsat)  /  pip install pulp  (cbc)
+import importlib.util
+import os
+import re
+import tempfile
+import time
+from collections import defaultdict, namedtuple
+
+
+#Modelo linear 0-1:
+#   variaveis: (aula, id do slot) de cada variável x_k, que vale 1 se a aula for alocada no slot;
+#   unicas: para cada aula, as variáveis dos seus slots possíveis, das quais exatamente uma vale 1;
+#   restricoes: (termos, limite), com termos [(k, coeficiente)], significando soma <= limite;
+#   objetivo: coeficiente de cada variável (o delta de preferência), a maximizar;
+#   indicadores: para cada variável indicadora y_g, as variáveis x das quais ela é o "ou" (y_g vale 1 se
+#       alguma delas valer); nas restrições, y_g é a variável de índice len(variaveis) + g.
+ModeloExato = namedtuple('ModeloExato', ['variaveis', 'unicas', 'restricoes', 'objetivo', 'indicadores'])
+
+#Resultado de um motor: score da melhor grade (None se não achou), limitante superior provado (None se
+#o motor provou que não há solução), gap relativo, status, segundos até a primeira solução viável e
+#total, e a grade (aula -> id do slot).
+ResultadoExato = namedtuple('ResultadoExato', ['score', 'limite', 'gap', 'status', 'tempo_primeira', 'tempo', 'grade'])
+
+
+#Exporta as restrições que a busca confere em cabe_no_slot:
+#   recurso por unidade de hora: professor, lab e turma (optativas de trilhas diferentes podem
+#   dividir o horário; aulas sem trilha conflitam com todas), o que cobre as camadas do grafo de
+#   conflitos e as sobreposições parciais de slots (N3_N4 x N3_N4_N5);
+#   por dia: no máximo uma aula de cada disciplina e até 8 horas por professor;
+#   por semana: os professores com limite de dias (max_dias) dão aula em no máximo max_dias dias, com
+#   uma indicadora por (professor, dia) que vale 1 se ele tiver alguma aula no dia;
+#   salas, sem variáveis de sala: para cada conjunto de salas M que alguma aula aceita, as aulas que só
+#   aceitam salas de M não passam de |M| por unidade de hora (condição de Hall). Com salas que diferem
+#   só na capacidade, isso garante que a etapa de atribuição de salas (main.atribuir_salas) encontra
+#   uma sala para cada aula; com recursos diferentes, é uma condição necessária.
+def exportar_modelo(instancia, aulas=None):
+    if aulas is None: aulas = instancia.aulas
+    variaveis, unicas, objetivo = [], [], []
+    por_unidade = defaultdict(list)                      # (recurso, unidade de hora) -> variáveis
+    conjuntos_salas = sorted({instancia.salas_aula[i] for i in aulas if instancia.salas_aula[i]})
+    por_turma = defaultdict(lambda: defaultdict(list))   # (turma, unidade) -> {trilha: variáveis}
+    disciplina_dia = defaultdict(list)                   # (disciplina, dia) -> variáveis
+    carga_dia = defaultdict(list)                        # (professor, dia) -> (variável, horas)
+    dias_prof = defaultdict(list)                        # (professor, dia) -> variáveis, se houver limite
+
+    for i in sorted(aulas):
+        salas = instancia.salas_aula[i]
+        contida_em = [m for m in conjuntos_salas if not salas & ~m] if salas else []
+        opcoes = []
+        for s in instancia.slots_aula[i]:
+            k = len(variaveis)
+            variaveis.append((i, s.id))
+            objetivo.append(instancia.delta_pref[i * instancia.n_slots + s.id])
+            opcoes.append(k)
+            for u in range(s.mascara.bit_length()):
+                if not s.mascara >> u & 1: continue
+                por_unidade[('prof', instancia.prof[i], u)].append(k)
+                if instancia.lab[i] >= 0: por_unidade[('lab', instancia.lab[i], u)].append(k)
+                por_turma[(instancia.turma[i], u)][instancia.trilha[i]].append(k)
+                for m in contida_em: por_unidade[('salas', m, u)].append(k)
+            disciplina_dia[(instancia.disciplina[i], s.dia)].append(k)
+            carga_dia[(instancia.prof[i], s.dia)].append((k, instancia.duracao[i]))
+            if instancia.max_dias[instancia.prof[i]]: dias_prof[(instancia.prof[i], s.dia)].append(k)
+        unicas.append(opcoes)
+
+    restricoes = []
+    def limitar(termos, limite):
+        if sum(c for _, c in termos) > limite: restricoes.append((termos, limite))
+
+    for chave, ks in por_unidade.items():
+        limitar([(k, 1) for k in ks], chave[1].bit_count() if chave[0] == 'salas' else 1)
+    for trilhas in por_turma.values():
+        sem_trilha = trilhas.get(None, [])
+        com_trilha = [ks for t, ks in trilhas.items() if t is not None] or [[]]
+        for ks in com_trilha:
+            limitar([(k, 1) for k in sem_trilha + ks], 1)
+    for ks in disciplina_dia.values():
+        limitar([(k, 1) for k in ks], 1)
+    for termos in carga_dia.values():
+        limitar(termos, 8)
+
+    indicadores = []
+    por_prof = defaultdict(list)                         # professor -> indicadoras dos seus dias
+    for (prof, _), ks in dias_prof.items():
+        g = len(variaveis) + len(indicadores)
+        indicadores.append(ks)
+        por_prof[prof].append(g)
+        restricoes.extend(([(k, 1), (g, -1)], 0) for k in ks)
+    for prof, ys in por_prof.items():
+        limitar([(g, 1) for g in ys], instancia.max_dias[prof])
+
+    return ModeloExato(variaveis, unicas, restricoes, objetivo, indicadores)
+
+
+def gap_relativo(score, limite):
+    if score is None or limite is None: return None
+    return (limite - score) / max(abs(limite), 1)
+
+
+#OR-Tools CP-SAT. Usa `workers` threads de busca, parte da dica (índices das variáveis da grade
+#inicial) e chama ao_encontrar(score, grade) a cada solução melhor encontrada.
+def resolver_cpsat(modelo, tempo_limite, ao_encontrar=None, workers=1, dica=None, seed=0):
+    from ortools.sat.python import cp_model
+
+    inicio = time.time()
+    cp = cp_model.CpModel()
+    x = [cp.NewBoolVar(f"x{k}") for k in range(len(modelo.variaveis))]
+    y = [cp.NewBoolVar(f"y{g}") for g in range(len(modelo.indicadores))]
+    v = x + y
+    for opcoes in modelo.unicas:
+        cp.AddExactlyOne(x[k] for k in opcoes)
+    for termos, limite in modelo.restricoes:
+        cp.Add(sum(c * v[k] for k, c in termos) <= limite)
+    cp.Maximize(sum(c * x[k] for k, c in enumerate(modelo.objetivo) if c))
+    if dica is not None:
+        for k in range(len(x)): cp.AddHint(x[k], k in dica)
+        for g, ks in enumerate(modelo.indicadores): cp.AddHint(y[g], any(k in dica for k in ks))
+
+    primeira = [None]
+
+    class Observador(cp_model.CpSolverSolutionCallback):
+        def on_solution_callback(self):
+            if primeira[0] is None: primeira[0] = time.time() - inicio
+            if ao_encontrar is not None:
+                escolhidas = [k for k in range(len(x)) if self.BooleanValue(x[k])]
+                ao_encontrar(int(self.ObjectiveValue()), grade_das_variaveis(modelo, escolhidas))
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = max(tempo_limite - (time.time() - inicio), 0.1)
+    solver.parameters.num_search_workers = max(workers, 1)
+    solver.parameters.random_seed = seed
+    # Relaxação linear completa: com poucas threads é o que dá ao CP-SAT um limitante útil.
+    solver.parameters.linearization_level = 2
+    status = solver.Solve(cp, Observador())
+
+    nome_status = solver.StatusName(status)
+    limite = None if status in (cp_model.INFEASIBLE, cp_model.MODEL_INVALID) else int(solver.BestObjectiveBound())
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return ResultadoExato(None, limite, None, nome_status, None, time.time() - inicio, None)
+    score = int(solver.ObjectiveValue())
+    grade = grade_das_variaveis(modelo, [k for k in range(len(x)) if solver.BooleanValue(x[k])])
+    return ResultadoExato(score, limite, gap_relativo(score, limite), nome_status, primeira[0],
+                          time.time() - inicio, grade)
+
+
+#PuLP com o CBC embutido. O CBC não expõe soluções intermediárias pela PuLP, então ao_encontrar só
+#recebe a solução final, e o limitante e o instante da primeira solução viável vêm do log do CBC.
+def resolver_cbc(modelo, tempo_limite, ao_encontrar=None, workers=1, dica=None, seed=0):
+    import pulp
+
+    inicio = time.time()
+    prob = pulp.LpProblem("timetabling", pulp.LpMaximize)
+    x = [pulp.LpVariable(f"x{k}", cat='Binary') for k in range(len(modelo.variaveis))]
+    y = [pulp.LpVariable(f"y{g}", cat='Binary') for g in range(len(modelo.indicadores))]
+    v = x + y
+    prob += pulp.lpSum(c * x[k] for k, c in enumerate(modelo.objetivo) if c)
+    for opcoes in modelo.unicas:
+        prob += pulp.lpSum(x[k] for k in opcoes) == 1
+    for termos, limite in modelo.restricoes:
+        prob += pulp.lpSum(c * v[k] for k, c in termos) <= limite
+    if dica is not None:
+        for k in range(len(x)): x[k].setInitialValue(1 if k in dica else 0)
+        for g, ks in enumerate(modelo.indicadores): y[g].setInitialValue(1 if any(k in dica for k in ks) else 0)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho_log = os.path.join(pasta, "cbc.log")
+        solver = pulp.PULP_CBC_CMD(msg=False, timeLimit=max(tempo_limite - (time.time() - inicio), 1),
+                                   threads=max(workers, 1), warmStart=dica is not None, logPath=caminho_log,
+                                   options=[f"randomCbcSeed {seed + 1}"])
+        prob.solve(solver)
+        with open(caminho_log, encoding='utf-8', errors='replace') as f: log = f.read()
+
+    # Com o limite de tempo, a PuLP marca o problema como 'Optimal' mesmo sem prova; sol_status distingue.
+    nome_status = pulp.LpSolution[prob.sol_status]
+    if pulp.value(prob.objective) is None or prob.sol_status not in (pulp.LpSolutionOptimal,
+                                                                      pulp.LpSolutionIntegerFeasible):
+        limite = None if prob.status == pulp.LpStatusInfeasible else limite_do_log_cbc(log)
+        return ResultadoExato(None, limite, None, nome_status, None, time.time() - inicio, None)
+    score = int(round(pulp.value(prob.objective)))
+    limite = score if prob.sol_status == pulp.LpSolutionOptimal else limite_do_log_cbc(log)
+    primeira = re.search(r"Integer solution of \S+ found .*?\(([\d.]+) seconds\)", log)
+    grade = grade_das_variaveis(modelo, [k for k in range(len(x)) if (x[k].varValue or 0) > 0.5])
+    if ao_encontrar is not None: ao_encontrar(score, grade)
+    return ResultadoExato(score, limite, gap_relativo(score, limite), nome_status,
+                          float(primeira.group(1)) if primeira else None, time.time() - inicio, grade)
+
+
+#O CBC minimiza o negativo do objetivo: o "best possible" do log é o limitante com o sinal trocado.
+def limite_do_log_cbc(log):
+    valores = re.findall(r"best possible (-?[\d.e+]+)", log)
+    return int(-float(valores[-1]) // 1) if valores else None
+
+
+def grade_das_variaveis(modelo, escolhidas):
+    return dict(modelo.variaveis[k] for k in escolhidas)
+
+
+MOTORES = {
+    'cpsat': resolver_cpsat,
+    'cbc': resolver_cbc,
+}
+
+# Pacote opcional de que cada motor depende.
+DEPENDENCIAS = {
+    'cpsat': 'ortools',
+    'cbc': 'pulp',
+}
+
+def motor_disponivel(motor):
+    return importlib.util.find_spec(DEPENDENCIAS[motor]) is not None
+
+
+#Resolve a instância com um motor exato. grade_inicial (aula -> id do slot), em geral a melhor grade
+#da busca heurística, é passada ao motor como solução inicial (warm start).
+def resolver_exato(instancia, motor, tempo_limite, ao_encontrar=None, workers=1, grade_inicial=None, seed=0):
+    modelo = exportar_modelo(instancia)
+    dica = None
+    if grade_inicial:
+        dica = {k for k, (i, slot_id) in enumerate(modelo.variaveis) if grade_inicial.get(i) == slot_id}
+    return MOTORES[motor](modelo, tempo_limite, ao_encontrar, workers, dica, seed)
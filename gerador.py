@@ -0,0 +1,112 @@
+# gerador.py
+# Gerador de catálogos sintéticos no formato de dataset_processado.csv, para medir o solucionador em
+# instâncias maiores que o dataset real (ver benchmark.py escala).
+# Uso: python gerador.py SAIDA.csv [--cursos N] [--periodos N] [--turmas N] [--disciplinas N] ...
+import argparse
+import heapq
+import math
+import random
+
+import pandas as pd
+
+
+COLUNAS = ['ID_Aula', 'ID_Disciplina', 'Nome', 'Curso', 'Periodo', 'Professor', 'Lab_Requerido', 'CH_Aula']
+
+# Proporções fixas tiradas do dataset real: fração das disciplinas com duas aulas por semana e fração
+# das disciplinas de uma aula do turno noturno (SIN) que ocupam o bloco de 3 horas (N3_N4_N5).
+FRACAO_DUAS_AULAS = 0.65
+FRACAO_TRES_HORAS = 0.25
+
+# Aulas por turma e semana, no máximo, em cada turno: a partir daí uma disciplina de duas aulas passa a ter
+# uma só. Deixa folga sobre os blocos da semana (20 no diurno, 10 no noturno), para que o gerador não
+# produza turmas que já não cabem na semana.
+LIMITE_AULAS_TURMA = {'CCO': 16, 'SIN': 9}
+
+# Optativas só existem a partir deste período, como no dataset (ver processar_trilhas_optativas).
+PERIODO_OPTATIVAS = 5
+
+
+#Curso k: os cursos alternam entre os turnos diurno (CCO) e noturno (SIN), que o solucionador
+#reconhece pelo nome; a partir do terceiro, ganham um número (CCO2, SIN2, CCO3...).
+def nome_curso(k):
+    turno = 'SIN' if k % 2 else 'CCO'
+    return turno if k < 2 else f"{turno}{k // 2 + 1}"
+
+
+#Professor ou lab menos carregado de um heap de (carga, desempate aleatório, nome), que recebe as n_aulas
+#e volta ao heap com um novo desempate: O(log n) por escolha, em vez de percorrer todos a cada oferta.
+def escolher_menos_carregado(heap, n_aulas, rng):
+    carga, _, nome = heap[0]
+    heapq.heapreplace(heap, (carga + n_aulas, rng.random(), nome))
+    return nome
+
+
+#Gera um catálogo sintético. Os valores padrão reproduzem as proporções do dataset real (2 cursos,
+#9 períodos, ~8 aulas por turma, ~5 aulas por professor, ~35% das aulas em laboratório):
+#   cursos: número de cursos, alternando os turnos diurno e noturno;
+#   periodos: períodos de cada curso;
+#   turmas: turmas paralelas por curso e período, cada uma com as suas disciplinas (ex.: CCO_T2);
+#   disciplinas: disciplinas por turma, com uma ou duas aulas por semana;
+#   carga_professor: aulas por professor em média; os professores são de um curso e recebem as
+#       disciplinas sempre o menos carregado primeiro, então cargas maiores apertam a instância;
+#   labs_por_curso: laboratórios por curso, compartilhados por todos os cursos (menos = mais escassos);
+#       como os professores, cada disciplina vai para o lab menos ocupado no seu turno;
+#   fracao_lab: fração das disciplinas que exigem laboratório;
+#   fracao_optativas: fração das disciplinas optativas a partir de PERIODO_OPTATIVAS, que viram
+#       trilhas paralelas (mais optativas = mais aulas que podem dividir o horário).
+def gerar_catalogo(cursos=2, periodos=9, turmas=1, disciplinas=5, carga_professor=5, labs_por_curso=2,
+                   fracao_lab=0.35, fracao_optativas=0.45, seed=0):
+    rng = random.Random(seed)
+    labs = [f"Lab_{j + 1:03d}" for j in range(max(1, math.ceil(labs_por_curso * cursos)))]
+    ocupacao_labs = {turno: [(0, rng.random(), lab) for lab in labs] for turno in ('CCO', 'SIN')}
+    for heap in ocupacao_labs.values(): heapq.heapify(heap)
+    linhas = []
+    for k in range(cursos):
+        base = nome_curso(k)
+        turno = 'SIN' if 'SIN' in base else 'CCO'
+        limite = LIMITE_AULAS_TURMA[turno]
+        ofertas = []  # (curso da turma, período, nome da disciplina, número de aulas)
+        for t in range(turmas):
+            curso = base if turmas == 1 else f"{base}_T{t + 1}"
+            for periodo in range(1, periodos + 1):
+                total = 0
+                for d in range(disciplinas):
+                    optativa = periodo >= PERIODO_OPTATIVAS and rng.random() < fracao_optativas
+                    nome = f"{curso}_P{periodo}_{'OP' if optativa else 'OB'}_{d + 1:02d}"
+                    n_aulas = 2 if rng.random() < FRACAO_DUAS_AULAS and total + 2 <= limite else 1
+                    total += n_aulas
+                    ofertas.append((curso, periodo, nome, n_aulas))
+
+        n_profs = max(1, round(sum(n for *_, n in ofertas) / carga_professor))
+        carga = [(0, rng.random(), f"Prof_{base}_{p + 1}") for p in range(n_profs)]
+        heapq.heapify(carga)
+        for curso, periodo, nome, n_aulas in ofertas:
+            professor = escolher_menos_carregado(carga, n_aulas, rng)
+            lab = None
+            if rng.random() < fracao_lab:
+                lab = escolher_menos_carregado(ocupacao_labs[turno], n_aulas, rng)
+            horas = 3 if turno == 'SIN' and n_aulas == 1 and rng.random() < FRACAO_TRES_HORAS else 2
+            for a in range(n_aulas):
+                linhas.append((f"{nome}_{'AB'[a]}", nome, nome, curso, periodo, professor, lab, horas))
+    return pd.DataFrame(linhas, columns=COLUNAS)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera um catálogo sintético no formato de dataset_processado.csv")
+    parser.add_argument('saida', help="arquivo CSV gerado")
+    parser.add_argument('--cursos', type=int, default=2, help="cursos, alternando os turnos diurno e noturno")
+    parser.add_argument('--periodos', type=int, default=9)
+    parser.add_argument('--turmas', type=int, default=1, help="turmas paralelas por curso e período")
+    parser.add_argument('--disciplinas', type=int, default=5, help="disciplinas por turma")
+    parser.add_argument('--carga-professor', type=float, default=5, help="aulas por professor, em média")
+    parser.add_argument('--labs-por-curso', type=float, default=2, help="laboratórios por curso (escassez de labs)")
+    parser.add_argument('--fracao-lab', type=float, default=0.35, help="fração das disciplinas em laboratório")
+    parser.add_argument('--fracao-optativas', type=float, default=0.45,
+                        help=f"fração das disciplinas optativas a partir do período {PERIODO_OPTATIVAS}")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    df = gerar_catalogo(args.cursos, args.periodos, args.turmas, args.disciplinas, args.carga_professor,
+                        args.labs_por_curso, args.fracao_lab, args.fracao_optativas, args.seed)
+    df.to_csv(args.saida, index=False)
+    print(f"{len(df)} aulas de {df['ID_Disciplina'].nunique()} disciplinas, {df['Professor'].nunique()} professores "
+          f"e {df['Lab_Requerido'].nunique()} laboratórios gravadas em '{args.saida}'.")
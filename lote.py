@@ -0,0 +1,204 @@
+# lote.py
+# Resolve em lote vários catálogos (campi, semestres) a partir de um manifesto, em um único processo
+# principal: as bibliotecas são importadas e os catálogos carregados uma vez, e cada instância é
+# resolvida em um processo filho (fork) com a sua parte dos núcleos.
+# Uso: python lote.py MANIFESTO.csv [--workers N] [--tempo S] [--seed N] [--resumo RESUMO.csv]
+import argparse
+import csv
+import multiprocessing as mp
+import os
+import queue
+import signal
+import time
+from collections import Counter
+
+import main
+
+
+# Manifesto: um CSV com uma linha por instância e as colunas
+#   Nome: identificador da instância (ex.: campus_a_2026_1);
+#   Catalogo: CSV no formato de dataset_processado.csv;
+#   Saida (opcional): grade gerada (padrão: grade_<Nome>.csv, ao lado do manifesto);
+#   Tempo (opcional): tempo limite da instância em segundos (padrão: --tempo);
+#   Salas (opcional): cadastro de salas da instância (padrão: sem salas);
+#   Preferencias (opcional): preferências dos professores, como em main.py --preferencias (padrão: simuladas);
+#   Seed (opcional): semente da instância (padrão: derivada de --seed e do nome).
+# Caminhos relativos são relativos à pasta do manifesto.
+COLUNAS_RESUMO = ['Nome', 'Aulas', 'Workers', 'Tempo', 'Tentativas', 'Tentativas_s', 'Solucoes', 'Primeira',
+                  'Melhor_Score', 'Limite', 'Saida']
+
+
+def ler_manifesto(caminho, tempo_padrao, seed):
+    pasta = os.path.dirname(os.path.abspath(caminho))
+    def resolver(valor):
+        return os.path.join(pasta, valor) if valor and not os.path.isabs(valor) else valor
+
+    with open(caminho, newline='', encoding='utf-8') as f:
+        manifesto = [{coluna: valor or '' for coluna, valor in linha.items()} for linha in csv.DictReader(f)]
+    repetidos = [nome for nome, n in Counter(linha['Nome'] for linha in manifesto).items() if n > 1]
+    if repetidos:
+        raise ValueError(f"nomes repetidos no manifesto: {', '.join(repetidos)}")
+    entradas = []
+    for linha in manifesto:
+        nome = linha['Nome']
+        entradas.append({
+            'nome': nome,
+            'catalogo': resolver(linha['Catalogo']),
+            'saida': resolver(linha.get('Saida') or f"grade_{nome}.csv"),
+            'tempo': float(linha.get('Tempo') or tempo_padrao),
+            'salas': resolver(linha.get('Salas')) or None,
+            'preferencias': resolver(linha.get('Preferencias')) or None,
+            'seed': int(linha['Seed']) if linha.get('Seed') else main.semente_derivada(seed, nome),
+        })
+    return entradas
+
+
+#Carrega o catálogo de uma entrada e monta a instância, com a ordem dos slots dela (ordenar_slots_por_popularidade
+#reordena SLOTS_TEMPO, que é global, então cada instância guarda a sua cópia). None se não der para resolver.
+def preparar(entrada, usar_cache=True):
+    df, indice = main.carregar_catalogo(entrada['catalogo'], usar_cache)
+    salas, ok = main.ler_salas(entrada['salas'])
+    if df is None or not ok: return None
+    prefs, ok = main.ler_preferencias(entrada['preferencias'], df)
+    if not ok: return None
+    instancia = main.construir_instancia(df, prefs, indice, salas)
+    if not main.conferir_salas(instancia) or not main.conferir_disponibilidade(instancia): return None
+    ordem_original = list(main.SLOTS_TEMPO)
+    main.ordenar_slots_por_popularidade(instancia)
+    entrada['ordem'] = list(main.SLOTS_TEMPO)
+    main.SLOTS_TEMPO[:] = ordem_original
+    entrada['instancia'] = instancia
+    entrada['componentes'] = main.decompor_componentes(instancia)
+    return entrada
+
+
+#Processo filho: resolve uma instância com `workers` processos de busca, grava a melhor grade em
+#entrada['saida'] e devolve o resumo pela fila.
+def resolver(entrada, workers, modo, melhoria, fila):
+    signal.signal(signal.SIGTERM, main.interromper)
+    main.SLOTS_TEMPO[:] = entrada['ordem']
+    instancia = entrada['instancia']
+    inicio = time.time()
+    melhor = {'score': None, 'grade': None, 'solucoes': 0, 'primeira': None}
+
+    def registrar(score, grade):
+        melhor['solucoes'] += 1
+        if melhor['primeira'] is None: melhor['primeira'] = time.time() - inicio
+        if grade is not None and (melhor['score'] is None or score > melhor['score']):
+            melhor['score'], melhor['grade'] = score, dict(grade)
+
+    est = main.novas_estatisticas()
+    try:
+        est = main.otimizar(instancia, entrada['tempo'], registrar, workers, modo, melhoria, entrada['componentes'],
+                            seed=entrada['seed'])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if melhor['grade']: main.salvar_grade(instancia, melhor['grade'], entrada['saida'])
+        tempo = time.time() - inicio
+        fila.put({'Nome': entrada['nome'], 'Aulas': len(instancia), 'Workers': workers, 'Tempo': round(tempo, 2),
+                  'Tentativas': est['tentativas'], 'Tentativas_s': round(est['tentativas'] / max(tempo, 1e-9), 1),
+                  'Solucoes': melhor['solucoes'],
+                  'Primeira': None if melhor['primeira'] is None else round(melhor['primeira'], 2),
+                  'Melhor_Score': melhor['score'], 'Limite': instancia.potencial_total,
+                  'Saida': entrada['saida'] if melhor['grade'] else None})
+
+
+#Escalona as instâncias nos núcleos: cada uma recebe processos em proporção ao número de aulas (ao
+#menos um; ver main.distribuir_workers) e as maiores começam primeiro. Uma instância só começa quando
+#há núcleos livres para ela, então com mais instâncias que núcleos elas rodam em ondas.
+def executar_lote(entradas, workers, modo='gulosa', melhoria=True):
+    instancias = [e['instancia'] for e in entradas]
+    if len(entradas) <= workers:
+        alocados = main.distribuir_workers(instancias, workers)
+    else:
+        alocados = [1] * len(entradas)
+    pendentes = sorted(range(len(entradas)), key=lambda k: len(instancias[k]), reverse=True)
+
+    ctx = mp.get_context()
+    fila = ctx.Queue()
+    ativos = {} # nome -> (processo, núcleos)
+    resumo = []
+    livres = workers
+    try:
+        while pendentes or ativos:
+            while pendentes and (alocados[pendentes[0]] <= livres or not ativos):
+                k = pendentes.pop(0)
+                e = entradas[k]
+                print(f"[{e['nome']}] {len(instancias[k])} aulas, {alocados[k]} processo(s), {e['tempo']:g}s, "
+                      f"semente {e['seed']}.")
+                p = ctx.Process(target=resolver, args=(e, alocados[k], modo, melhoria, fila))
+                p.start()
+                ativos[e['nome']] = (p, alocados[k])
+                livres -= alocados[k]
+            try:
+                r = fila.get(timeout=1.0)
+            except queue.Empty:
+                # Um filho que morreu sem mandar o resumo (ex.: sem memória) não segura o lote.
+                for nome, (p, nucleos) in list(ativos.items()):
+                    if not p.is_alive() and fila.empty():
+                        print(f"[{nome}] o processo terminou sem resultado (código {p.exitcode}).")
+                        del ativos[nome]
+                        livres += nucleos
+                continue
+            p, nucleos = ativos.pop(r['Nome'])
+            p.join()
+            livres += nucleos
+            resumo.append(r)
+            print(f"[{r['Nome']}] fim em {r['Tempo']:.1f}s: {r['Tentativas']} tentativas, "
+                  f"melhor score {r['Melhor_Score']}.")
+    except KeyboardInterrupt:
+        # O Ctrl+C chega também aos filhos, que gravam a melhor grade que já têm e mandam o resumo.
+        print("\nLote interrompido; as instâncias em andamento gravam a melhor grade que já têm.")
+        for p, _ in ativos.values():
+            p.join(main.PRAZO_ENCERRAMENTO * 2)
+            if p.is_alive(): p.terminate()
+        while True:
+            try:
+                resumo.append(fila.get(timeout=0.1))
+            except queue.Empty:
+                break
+    return resumo
+
+
+def imprimir_resumo(resumo):
+    print("\n" + "=" * 40)
+    print(f"{'instância':>20} {'aulas':>6} {'proc.':>5} {'tempo (s)':>9} {'tentativas':>10} {'tent./s':>8} "
+          f"{'1ª viável (s)':>13} {'melhor':>7} {'limite':>7}")
+    for r in resumo:
+        primeira = '-' if r['Primeira'] is None else f"{r['Primeira']:.2f}"
+        print(f"{r['Nome']:>20} {r['Aulas']:>6} {r['Workers']:>5} {r['Tempo']:>9.1f} {r['Tentativas']:>10} "
+              f"{r['Tentativas_s']:>8.1f} {primeira:>13} {str(r['Melhor_Score']):>7} {r['Limite']:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve em lote os catálogos de um manifesto")
+    parser.add_argument('manifesto', help="CSV com Nome, Catalogo e, opcionalmente, Saida, Tempo, Salas, Preferencias e Seed")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="núcleos usados pelo lote inteiro (padrão: número de CPUs)")
+    parser.add_argument('--tempo', type=float, default=main.TEMPO_LIMITE_SEGUNDOS,
+                        help="tempo limite das instâncias sem Tempo no manifesto")
+    parser.add_argument('--busca', choices=['gulosa', 'backjumping'], default='gulosa')
+    parser.add_argument('--melhoria', choices=['recozimento', 'nenhuma'], default='recozimento')
+    parser.add_argument('--seed', type=int, default=0, help="semente da qual saem as sementes das instâncias")
+    parser.add_argument('--resumo', metavar='RESUMO.csv', help="grava também o resumo em CSV")
+    parser.add_argument('--sem-cache', action='store_true')
+    args = parser.parse_args()
+
+    inicio = time.time()
+    try:
+        entradas = ler_manifesto(args.manifesto, args.tempo, args.seed)
+    except Exception as e:
+        raise SystemExit(f"Erro ao ler o manifesto: {e}")
+    entradas = [e for e in entradas if preparar(e, not args.sem_cache)]
+    print(f"{len(entradas)} instância(s) prontas em {time.time() - inicio:.1f}s.")
+    resumo = executar_lote(entradas, args.workers, args.busca, args.melhoria == 'recozimento')
+    resumo.sort(key=lambda r: [e['nome'] for e in entradas].index(r['Nome']))
+    imprimir_resumo(resumo)
+    print(f"Lote concluído em {time.time() - inicio:.1f}s.")
+    if args.resumo:
+        with open(args.resumo, 'w', newline='', encoding='utf-8') as f:
+            escritor = csv.DictWriter(f, COLUNAS_RESUMO, lineterminator='\n')
+            escritor.writeheader()
+            escritor.writerows(resumo)
+        print(f"Resumo salvo em '{args.resumo}'.")
@@ -1,89 +1,235 @@
 # main.py
-import pandas as pd
-import networkx as nx
-import sys
+# Dependências obrigatórias: numpy, pandas e networkx. A busca só usa a biblioteca padrão e o numpy. O
+# pandas (leitura e processamento do catálogo em CSV), o numpy e o networkx (grafo de conflitos) são
+# importados dentro das funções que os usam, então uma execução que acha o catálogo no cache não carrega
+# o pandas nem o networkx.
 import random
+import math
 import os
-from collections import defaultdict
+import argparse
+import csv
+import hashlib
+import importlib.util
+import json
+import queue
+import multiprocessing as mp
+from collections import defaultdict, namedtuple
+from itertools import combinations
+from array import array
 import time 
+import signal
+from datetime import datetime
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__)) 
 ARQUIVO_DADOS = os.path.join(BASE_DIR, "dataset_processado.csv")
+ARQUIVO_GRADE = os.path.join(BASE_DIR, "grade_final.csv")
+ARQUIVO_SALAS = os.path.join(BASE_DIR, "salas.csv")
 
+# Cache em disco do catálogo processado e do índice de conflitos (ver carregar_catalogo).
+# Incremente VERSAO_REGRAS ao mudar as regras de trilhas ou de conflito, e FORMATO_CACHE ao mudar o
+# formato do arquivo, para invalidar o cache.
+PASTA_CACHE = os.path.join(BASE_DIR, ".cache")
+VERSAO_REGRAS = 1
+FORMATO_CACHE = 2
 
 
-# Aumentamos o limite padrão de recursão para evitar erros de 'RecursionError' durante a execução de DFS.
-sys.setrecursionlimit(10000)
+# A cada quantos nós a busca confere o prazo e o token de cancelamento.
+INTERVALO_VERIFICACAO = 8
 
+# Busca com backjumping: cliques alternativos tentados por slot e limite de nós por tentativa.
+ALTERNATIVAS_POR_SLOT = 2
+LIMITE_NOS_BACKJUMP = 150
 
-# Definição de slots por cada curso (SIN e CCO)
+# Busca local após cada grade completa: passos do recozimento simulado e temperaturas inicial e final.
+PASSOS_MELHORIA = 20000
+TEMPERATURA_INICIAL = 10.0
+TEMPERATURA_FINAL = 0.5
 
-SLOTS_CCO = ['M3_M4', 'M1_M2', 'T1_T2', 'T3_T4'] 
-SLOTS_SIN = ['N1_N2', 'N3_N4', 'N3_N4_N5'] 
+
+# Definição dos horários oferecidos. Cada slot é um bloco de unidades de hora (M1..N5) em um dia,
+# disponível para um turno de curso (CCO diurno, SIN noturno). OFERTA diz, para cada turno, em que dias
+# ele tem aula e quais blocos oferece nesses dias; HORARIOS sai dela, e a tabela SLOTS é compilada uma vez
+# no carregamento do módulo. Tudo o que o solucionador usa no laço interno vem dela.
+# Para abrir um novo turno, por exemplo sábado de manhã, basta acrescentar o dia em DIAS e uma entrada
+# em OFERTA só com os blocos desse dia:  OFERTA.append((['SAB'], 'CCO', ['M1_M2', 'M3_M4']))
+# Os slots novos vão para o fim da tabela, então os ids dos slots existentes não mudam.
 
 DIAS = ['SEG', 'TER', 'QUA', 'QUI', 'SEX']
-SLOTS_TEMPO = []
+UNIDADES_HORA = ['M1', 'M2', 'M3', 'M4', 'T1', 'T2', 'T3', 'T4', 'N1', 'N2', 'N3', 'N4', 'N5']
+
+# (dias, turno, blocos): cada um dos blocos é oferecido ao turno em cada um dos dias.
+OFERTA = [
+    (['SEG', 'TER', 'QUA', 'QUI', 'SEX'], 'CCO', ['M3_M4', 'M1_M2', 'T1_T2', 'T3_T4']),
+    (['SEG', 'TER', 'QUA', 'QUI', 'SEX'], 'SIN', ['N1_N2', 'N3_N4', 'N3_N4_N5']),
+]
+HORARIOS = [(dia, turno, bloco) for dias, turno, blocos in OFERTA for dia in dias for bloco in blocos]
+TURNOS = list(dict.fromkeys(turno for _, turno, _ in OFERTA))
+
+# id: posição na tabela; nome: forma textual usada só em CSV/HTML (ex.: 'SEG_N3_N4_N5');
+# dia: índice em DIAS; mascara: um bit por (dia, unidade de hora), então dois slots se
+# sobrepõem se e só se o AND das máscaras for diferente de zero; duracao: horas-aula.
+Slot = namedtuple('Slot', ['id', 'nome', 'dia', 'turno', 'mascara', 'duracao'])
+
+#Um mesmo dia e bloco oferecido duas vezes é erro: os dois slots colidiriam em SLOT_POR_NOME.
+def compilar_slots(horarios):
+    slots = []
+    for dia, turno, bloco in horarios:
+        if f"{dia}_{bloco}" in (s.nome for s in slots): raise ValueError(f"slot {dia}_{bloco} oferecido duas vezes")
+        d = DIAS.index(dia)
+        unidades = bloco.split('_')
+        mascara = 0
+        for u in unidades:
+            mascara |= 1 << (d * len(UNIDADES_HORA) + UNIDADES_HORA.index(u))
+        slots.append(Slot(len(slots), f"{dia}_{bloco}", d, turno, mascara, len(unidades)))
+    return slots
+
+SLOTS = compilar_slots(HORARIOS)
+SLOT_POR_NOME = {s.nome: s.id for s in SLOTS}
 
 # Gera a linha do tempo linear, para o algoritmo de backtracking, que tentará
-# preencher um slot por vez. 
+# preencher um slot por vez. Cada passo junta o i-ésimo slot CCO e o i-ésimo slot SIN de um dia
+# (None quando o turno não tem mais blocos naquele dia).
+SLOTS_TEMPO = []
+
+slots_do_dia = defaultdict(list)
+for s in SLOTS:
+    slots_do_dia[(s.turno, s.dia)].append(s)
 
-max_len = max(len(SLOTS_CCO), len(SLOTS_SIN))
+max_len = max(len(lista) for lista in slots_do_dia.values())
 for i in range(max_len):
-    s_cco = SLOTS_CCO[i] if i < len(SLOTS_CCO) else ''
-    s_sin = SLOTS_SIN[i] if i < len(SLOTS_SIN) else ''
-    for dia in DIAS:
+    for d in range(len(DIAS)):
+        do_dia_cco = slots_do_dia[('CCO', d)]
+        do_dia_sin = slots_do_dia[('SIN', d)]
+        s_cco = do_dia_cco[i] if i < len(do_dia_cco) else None
+        s_sin = do_dia_sin[i] if i < len(do_dia_sin) else None
         if s_cco or s_sin:
-            SLOTS_TEMPO.append((dia, s_cco, s_sin))
+            SLOTS_TEMPO.append((d, s_cco, s_sin))
 
 
-#Funcão identifica matérias optativas e atribui 'Trilhas' (1 ou 2) para permitir paralelismo.
-def processar_trilhas_optativas(df):
- 
-    df['Tipo_Real'] = df['Nome'].apply(lambda x: 'OP' if '_OP_' in x else 'OB')
-    df['Trilha'] = None 
-
-    grupos = df[df['Tipo_Real'] == 'OP'].groupby(['Curso', 'Periodo'])
-
-    for (curso, periodo), grupo in grupos:
-        # Aplica trilhas apenas para períodos avançados (>= 5), onde optativas são mais comuns
-        if int(periodo) >= 5:
-            disciplinas_unicas = grupo['ID_Disciplina'].unique()
-            # Mapa simples: Disciplina A -> Trilha 1, Disciplina B -> Trilha 2, etc.
-            mapa_trilha = {disc: (i % 2) + 1 for i, disc in enumerate(disciplinas_unicas)}
-            for idx, row in grupo.iterrows():
-                df.at[idx, 'Trilha'] = mapa_trilha[row['ID_Disciplina']]
-                
-    print("Trilhas de optativas processadas com sucesso.")
-    return df
+# Slots que se sobrepõem a cada slot (incluindo ele mesmo): uma sala ocupada em um slot fica ocupada
+# em todos esses. E os grupos de sobreposição: componentes conexos dos slots que se sobrepõem, em que
+# as aulas disputam as mesmas salas (ex.: SEG_N3_N4 e SEG_N3_N4_N5).
+SLOTS_SOBREPOSTOS = [[t.id for t in SLOTS if t.mascara & s.mascara] for s in SLOTS]
 
+GRUPO_SOBREPOSICAO = list(range(len(SLOTS)))
+for s in SLOTS:
+    for t in SLOTS_SOBREPOSTOS[s.id]:
+        antigo, novo = GRUPO_SOBREPOSICAO[t], GRUPO_SOBREPOSICAO[s.id]
+        GRUPO_SOBREPOSICAO = [novo if g == antigo else g for g in GRUPO_SOBREPOSICAO]
+
+
+#Hash estável de um texto: ao contrário de hash(), não muda entre execuções do interpretador.
+def hash_estavel(texto):
+    return int.from_bytes(hashlib.sha256(str(texto).encode()).digest()[:8], 'big')
+
+
+#Semente de uma busca derivada da semente da execução e de uma chave (ex.: componente e trabalhador).
+#Buscas com chaves diferentes seguem sequências independentes, e execuções com sementes vizinhas não
+#repetem as buscas uma da outra (o que aconteceria com seed + w).
+def semente_derivada(seed, *chave):
+    return hash_estavel(repr((seed,) + chave)) % 2**31
+
+
+# Preferências dos professores, no formato de catalogo.carregar_preferencias: para cada professor,
+#   pesos: {horário: peso}; uma aula do professor num slot soma ao score o peso dos horários que contêm o
+#          slot inteiro (positivo = preferido, negativo = evitado), com o total limitado a ±PESO_MAXIMO;
+#   indisponivel: horários em que o professor não dá aula: nenhuma aula dele ocupa um slot que os toque;
+#   max_dias: dias da semana com aula, no máximo (None: sem limite).
+# Um horário é um slot (SEG_M1_M2), um dia (SEG), unidades de hora de um dia (SEG_N3_N4_N5) ou de todos
+# os dias (T3_T4). As preferências simuladas usam só pesos de ±PESO_PREFERENCIA.
+PESO_PREFERENCIA = 10
+PESO_MAXIMO = 100
 
 # Funcao gera preferências simuladas para professores, usamos uma função baseada no hash do nome para 
 # garantir reprodutibilidade , enquanto simulamos diversidade de horários (manhã/tarde vs noite).
 def gerar_preferencias_ficticias(df):
-    
-    
-    profs = df['Professor'].unique()
+    def preferencia(preferir, evitar):
+        pesos = {h: -PESO_PREFERENCIA for h in evitar}
+        pesos.update((h, PESO_PREFERENCIA) for h in preferir)
+        return {'pesos': pesos, 'indisponivel': [], 'max_dias': None}
+
+    profs = dict.fromkeys(df['Professor'])
     prefs = {}
     for p in profs:
         if 'CCO' in p:
             # Simula professores com preferência por turnos específicos (Manhã vs Tarde)
-            if hash(p) % 2 == 0: 
-                prefs[p] = {'preferir': [f"{d}_M2_M3" for d in DIAS], 'evitar': [f"{d}_T3_T4" for d in DIAS]}
+            if hash_estavel(p) % 2 == 0: 
+                prefs[p] = preferencia([f"{d}_M2_M3" for d in DIAS], [f"{d}_T3_T4" for d in DIAS])
             else: 
-                prefs[p] = {'preferir': [f"{d}_T3_T4" for d in DIAS], 'evitar': [f"{d}_M1_M2" for d in DIAS]}
+                prefs[p] = preferencia([f"{d}_T3_T4" for d in DIAS], [f"{d}_M1_M2" for d in DIAS])
         else:
-            # Preferências Noturnas para cursos noturnos (SIN)
-            prefs[p] = {'preferir': [f"{d}_N1_N2" for d in DIAS], 'evitar': [f"SEX_N3_N4", f"SEX_N3_N4_N5"]}
+            # Preferências Noturnas para cursos noturnos (SIN); SEX_N3_N4_N5 contém SEX_N3_N4 e o próprio bloco de 3h
+            prefs[p] = preferencia([f"{d}_N1_N2" for d in DIAS], ["SEX_N3_N4_N5"])
     return prefs
 
-def carregar_dados():
-    try: 
-        df = pd.read_csv(ARQUIVO_DADOS)
-        df = processar_trilhas_optativas(df)
-        return df
-    except Exception as e: 
-        print(f"Erro ao carregar dados: {e}")
-        return None
+
+#Unidades de hora de um horário das preferências, como máscara no formato de Slot.mascara (None se o
+#texto não é um horário).
+def mascara_horario(horario):
+    partes = horario.strip().upper().split('_')
+    dias = [DIAS.index(partes[0])] if partes[0] in DIAS else range(len(DIAS))
+    unidades = partes[1:] if partes[0] in DIAS else partes
+    if not unidades: unidades = UNIDADES_HORA
+    if any(u not in UNIDADES_HORA for u in unidades): return None
+    mascara = 0
+    for d in dias:
+        for u in unidades: mascara |= 1 << (d * len(UNIDADES_HORA) + UNIDADES_HORA.index(u))
+    return mascara
+
+
+#Slots de um horário das preferências: os ids dos que ele contém (recebem o peso) e a máscara (bit
+#slot.id) dos que ele toca (proibidos se o professor está indisponível no horário).
+def slots_do_horario(horario):
+    mascara = mascara_horario(horario) or 0
+    return ([s.id for s in SLOTS if not s.mascara & ~mascara], sum(1 << s.id for s in SLOTS if s.mascara & mascara))
+
+
+#Preferências de um caminho (None: as simuladas de gerar_preferencias_ficticias), com os horários e pesos
+#conferidos. São erros: um horário que não é um horário; um peso fora de ±PESO_MAXIMO ou num horário que
+#não contém nenhum slot (ex.: SEG_M1, que seria ignorado); Max_Dias acima do número de dias; e um peso
+#positivo num horário em que o professor está indisponível em todos os slots. Devolve (prefs, ok); ok é
+#False se houve erro.
+def ler_preferencias(caminho, df):
+    if caminho is None: return gerar_preferencias_ficticias(df), True
+    import catalogo
+    prefs = catalogo.carregar_preferencias(caminho)
+    if prefs is None: return None, False
+    def erro(mensagem, itens):
+        if itens: print(f"Erro: {mensagem}: {', '.join(itens[:10])}" + (" ..." if len(itens) > 10 else ""))
+        return bool(itens)
+
+    horarios = {h for p in prefs.values() for h in [*p['pesos'], *p['indisponivel']]}
+    if erro("horário(s) inválido(s) nas preferências", sorted(h for h in horarios if mascara_horario(h) is None)):
+        return None, False
+    slots = {h: slots_do_horario(h) for h in horarios}
+    contraditorios = []
+    for prof, p in prefs.items():
+        indisponivel = 0
+        for h in p['indisponivel']: indisponivel |= slots[h][1]
+        contraditorios += [f"{prof} ({h})" for h, peso in p['pesos'].items()
+                           if peso > 0 and all(indisponivel >> s & 1 for s in slots[h][0])]
+    if erro(f"pesos fora de ±{PESO_MAXIMO} nas preferências de",
+            sorted({prof for prof, p in prefs.items() for peso in p['pesos'].values() if abs(peso) > PESO_MAXIMO})) \
+            or erro("horário(s) com peso que não contêm nenhum slot",
+                    sorted({h for p in prefs.values() for h in p['pesos'] if not slots[h][0]})) \
+            or erro(f"Max_Dias acima de {len(DIAS)} nas preferências de",
+                    sorted(prof for prof, p in prefs.items() if (p['max_dias'] or 0) > len(DIAS))) \
+            or erro("peso positivo em horário em que o professor está indisponível", contraditorios):
+        return None, False
+    professores = set(df['Professor'])
+    print(f"Preferências de {len(prefs)} professor(es) lidas de '{caminho}'"
+          + (f"; {len(set(prefs) - professores)} fora do catálogo, ignorados." if set(prefs) - professores else "."))
+    return prefs, True
+
+#Lê o catálogo com os tipos de coluna e as trilhas de catalogo.py (o mesmo leitor da visualização).
+def carregar_dados(caminho=ARQUIVO_DADOS):
+    import catalogo
+    return catalogo.carregar_dados(caminho)
+
+
+def processar_trilhas_optativas(df):
+    import catalogo
+    return catalogo.processar_trilhas_optativas(df)
 
 
 #A função constrói o grafo:
@@ -92,15 +238,15 @@ def carregar_dados():
 
 #Depois da construção, implementa a lógica de restrições "Hard" do problema.
 #Se existe uma aresta entre A e B, A e B nunca terão o mesmo horário na solução final.
-def construir_grafos_multicamadas(df):
-    
-    
+def construir_grafo_conflitos(df):
+    import networkx as nx
+    import pandas as pd
+
     print("Construindo Grafo Multicamadas (Turma + Prof + Recurso)...")
     G = nx.Graph()
     
-    #adiciona cada aula como um vértice no grafo
-    for _, row in df.iterrows():
-        G.add_node(row['ID_Aula'], **row.to_dict())
+    #adiciona cada aula como um vértice no grafo, com as colunas da linha como atributos
+    G.add_nodes_from(zip(df['ID_Aula'], df.to_dict('records')))
     
     nodes = list(G.nodes(data=True))
     turmas = defaultdict(list)
@@ -126,7 +272,7 @@ def construir_grafos_multicamadas(df):
                 # Aqui temos a exceção das optativas de trilhas diferentes que permite paralelismo.
                 # se ambas forem optativas e estiverem em trilhas distintas, não tem conflito.
                 if tipo_u == 'OP' and tipo_v == 'OP':
-                    if trilha_u is not None and trilha_v is not None:
+                    if pd.notna(trilha_u) and pd.notna(trilha_v):
                         if trilha_u != trilha_v:
                             eh_conflito = False 
 
@@ -134,288 +280,1991 @@ def construir_grafos_multicamadas(df):
                     G.add_edge(u, v, tipo='Turma')
 
     #CAMADAS 2, 3: PROFESSOR E RECURSOS
-    for i in range(len(nodes)):
-        u, data_u = nodes[i]
-        for j in range(i + 1, len(nodes)):
-            v, data_v = nodes[j]
-            
-            #se já existe conflito de turma, não precisa verificar.)
-            if G.has_edge(u, v): continue
-            
-            # Só verifica conflitos entre cursos. (SIN vs SIN, CCO vs CCO)
-            eh_sin_u = 'SIN' in str(data_u['Curso'])
-            eh_sin_v = 'SIN' in str(data_v['Curso'])
-            
-            if eh_sin_u == eh_sin_v:
-                #conflito em que o mesmo professor não pode dar duas aulas ao mesmo tempo
-                if data_u['Professor'] == data_v['Professor']:
-                    G.add_edge(u, v, tipo='Professor')
-                
-                #conflito em que o mesmo lab não pode ser usado por 2 cursos ao mesmo tempo
-                if pd.notna(data_u['Lab_Requerido']) and pd.notna(data_v['Lab_Requerido']):
-                    if data_u['Lab_Requerido'] == data_v['Lab_Requerido']:
-                        G.add_edge(u, v, tipo='Recurso_Fisico')
+    # Só existe conflito entre aulas do mesmo turno (SIN vs SIN, CCO vs CCO) que dividem o mesmo
+    # professor ou o mesmo lab. Em vez de comparar todos os pares do catálogo, agrupamos as aulas
+    # por (turno, Professor) e (turno, Lab) e geramos arestas apenas dentro de cada grupo.
+    grupos_prof = defaultdict(list)
+    grupos_lab = defaultdict(list)
+    for nid, data in nodes:
+        eh_sin = 'SIN' in str(data['Curso'])
+        grupos_prof[(eh_sin, data['Professor'])].append(nid)
+        if pd.notna(data['Lab_Requerido']):
+            grupos_lab[(eh_sin, data['Lab_Requerido'])].append(nid)
+
+    #conflito em que o mesmo professor não pode dar duas aulas ao mesmo tempo
+    for membros in grupos_prof.values():
+        for u, v in combinations(membros, 2):
+            #se já existe conflito de turma, não precisa verificar.
+            if not G.has_edge(u, v):
+                G.add_edge(u, v, tipo='Professor')
+
+    #conflito em que o mesmo lab não pode ser usado por 2 cursos ao mesmo tempo
+    for membros in grupos_lab.values():
+        for u, v in combinations(membros, 2):
+            if G.get_edge_data(u, v, {}).get('tipo') != 'Turma':
+                G.add_edge(u, v, tipo='Recurso_Fisico')
 
 
     print(f"Grafo construído: {len(G.nodes)} nós, {len(G.edges)} arestas de conflito.")
+    return G
+
+
+#Índice compacto de conflitos usado pelo solucionador no lugar do grafo complemento.
+#Cada aula recebe um índice inteiro e um bitset (int do Python) com os índices das aulas
+#com que ela conflita. Um candidato é compatível com o clique inteiro se o AND entre seu
+#bitset e a máscara do clique for zero.
+class IndiceConflitos:
+
+    def __init__(self, G):
+        self.ids = list(G.nodes)
+        self.posicao = {nid: i for i, nid in enumerate(self.ids)}
+        vizinhos = [[] for _ in self.ids]
+        for u, v in G.edges:
+            iu, iv = self.posicao[u], self.posicao[v]
+            vizinhos[iu].append(iv)
+            vizinhos[iv].append(iu)
+        self.conflitos = [sum(1 << j for j in viz) for viz in vizinhos]
+
+    #Reconstrói o índice a partir da lista de ids e das arestas como pares de posições (ver arestas).
+    @classmethod
+    def de_arestas(cls, ids, arestas):
+        indice = cls.__new__(cls)
+        indice.ids = list(ids)
+        indice.posicao = {nid: i for i, nid in enumerate(indice.ids)}
+        conflitos = [0] * len(indice.ids)
+        for u, v in arestas:
+            conflitos[u] |= 1 << v
+            conflitos[v] |= 1 << u
+        indice.conflitos = conflitos
+        return indice
+
+    #Arestas do grafo de conflitos como pares (u, v) de posições, com u < v.
+    def arestas(self):
+        pares = []
+        for u, bits in enumerate(self.conflitos):
+            bits >>= u + 1
+            while bits:
+                menor = bits & -bits
+                pares.append((u, u + menor.bit_length()))
+                bits ^= menor
+        return pares
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def construir_grafos_multicamadas(df):
+    G = construir_grafo_conflitos(df)
     
-    #Retorna tanto o grafo de conflitos (G) quanto seu complemento (G_comp).
-    # O grafo complemento é usado para buscar Cliques, ou seja,
-    # um grupo de aulas que podem ser agendadas no mesmo horário.
-    return G, nx.complement(G)
+    #Retorna tanto o grafo de conflitos (G) quanto o índice compacto de conflitos.
+    # O índice é usado para buscar Cliques no complemento sem materializá-lo, ou seja,
+    # um grupo de aulas sem nenhuma aresta entre si, que podem ser agendadas no mesmo horário.
+    return G, IndiceConflitos(G)
+
+
+#Catálogo como colunas de listas do Python (nulos viram None), na ordem das linhas. É o que o cache
+#devolve (ver ler_cache_catalogo), para que uma execução com o catálogo no cache não precise do pandas,
+#e tem só o que o solucionador usa do DataFrame: colunas por nome, número de linhas e registros.
+class TabelaAulas:
+
+    def __init__(self, colunas):
+        self.colunas = colunas
+
+    @classmethod
+    def de_dataframe(cls, df):
+        return cls({nome: df[nome].astype(object).where(df[nome].notna(), None).tolist() for nome in df.columns})
+
+    def __getitem__(self, nome):
+        return self.colunas[nome]
+
+    def __contains__(self, nome):
+        return nome in self.colunas
+
+    def __len__(self):
+        return len(self.colunas['ID_Aula'])
+
+    #Linhas como dicionários coluna -> valor.
+    def registros(self):
+        nomes = list(self.colunas)
+        return [dict(zip(nomes, linha)) for linha in zip(*self.colunas.values())]
+
+
+#Catálogo (DataFrame ou TabelaAulas) como TabelaAulas.
+def tabela_aulas(df):
+    return df if isinstance(df, TabelaAulas) else TabelaAulas.de_dataframe(df)
+
+
+#Instância do problema pré-computada, construída uma única vez e compartilhada (somente leitura)
+#por todos os reinícios e processos. Cada aula é identificada pela sua posição no índice de
+#conflitos, e os atributos usados na busca viram listas indexadas por essa posição, com
+#professor, turma, lab e disciplina codificados como inteiros.
+class InstanciaProblema:
+
+    def __init__(self, indice, df, prefs, salas=None):
+        self.ids = indice.ids
+        self.posicao = indice.posicao
+        self.conflitos = indice.conflitos
+        n = len(self.ids)
+
+        # Colunas do catálogo na ordem do índice de conflitos, como listas do Python (nulos viram None).
+        tabela = tabela_aulas(df)
+        linha = {nid: k for k, nid in enumerate(tabela['ID_Aula'])}
+        ordem = [linha[nid] for nid in self.ids]
+        def coluna(nome, padrao=None):
+            if nome not in tabela: return [padrao] * n
+            valores = tabela[nome]
+            return [valores[k] for k in ordem]
+        cursos = coluna('Curso')
+
+        # Codifica valores como inteiros 0..k-1 (None vira -1) e devolve também a lista de nomes.
+        def codificar(valores):
+            codigos = {}
+            lista = [codigos.setdefault(v, len(codigos)) if v is not None else -1 for v in valores]
+            return lista, list(codigos)
+
+        self.prof, self.nomes_prof = codificar(coluna('Professor'))
+        self.turma, self.nomes_turma = codificar(zip(cursos, coluna('Periodo')))
+        self.disciplina, self.nomes_disciplina = codificar(coluna('ID_Disciplina'))
+        self.lab, self.nomes_lab = codificar(coluna('Lab_Requerido'))
+
+        self.duracao = [int(c) for c in coluna('CH_Aula')]
+        self.eh_sin = ['SIN' in str(c) for c in cursos]
+
+        # Trilha usada no índice de ocupação: só optativas com trilha definida podem dividir horário
+        # com a própria turma. None indica que a aula conflita com qualquer aula da turma.
+        self.trilha = [int(t) if tipo == 'OP' and t is not None else None
+                       for tipo, t in zip(coluna('Tipo_Real', 'OB'), coluna('Trilha'))]
+
+        # Prioridade: professores com muitas aulas são mais difíceis de alocar.
+        total_aulas_prof = defaultdict(int)
+        for p in self.prof: total_aulas_prof[p] += 1
+
+        # Preferências compiladas por professor (ver gerar_preferencias_ficticias), na ordem de nomes_prof:
+        #   peso_prof: tabela densa (professor × slot), achatada na posição p * n_slots + slot.id;
+        #   disponivel_prof: máscara dos slots (bit slot.id) em que o professor pode dar aula;
+        #   max_dias: dias com aula na semana, no máximo (0: sem limite).
+        # Cada horário é resolvido uma única vez para os slots que contém e os que toca, então a compilação
+        # custa O(linhas das preferências + professores × slots). Horários sem slot (só nas preferências
+        # simuladas; ler_preferencias os recusa com peso) são ignorados.
+        self.n_slots = len(SLOTS)
+        n_profs = len(self.nomes_prof)
+        self.peso_prof = array('h', bytes(2 * n_profs * self.n_slots))
+        self.disponivel_prof = [(1 << self.n_slots) - 1] * n_profs
+        self.max_dias = [0] * n_profs
+        horarios = {}
+        def slots(h):
+            if h not in horarios: horarios[h] = slots_do_horario(h)
+            return horarios[h]
+        for p, nome in enumerate(self.nomes_prof):
+            prefs_prof = prefs.get(nome)
+            if not prefs_prof: continue
+            linha = [0] * self.n_slots
+            for h, peso in prefs_prof['pesos'].items():
+                for s in slots(h)[0]: linha[s] += peso
+            self.peso_prof[p * self.n_slots:(p + 1) * self.n_slots] = \
+                array('h', (max(-PESO_MAXIMO, min(PESO_MAXIMO, peso)) for peso in linha))
+            for h in prefs_prof['indisponivel']: self.disponivel_prof[p] &= ~slots(h)[1]
+            self.max_dias[p] = prefs_prof['max_dias'] or 0
+
+        # Tabelas (aula × slot) pré-computadas, achatadas na posição i * n_slots + slot.id:
+        #   delta_pref: variação do score global ao alocar a aula no slot (o peso do professor no slot);
+        #   prioridade: pontuação de encontrar_clique_maximal (preferência do professor + carga). Um slot
+        #   neutro vale 10, cada ponto de peso positivo soma 9 (peso 10 = 100) e cada ponto negativo tira 1,
+        #   até 0.
+        # As linhas só dependem do professor, então cada linha é montada uma vez por professor e copiada.
+        linhas_delta, linhas_prioridade = [], []
+        for p in range(n_profs):
+            linha = self.peso_prof[p * self.n_slots:(p + 1) * self.n_slots]
+            linhas_delta.append(linha)
+            linhas_prioridade.append(array('d', ((10 + 9 * peso if peso > 0 else max(0, 10 + peso))
+                                                 + total_aulas_prof[p] * 0.5 for peso in linha)))
+        self.delta_pref = array('h')
+        self.prioridade = array('d')
+        for p in self.prof:
+            self.delta_pref.extend(linhas_delta[p])
+            self.prioridade.extend(linhas_prioridade[p])
+
+        # Popularidade de cada slot: professores com peso positivo nele (ver ordenar_slots_por_popularidade).
+        self.popularidade_slot = [sum(1 for p in range(n_profs) if self.peso_prof[p * self.n_slots + s] > 0)
+                                  for s in range(self.n_slots)]
+
+        # Slots em que cada aula pode ser alocada (turno, duração e disponibilidade do professor), e a
+        # mesma informação como máscara (bit slot.id), compartilhados entre aulas iguais. Os slots em que o
+        # professor está indisponível saem aqui, antes de qualquer filtro da busca; sem_horario lista as
+        # aulas que ficam sem nenhum slot (a instância fica inviável).
+        slots_por_tipo = {}
+        for sin, duracao, disponivel in set(zip(self.eh_sin, self.duracao, (self.disponivel_prof[p] for p in self.prof))):
+            slots = [s for s in SLOTS if (s.turno == 'SIN') == sin and s.duracao == duracao and disponivel >> s.id & 1]
+            slots_por_tipo[(sin, duracao, disponivel)] = (slots, sum(1 << s.id for s in slots))
+        tipos = [slots_por_tipo[(self.eh_sin[i], self.duracao[i], self.disponivel_prof[self.prof[i]])] for i in range(n)]
+        self.slots_aula = [slots for slots, _ in tipos]
+        self.mascara_slots = [mascara for _, mascara in tipos]
+        self.sem_horario = [self.ids[i] for i in range(n) if not self.slots_aula[i]]
+
+        # Matriz de elegibilidade (slot × aula): True se a aula pode ocupar o slot (turno e duração).
+        # A última linha fica toda False e representa a ausência de slot (índice -1). O numpy é
+        # obrigatório (ver carregar_catalogo).
+        import numpy as np
+        self.elegiveis_slot = np.zeros((len(SLOTS) + 1, n), dtype=bool)
+        for i in range(n):
+            for s in self.slots_aula[i]: self.elegiveis_slot[s.id, i] = True
+
+        # Maior delta que cada aula ainda pode somar (entre os slots em que pode ser alocada), usado
+        # como limite superior do score das aulas que faltam alocar.
+        self.max_delta = [max((self.delta_pref[i * self.n_slots + s.id] for s in self.slots_aula[i]), default=0)
+                          for i in range(n)]
+        self.potencial_total = sum(self.max_delta)
+
+        # Salas (opcional, ver catalogo.carregar_salas): salas_aula[i] é a máscara das salas em que a aula
+        # pode ocorrer, com bit r = r-ésima sala em ordem de capacidade, então o bit mais baixo de uma
+        # máscara de salas livres é a menor sala que serve. Aulas de lab vão para a sala do próprio lab
+        # (se ele está no cadastro; senão não recebem sala, como antes) e as demais, para as salas comuns
+        # com capacidade e recursos suficientes. A máscara 0 indica que a aula não disputa sala, e
+        # sem_sala lista as aulas que não cabem em nenhuma (a instância fica inviável).
+        self.nomes_sala, self.capacidade_sala = [], []
+        self.salas_aula = [0] * n
+        self.sem_sala = []
+        if salas:
+            import catalogo
+            self.nomes_sala = [sala['Sala'] for sala in salas]
+            self.capacidade_sala = [sala['Capacidade'] for sala in salas]
+            recursos_sala = [catalogo.recursos(sala['Recursos']) for sala in salas]
+            labs = set(self.nomes_lab)
+            comuns = [r for r, nome in enumerate(self.nomes_sala) if nome not in labs]
+            por_nome = {nome: r for r, nome in enumerate(self.nomes_sala)}
+            mascaras = {}
+            for i, (alunos, exigidos) in enumerate(zip(coluna('Alunos', 0), coluna('Recursos'))):
+                chave = (self.lab[i], int(alunos or 0), catalogo.recursos(exigidos))
+                if chave not in mascaras:
+                    lab, minimo, exigidos = chave
+                    if lab >= 0:
+                        opcoes = [por_nome[self.nomes_lab[lab]]] if self.nomes_lab[lab] in por_nome else None
+                    else:
+                        opcoes = comuns
+                    mascaras[chave] = None if opcoes is None else \
+                        sum(1 << r for r in opcoes if self.capacidade_sala[r] >= minimo and exigidos <= recursos_sala[r])
+                if mascaras[chave] is None: continue
+                self.salas_aula[i] = mascaras[chave]
+                if not mascaras[chave]: self.sem_sala.append(self.ids[i])
+        self.todas_salas = (1 << len(self.nomes_sala)) - 1
+
+        self.aulas = frozenset(range(n))
+
+    def __len__(self):
+        return len(self.ids)
+
+
+#salas: cadastro de salas (ver catalogo.carregar_salas); None deixa as aulas sem sala, como antes.
+def construir_instancia(df, prefs, indice=None, salas=None):
+    if indice is None:
+        G, indice = construir_grafos_multicamadas(df)
+    return InstanciaProblema(indice, df, prefs, salas)
+
+
+#Catálogo processado (com as trilhas) e índice de conflitos do CSV. O resultado fica em um .npz em
+#pasta_cache com nome dado pelo hash do conteúdo do CSV e por VERSAO_REGRAS, então um CSV igual pula
+#direto para a busca e qualquer mudança no arquivo ou nas regras gera um cache novo.
+#Retorna (df, indice), ou (None, None) se o CSV não pôde ser carregado ou se falta o numpy, que o cache,
+#o pandas e a busca exigem.
+def carregar_catalogo(caminho=ARQUIVO_DADOS, usar_cache=True, pasta_cache=PASTA_CACHE, tempos=None):
+    if importlib.util.find_spec('numpy') is None:
+        print("Erro: o solucionador precisa do pacote 'numpy' (pip install numpy).")
+        return None, None
+    if tempos is None: tempos = {}
+    inicio = time.perf_counter()
+    try:
+        with open(caminho, 'rb') as f: conteudo = f.read()
+    except Exception as e:
+        print(f"Erro ao carregar dados: {e}")
+        return None, None
+    chave = hashlib.sha256(conteudo + f"|regras={VERSAO_REGRAS}|formato={FORMATO_CACHE}".encode()).hexdigest()[:16]
+    arquivo_cache = os.path.join(pasta_cache, f"catalogo_{chave}.npz")
+
+    if usar_cache and os.path.exists(arquivo_cache):
+        try:
+            df, indice = ler_cache_catalogo(arquivo_cache)
+            tempos['leitura_cache'] = time.perf_counter() - inicio
+            print(f"Catálogo e grafo de conflitos lidos do cache ({len(df)} aulas).")
+            return df, indice
+        except Exception as e:
+            print(f"Cache ignorado ({e}).")
+
+    inicio = time.perf_counter()
+    df = carregar_dados(caminho)
+    if df is None: return None, None
+    tempos['leitura_csv'] = time.perf_counter() - inicio
+    G, indice = construir_grafos_multicamadas(df)
+    tempos['grafo'] = time.perf_counter() - inicio - tempos['leitura_csv']
+    if usar_cache:
+        inicio = time.perf_counter()
+        try:
+            os.makedirs(pasta_cache, exist_ok=True)
+            gravar_cache_catalogo(arquivo_cache, df, indice)
+        except OSError as e:
+            print(f"Não foi possível gravar o cache: {e}")
+        tempos['gravacao_cache'] = time.perf_counter() - inicio
+    return df, indice
+
+
+#Formato do .npz: uma entrada por coluna do catálogo, mais a máscara de nulos da coluna, o esquema
+#(tipo de cada coluna) em JSON e as arestas do índice de conflitos como uma matriz (E, 2) de int32.
+#Colunas categóricas guardam os códigos e as categorias; numéricas, os valores com o próprio tipo
+#(inteiros anuláveis, como Trilha, com zero no lugar dos nulos); as demais viram arrays de unicode.
+def gravar_cache_catalogo(arquivo_cache, df, indice):
+    import numpy as np
+    import pandas as pd
+
+    arrays, esquema = {}, []
+    for n, coluna in enumerate(df.columns):
+        serie = df[coluna]
+        nulos = serie.isna().to_numpy()
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            tipo, valores = 'categoria', serie.cat.codes.to_numpy()
+            arrays[f"categorias_{n}"] = serie.cat.categories.astype(str).to_numpy(dtype=str)
+        elif serie.dtype.kind in 'iufb':
+            tipo = str(serie.dtype)
+            valores = serie.to_numpy(dtype=getattr(serie.dtype, 'numpy_dtype', serie.dtype), na_value=0)
+        else:
+            tipo, valores = 'texto', serie.where(~nulos, '').astype(str).to_numpy(dtype=str)
+        esquema.append((coluna, tipo))
+        arrays[f"coluna_{n}"] = valores
+        arrays[f"nulos_{n}"] = nulos
+    arrays['esquema'] = np.array(json.dumps(esquema))
+    arrays['arestas'] = np.array(indice.arestas(), dtype=np.int32).reshape(-1, 2)
+    # Grava em arquivo temporário e renomeia, para um cache interrompido nunca ser lido pela metade.
+    temporario = arquivo_cache + ".tmp.npz"
+    np.savez(temporario, **arrays)
+    os.replace(temporario, arquivo_cache)
+
+
+#Lê o cache como TabelaAulas, sem o pandas: categorias voltam como texto e os nulos, como None.
+def ler_cache_catalogo(arquivo_cache):
+    import numpy as np
+
+    with np.load(arquivo_cache, allow_pickle=False) as dados:
+        colunas = {}
+        for n, (coluna, tipo) in enumerate(json.loads(str(dados['esquema']))):
+            valores, nulos = dados[f"coluna_{n}"].tolist(), dados[f"nulos_{n}"].tolist()
+            if tipo == 'categoria':
+                categorias = dados[f"categorias_{n}"].tolist()
+                valores = [categorias[c] if c >= 0 else None for c in valores]
+            colunas[coluna] = [None if nulo else v for v, nulo in zip(valores, nulos)]
+        df = TabelaAulas(colunas)
+        indice = IndiceConflitos.de_arestas(df['ID_Aula'], dados['arestas'].tolist())
+    return df, indice
+
+
+#Particiona as aulas em componentes independentes, que podem ser resolvidos separadamente e ter as
+#grades unidas no final. Duas aulas ficam no mesmo componente se dividem turma, disciplina, lab no
+#mesmo turno (as camadas do grafo de conflitos e a regra de um dia por disciplina), professor, em
+#qualquer turno, por causa do limite diário de horas, ou salas no mesmo turno, que são disputadas por
+#todas as aulas que as aceitam. Devolve os componentes do maior para o menor.
+def decompor_componentes(instancia):
+    pai = list(range(len(instancia)))
+
+    def raiz(i):
+        while pai[i] != i:
+            pai[i] = pai[pai[i]]
+            i = pai[i]
+        return i
+
+    primeiro = {}
+    for i in range(len(instancia)):
+        chaves = [('prof', instancia.prof[i]), ('turma', instancia.turma[i]), ('disciplina', instancia.disciplina[i])]
+        if instancia.lab[i] >= 0: chaves.append(('lab', instancia.eh_sin[i], instancia.lab[i]))
+        if instancia.salas_aula[i]: chaves.append(('salas', instancia.eh_sin[i]))
+        for chave in chaves:
+            j = primeiro.setdefault(chave, i)
+            pai[raiz(i)] = raiz(j)
+
+    componentes = defaultdict(set)
+    for i in range(len(instancia)):
+        componentes[raiz(i)].add(i)
+    return sorted((frozenset(c) for c in componentes.values()), key=len, reverse=True)
+
+
+#Nome curto de um componente para os relatórios: turno(s) das aulas e tamanho.
+def nome_componente(instancia, componente):
+    turnos = sorted({'SIN' if instancia.eh_sin[i] else 'CCO' for i in componente})
+    return f"{'+'.join(turnos)} ({len(componente)} aulas)"
 
 
 #Classe responsável por encontrar uma alocação válida de horários para as aulas.
 #Utiliza uma abordagem baseada em Coloração de Grafos/Clique Maximal combinada junto Backtracking.
+#Todo o estado da busca é por execução e é zerado por reset(); a instância nunca é alterada,
+#então o mesmo solucionador é reaproveitado entre os reinícios aleatórios.
 
 
 class SolucionadorTimetabling:
    
-    def __init__(self, G_comp, df, prefs):
-        self.G_comp = G_comp  # grafo complemento
-        self.mapa = df.set_index('ID_Aula').to_dict('index') #acesso dados da aula
-        self.prefs = prefs #preferências
-        self.grade = {} # solução parcial ou final
-        
-        # auxiliares para validação rápida de carga horaria de prof e total de aulas
-        self.carga_prof = defaultdict(lambda: defaultdict(int)) # carga horária diária do professor
-        self.total_aulas_prof = df['Professor'].value_counts().to_dict() # prioridade
+    #seed: semente do gerador aleatório próprio do solucionador (None: semente do sistema).
+    def __init__(self, instancia, seed=None):
+        self.inst = instancia
+        self.rng = random.Random(seed)
+        self.cache_linha = None
+        self.reset()
+
+    #aulas: aulas que serão alocadas (por padrão, todas); define o potencial inicial do score.
+    def reset(self, aulas=None):
+        inst = self.inst
+        self.grade = {} # solução parcial ou final (posição da aula -> id do slot em SLOTS)
+
+        # Score de preferências da grade parcial e o máximo que as aulas restantes ainda podem somar.
+        self.score = 0
+        self.potencial = inst.potencial_total if aulas is None else sum(inst.max_delta[i] for i in aulas)
         
+        # auxiliar para validação rápida de carga horaria de prof: (professor * dias + dia) -> horas
+        self.carga_prof = [0] * (len(inst.nomes_prof) * len(DIAS))
+        # dias da semana com aula de cada professor (um bit por dia), para o limite max_dias
+        self.dias_prof = [0] * len(inst.nomes_prof)
+
+        # Índice de ocupação incremental da grade, atualizado em dfs_slots ao alocar e ao desfazer.
+        # Cada entrada é uma máscara de unidades de hora ocupadas, no mesmo formato de Slot.mascara.
+        self.ocupacao_prof = [0] * len(inst.nomes_prof)            # professor -> unidades ocupadas
+        self.ocupacao_turma = [{} for _ in inst.nomes_turma]       # turma -> {trilha: unidades ocupadas}
+        self.ocupacao_lab = [0] * len(inst.nomes_lab)              # lab -> unidades ocupadas
+        self.dias_disciplina = [0] * len(inst.nomes_disciplina)    # disciplina -> bits dos dias já usados
+
+        # Índice de salas livres: para cada slot, a máscara das salas livres nele (uma sala ocupada em um
+        # slot sai de todos os slots que se sobrepõem a ele), e para cada sala as unidades ocupadas.
+        # Cada alocação escolhe a sala com um AND e o bit mais baixo, sem arestas de recurso no grafo.
+        self.salas_livres = [inst.todas_salas] * len(SLOTS)         # slot -> salas livres
+        self.ocupacao_sala = [0] * len(inst.nomes_sala)             # sala -> unidades ocupadas
+        self.sala = {}                                              # aula -> sala (índice)
+
+        # Contadores da busca: nós visitados, decisões desfeitas, backjumps que pularam níveis,
+        # profundidade máxima da pilha, interrupções pelo prazo, podas pelo limitante de score e
+        # movimentos aceitos pela busca local.
+        self.estatisticas = {'nos': 0, 'backtracks': 0, 'saltos': 0, 'profundidade_max': 0, 'interrompidas': 0,
+                             'podas': 0, 'movimentos': 0}
+
+
+    #O score é mantido incrementalmente por atualizar_ocupacao, sem varrer a grade.
     def calcular_pontuacao_global(self):
-        score = 0
-        for id_aula, horario in self.grade.items():
-            prof = self.mapa[id_aula]['Professor']
-            prefs_prof = self.prefs.get(prof, {})
-            
-            if horario in prefs_prof.get('preferir', []): score += 10
-            elif horario in prefs_prof.get('evitar', []): score -= 10
-        return score
-
-    def slots_overlap(self, s1, s2):
-        d1, h1 = s1.split('_', 1)
-        d2, h2 = s2.split('_', 1)
-        if d1 != d2: return False
-        set1 = set(h1.split('_'))
-        set2 = set(h2.split('_'))
-        return not set1.isdisjoint(set2)
+        return self.score
 
-    
-    
-    
+    #Menor sala livre para a aula i no slot, fora das salas em reservadas, como máscara de um bit (0 se
+    #não há nenhuma).
+    def sala_livre(self, i, slot, reservadas=0):
+        livres = self.salas_livres[slot.id] & self.inst.salas_aula[i] & ~reservadas
+        return livres & -livres
+
+    #Registra (alocar=True) ou remove (alocar=False) uma aula alocada na grade, mantendo o score, a
+    #carga diária do professor e o índice de ocupação. Como aulas que dividem professor, turma/trilha ou
+    #lab nunca se sobrepõem na grade, cada remoção pode simplesmente apagar os bits do slot.
+    #A aula recebe a menor sala livre que serve (se disputa sala), ou a sala dada (índice); ao sair, a
+    #sala volta a ficar livre nos slots sobrepostos em que nenhuma outra aula a ocupa.
+    def atualizar_ocupacao(self, i, slot, alocar, sala=None):
+        inst = self.inst
+        turma = self.ocupacao_turma[inst.turma[i]]
+        trilha = inst.trilha[i]
+        lab = inst.lab[i]
+        carga = inst.prof[i] * len(DIAS) + slot.dia
+        if alocar:
+            self.grade[i] = slot.id
+            self.score += inst.delta_pref[i * inst.n_slots + slot.id]
+            self.potencial -= inst.max_delta[i]
+            self.carga_prof[carga] += inst.duracao[i]
+            self.dias_prof[inst.prof[i]] |= 1 << slot.dia
+            self.ocupacao_prof[inst.prof[i]] |= slot.mascara
+            turma[trilha] = turma.get(trilha, 0) | slot.mascara
+            if lab >= 0: self.ocupacao_lab[lab] |= slot.mascara
+            self.dias_disciplina[inst.disciplina[i]] |= 1 << slot.dia
+            if inst.salas_aula[i]:
+                bit = self.sala_livre(i, slot) if sala is None else 1 << sala
+                if bit:
+                    self.sala[i] = bit.bit_length() - 1
+                    self.ocupacao_sala[self.sala[i]] |= slot.mascara
+                    livres = self.salas_livres
+                    for t in SLOTS_SOBREPOSTOS[slot.id]: livres[t] &= ~bit
+        else:
+            del self.grade[i]
+            self.score -= inst.delta_pref[i * inst.n_slots + slot.id]
+            self.potencial += inst.max_delta[i]
+            self.carga_prof[carga] -= inst.duracao[i]
+            if not self.carga_prof[carga]: self.dias_prof[inst.prof[i]] &= ~(1 << slot.dia)
+            self.ocupacao_prof[inst.prof[i]] &= ~slot.mascara
+            turma[trilha] &= ~slot.mascara
+            if lab >= 0: self.ocupacao_lab[lab] &= ~slot.mascara
+            self.dias_disciplina[inst.disciplina[i]] &= ~(1 << slot.dia)
+            sala = self.sala.pop(i, None)
+            if sala is not None:
+                self.ocupacao_sala[sala] &= ~slot.mascara
+                ocupada, bit = self.ocupacao_sala[sala], 1 << sala
+                for t in SLOTS_SOBREPOSTOS[slot.id]:
+                    if not ocupada & SLOTS[t].mascara: self.salas_livres[t] |= bit
+
+    #Verifica a aula contra a grade já alocada usando o índice de ocupação.
+    #Um problema como uma aula de 3h (N3_N4_N5) conflita com uma de 2h (N3_N4) mesmo não sendo o mesmo
+    #slot exato; como o índice guarda unidades de hora, isso vira um AND de máscaras.
+    #Devolve o motivo do conflito ('disciplina_dia', 'professor', 'turma', 'lab' ou 'sala'), ou None se não há.
+    def conflita_com_grade(self, i, slot):
+        inst = self.inst
+        
+        #Evita que a mesma matéria (Turma A e B) ocorra no mesmo dia
+        if self.dias_disciplina[inst.disciplina[i]] >> slot.dia & 1: return 'disciplina_dia'
+        
+        #O mesmo professor não pode estar em dois slots sobrepostos
+        if self.ocupacao_prof[inst.prof[i]] & slot.mascara: return 'professor'
+        
+        # Verifica conflito de grade para os alunos. Optativas de trilhas diferentes podem
+        # ocorrer em paralelo, então só conflitam com obrigatórias ou com a mesma trilha.
+        turma = self.ocupacao_turma[inst.turma[i]]
+        if turma:
+            trilha = inst.trilha[i]
+            if trilha is None:
+                if any(m & slot.mascara for m in turma.values()): return 'turma'
+            elif (turma.get(None, 0) | turma.get(trilha, 0)) & slot.mascara: return 'turma'
+        
+        #O mesmo lab não pode ser usado por duas aulas sobrepostas
+        lab = inst.lab[i]
+        if lab >= 0 and self.ocupacao_lab[lab] & slot.mascara: return 'lab'
+
+        #Precisa de uma sala livre que sirva (capacidade e recursos)
+        if inst.salas_aula[i] and not self.sala_livre(i, slot): return 'sala'
+        return None
+
+    # Prioriza aulas de professores que PREFEREM este horário
+    # e professores com muitas aulas, pois são mais dificeis de alocar.
+    def pontuacao(self, i, slot):
+        return self.inst.prioridade[i * self.inst.n_slots + slot.id]
+
+    #Limites do professor da aula i no dia do slot: devolve 'carga_prof' se passaria de 8 horas de aula
+    #no dia, 'dias_prof' se seria um dia novo além do seu max_dias, ou None.
+    def excede_limites_prof(self, i, slot):
+        inst = self.inst
+        prof = inst.prof[i]
+        if self.carga_prof[prof * len(DIAS) + slot.dia] + inst.duracao[i] > 8: return 'carga_prof'
+        limite = inst.max_dias[prof]
+        if limite and not self.dias_prof[prof] >> slot.dia & 1 and self.dias_prof[prof].bit_count() >= limite:
+            return 'dias_prof'
+        return None
+
+    #A aula pode ser colocada no slot sem violar a grade já alocada?
+    def cabe_no_slot(self, i, slot):
+        #Restrição Hard, professor não pode exceder 8 horas de aula no mesmo dia nem o seu limite de dias
+        if self.excede_limites_prof(i, slot): return False
+        # Validacoes cruzadas contra a grade já alocada
+        return not self.conflita_com_grade(i, slot)
        
     #Funcao que encontra um conjunto de aulas (clique) que podem ser agendadas simultaneamente
         
     #Filtra candidatos válidos.
     #Ordena por uma 'pontuação'/heuristica (preferência do professor + carga).
     #Constrói o clique de forma gulosa, adicionando a aula se ela for compatível com todas já adicionadas.
+    #Cada candidato é avaliado no slot do seu turno (slot_cco ou slot_sin), que compartilham o mesmo dia.
         
-    def encontrar_clique_maximal(self, candidatos, dia, slot_nome):
+    def encontrar_clique_maximal(self, candidatos, slot_cco, slot_sin):
+        inst = self.inst
         candidatos_lista = list(candidatos)
         # shuffle coloca aleatoriedade para explorar diferentes ramos da árvore de soluções em execuções distintas
-        random.shuffle(candidatos_lista)
-        
-        def pontuacao(nid):
-            # Prioriza aulas de professores que PREFEREM este horário
-            # e professores com muitas aulas, pois são mais dificeis de alocar.
-            prof = self.mapa[nid]['Professor']
-            p = self.prefs.get(prof, {})
-            score = 10
-            if slot_nome in p.get('preferir', []): score = 100
-            if slot_nome in p.get('evitar', []): score = 0
-            carga = self.total_aulas_prof.get(prof, 0)
-            return score + (carga * 0.5)
-
-        fila = sorted(candidatos_lista, key=pontuacao, reverse=True)
+        self.rng.shuffle(candidatos_lista)
         
+        fila = sorted(candidatos_lista, key=lambda i: self.pontuacao(i, slot_sin if inst.eh_sin[i] else slot_cco),
+                      reverse=True)
+        return self.montar_clique(fila, slot_cco, slot_sin)
+
+    #Percorre a fila em ordem e adiciona cada aula que cabe na grade e não conflita com o clique.
+    #As salas escolhidas pelos membros do clique ficam reservadas (por slot) até o clique ser aplicado,
+    #na mesma ordem, por atualizar_ocupacao, que então escolhe as mesmas salas.
+    def montar_clique(self, fila, slot_cco, slot_sin):
+        inst = self.inst
         clique = []
-        for node in fila:
-            prof = self.mapa[node]['Professor']
-            duracao = self.mapa[node]['CH_Aula'] 
+        mascara_clique = 0
+        reservadas = {}
+        for i in fila:
+            slot = slot_sin if inst.eh_sin[i] else slot_cco
+            if self.motivo_rejeicao(i, slot, mascara_clique, reservadas): continue
+            clique.append(i)
+            mascara_clique |= 1 << i
             
-            #Restrição Hard, professor não pode exceder 8 horas de aula no mesmo dia
-            if self.carga_prof[prof][dia] + duracao > 8: continue
+        return clique
+
+    #Por que a aula i não entra no clique em montar_clique: 'clique' (conflita com um membro), o motivo de
+    #excede_limites_prof ou de conflita_com_grade, 'sala' (as salas que a servem já foram reservadas pelo
+    #clique) ou None. Com None, a sala escolhida fica reservada em `reservadas`.
+    def motivo_rejeicao(self, i, slot, mascara_clique, reservadas):
+        inst = self.inst
+        # Checa compatibilidade com o Clique atual
+        # Basta um AND entre os conflitos do vértice e a máscara do clique: qualquer bit em comum
+        # é um membro com quem ele tem aresta no grafo original.
+        if inst.conflitos[i] & mascara_clique: return 'clique'
+
+        motivo = self.excede_limites_prof(i, slot) or self.conflita_com_grade(i, slot)
+        if motivo: return motivo
+
+        if inst.salas_aula[i]:
+            sala = self.sala_livre(i, slot, reservadas.get(slot.id, 0))
+            if not sala: return 'sala'
+            reservadas[slot.id] = reservadas.get(slot.id, 0) | sala
+        return None
+
+
+    #Interrompe a busca quando o prazo (time.time() absoluto) passou ou o token de cancelamento
+    #(qualquer objeto com is_set(), como multiprocessing.Event) foi acionado.
+    def deve_parar(self, prazo, parar):
+        if prazo is not None and time.time() >= prazo: return True
+        return parar is not None and parar.is_set()
+
+    #Poda por limitante: mesmo que cada aula restante caísse no seu melhor slot, a grade não
+    #superaria limite_score (o melhor score já encontrado), então a tentativa pode ser abandonada.
+    def sem_chance(self, limite_score):
+        return limite_score is not None and self.score + self.potencial <= limite_score
+
+
+    #DFS para alocar aulas nos slots de tempo, com pilha explícita em vez de recursão.
+    #Parametros:
+        #idx: Índice do slot de tempo inicial.
+        #restantes: Conjunto de posições das aulas que ainda precisam ser alocadas.
+        #prazo, parar: limite de tempo e token de cancelamento, verificados a cada
+        #              INTERVALO_VERIFICACAO nós da busca.
+        #limite_score: score a superar; a busca é podada quando não há mais como superá-lo.
+    #Cada nó é um passo de SLOTS_TEMPO; a pilha guarda as decisões (cliques) já tomadas, de modo
+    #que a profundidade da busca não depende mais do limite de recursão do Python.
+    #Obs: Esta busca é um híbrido Guloso/DFS. Ela é gulosa na escolha do clique por slot, então
+    #uma falha desfaz toda a pilha e a diversidade vem dos reinícios aleatórios.
+
+    #Filtra quais aulas pendentes podem ocorrer no passo (duração e tipo de curso, CCO ou SIN): um AND
+    #entre o vetor de pendentes e as linhas de elegibilidade dos dois slots, em ordem crescente de aula.
+    def filtrar_candidatos(self, pendentes, s_cco, s_sin):
+        inst = self.inst
+        elegiveis = inst.elegiveis_slot[s_cco.id if s_cco else -1] | inst.elegiveis_slot[s_sin.id if s_sin else -1]
+        return (pendentes & elegiveis).nonzero()[0].tolist()
+
+    def dfs_slots(self, idx, restantes, prazo=None, parar=None, limite_score=None):
+        inst = self.inst
+        est = self.estatisticas
+        # Aulas restantes como vetor booleano (posição i = aula i ainda não alocada)
+        pendentes = inst.elegiveis_slot[-1].copy()
+        pendentes[list(restantes)] = True
+        n_pendentes = len(restantes)
+        pilha = []
+
+        while True:
+            #Poda: nem alocando o restante nos melhores slots a grade supera limite_score
+            if self.sem_chance(limite_score):
+                est['podas'] += 1
+                break
+            #Caso base, se não há mais aulas para alocar
+            if not n_pendentes: return True
             
-            # Checa compatibilidade com o Clique atual
-            # Se vértice não é vizinho de 'membro' no grafo complemento, eles conflitam no grafo original.
-            compativel = True
-            for membro in clique:
-                if not self.G_comp.has_edge(node, membro):
-                    compativel = False; break
-            if not compativel: continue
+            est['nos'] += 1
+            if est['nos'] % INTERVALO_VERIFICACAO == 0 and self.deve_parar(prazo, parar):
+                est['interrompidas'] += 1
+                break
+            #Caso base, se acabaram os slots de tempo e ainda há aulas, falha (backtrack).
+            if idx >= len(SLOTS_TEMPO): break
+
+            dia, s_cco, s_sin = SLOTS_TEMPO[idx]
+            idx += 1
             
-            # Validacoes cruzadas
-            # Um problema como uma aula de 3h (N3_N4_N5) conflita com uma de 2h (N3_N4) mesmo não sendo o mesmo slot exato.
-            # Precisa ser verificado manualmente contra a grade já alocada.
+            validos = self.filtrar_candidatos(pendentes, s_cco, s_sin)
+
+            #Se nenhuma aula serve para este slot, vai para o próximo slot
+            if not validos: continue
+
+            #Tenta encontrar o maior grupo de aulas possível para colocar neste slot
+            clique = self.encontrar_clique_maximal(validos, s_cco, s_sin)
             
-            nome_mat = self.mapa[node]['ID_Disciplina']
-            curso_node = self.mapa[node]['Curso']
-            periodo_node = self.mapa[node]['Periodo']
-            tipo_node = self.mapa[node].get('Tipo_Real', 'OB')
-            trilha_node = self.mapa[node].get('Trilha')
-
-            for alocada, h in self.grade.items():
-                #se houver sobreposição de tempo entre o slot atual e o da aula já alocada
-                if self.slots_overlap(h, slot_nome):
-                    #O mesmo professor não pode estar em dois slots sobrepostos
-                    if self.mapa[alocada]['Professor'] == prof:
-                        compativel = False; break
-                    
-                    #Evita que a mesma matéria (Turma A e B) ocorra no mesmo dia
-                    if self.mapa[alocada]['ID_Disciplina'] == nome_mat:
-                         if h.split('_')[0] == dia: # Mesmo dia
-                            compativel = False; break
-
-                    # Verifica conflito de grade para os alunos
-                    if self.mapa[alocada]['Curso'] == curso_node and \
-                       self.mapa[alocada]['Periodo'] == periodo_node:
-                        
-                        tipo_alocada = self.mapa[alocada].get('Tipo_Real', 'OB')
-                        trilha_alocada = self.mapa[alocada].get('Trilha')
-                        
-                        eh_conflito_turma = True
-                        
-                        #lógica de trilhas optativas para validação cruzada
-                        if tipo_node == 'OP' and tipo_alocada == 'OP':
-                            if trilha_node is not None and trilha_alocada is not None:
-                                if trilha_node != trilha_alocada:
-                                    eh_conflito_turma = False
-                        
-                        if eh_conflito_turma:
-                            compativel = False; break
-
-            if compativel: clique.append(node)
+            #Se não conseguiu colocar nada, avança
+            if not clique: continue
+
+            #Decide um clique
+            for n in clique:
+                self.atualizar_ocupacao(n, s_sin if inst.eh_sin[n] else s_cco, True)
+            pendentes[clique] = False
+            n_pendentes -= len(clique)
+            pilha.append(clique)
+            est['profundidade_max'] = max(est['profundidade_max'], len(pilha))
+
+        #Desfaz as decisões, ou seja, se a busca falhou, desfaz as alocações de cada passo da pilha.
+        while pilha:
+            est['backtracks'] += 1
+            for n in pilha.pop():
+                self.atualizar_ocupacao(n, SLOTS[self.grade[n]], False)
             
-        return clique
+        return False
 
+    #Substitui a grade atual (completa ou parcial) por outra, refazendo o índice de ocupação e o score.
+    #As salas vêm de atribuir_salas, o mesmo emparelhamento da gravação: a menor sala livre, aula a aula,
+    #pode deixar sem sala uma aula de uma grade válida.
+    def carregar_grade(self, grade):
+        for i, slot_id in list(self.grade.items()):
+            self.atualizar_ocupacao(i, SLOTS[slot_id], False)
+        salas = atribuir_salas(self.inst, grade)
+        for i, slot_id in grade.items():
+            self.atualizar_ocupacao(i, SLOTS[slot_id], True, salas.get(i))
 
-    #DFS para alocar aulas nos slots de tempo.
-    #Parametros:
-        #idx: Índice do slot de tempo atual sendo considerado.
-        #restantes: Conjunto de iDs de aulas que ainda precisam ser alocadas.
+    #Carrega de uma grade salva (aula -> id do slot) as aulas que ainda cabem no seu slot, conferidas em
+    #ordem contra as já carregadas. As salas são conferidas no fim, por atribuir_salas, e não pela menor
+    #sala livre de cabe_no_slot. Devolve as aulas que ficaram de fora.
+    def carregar_grade_salva(self, grade):
+        inst = self.inst
+        recusadas = set()
+        for i, slot_id in grade.items():
+            slot = SLOTS[slot_id]
+            if slot not in inst.slots_aula[i] or \
+                    (self.excede_limites_prof(i, slot) or self.conflita_com_grade(i, slot)) not in (None, 'sala'):
+                recusadas.add(i)
+            else:
+                self.atualizar_ocupacao(i, slot, True)
+        salas = atribuir_salas(inst, self.grade)
+        recusadas.update(i for i in self.grade if inst.salas_aula[i] and i not in salas)
+        self.carregar_grade({i: slot_id for i, slot_id in self.grade.items() if i not in recusadas})
+        return recusadas
 
+    #Aplica de uma vez uma lista de realocações [(aula, slot)]: retira as aulas da grade e recoloca
+    #cada uma no novo slot com as mesmas verificações da construção (disponibilidade e limites do
+    #professor, sobreposição parcial, turma/trilha, lab e disciplina no mesmo dia). Se alguma não couber, a grade
+    #volta ao estado anterior e retorna None; senão, retorna as realocações que desfazem o movimento.
+    def realocar(self, movimentos):
+        anteriores = [(i, SLOTS[self.grade[i]]) for i, _ in movimentos]
+        for i, slot in anteriores:
+            self.atualizar_ocupacao(i, slot, False)
+        feitos = []
+        for i, slot in movimentos:
+            if not self.inst.mascara_slots[i] >> slot.id & 1 or not self.cabe_no_slot(i, slot):
+                for j, s in feitos: self.atualizar_ocupacao(j, s, False)
+                for j, s in anteriores: self.atualizar_ocupacao(j, s, True)
+                return None
+            self.atualizar_ocupacao(i, slot, True)
+            feitos.append((i, slot))
+        return anteriores
 
-    def dfs_slots(self, idx, restantes):
-        
+    #Cadeia de Kempe da aula i entre os slots a (o seu) e b: o componente conexo, no grafo de conflitos,
+    #das aulas alocadas em a ou b que contém i. Trocar a cadeia inteira de lado mantém os conflitos do
+    #grafo resolvidos entre os dois slots; as demais restrições ficam para realocar.
+    def cadeia_kempe(self, i, slot_a, slot_b, ocupantes):
+        conflitos = self.inst.conflitos
+        cadeia = {i: slot_b}
+        pendentes = [i]
+        while pendentes:
+            u = pendentes.pop()
+            destino = cadeia[u]
+            origem = slot_a if destino is slot_b else slot_b
+            for v in ocupantes[destino.id]:
+                if v not in cadeia and conflitos[u] >> v & 1:
+                    cadeia[v] = origem
+                    pendentes.append(v)
+        return list(cadeia.items())
 
-        
-        
-        
-        #Caso base, se não há mais aulas para alocar
-        if not restantes: return True
-        #Caso base, se acabaram os slots de tempo e ainda há aulas, falha (backtrack).
-        if idx >= len(SLOTS_TEMPO): return False
+    #Busca local sobre uma grade completa, por recozimento simulado. A cada passo sorteia uma aula, um
+    #slot de destino do seu turno e duração, e um dos movimentos:
+    #   mover a aula para o slot; trocar os slots da aula e de outra aula alocada no destino;
+    #   trocar de lado a cadeia de Kempe da aula entre os dois slots.
+    #Melhoras são sempre aceitas e pioras com probabilidade exp(delta / T), com T caindo
+    #geometricamente de temperatura_inicial a temperatura_final ao longo dos passos.
+    #Ao final a grade volta para a melhor encontrada.
+    #aulas: se dado, só essas aulas podem mudar de slot (as demais ficam fixas na grade).
+    def melhorar(self, passos=PASSOS_MELHORIA, prazo=None, parar=None,
+                 temperatura_inicial=TEMPERATURA_INICIAL, temperatura_final=TEMPERATURA_FINAL, aulas=None):
+        inst = self.inst
+        est = self.estatisticas
+        ocupantes = defaultdict(set) # id do slot -> aulas alocadas nele
+        for i, slot_id in self.grade.items():
+            ocupantes[slot_id].add(i)
+        fixas = set() if aulas is None else set(self.grade) - set(aulas)
+        aulas = [i for i in self.grade if i not in fixas]
+        if not aulas: return
+        melhor_score, melhor_grade = self.score, dict(self.grade)
+        resfriamento = (temperatura_final / temperatura_inicial) ** (1 / max(passos, 1))
+        temperatura = temperatura_inicial
 
-        dia, s_cco, s_sin = SLOTS_TEMPO[idx]
-        
-        # Filtra quais aulas do conjunto restantes podem ocorrer neste slot
-        # baseado na duração e no tipo de curso, CCO ou SIN.
-        validos = []
-        duracao_sin = 3 if 'N5' in s_sin else (2 if s_sin else 0)
-        duracao_cco = 2 if s_cco else 0
-
-        for n in restantes:
-            eh_sin = 'SIN' in str(self.mapa[n]['Curso'])
-            ch_aula = self.mapa[n]['CH_Aula']
-            
-            if eh_sin:
-                if s_sin == '' or ch_aula != duracao_sin: continue
+        for passo in range(passos):
+            if passo % INTERVALO_VERIFICACAO == 0 and self.deve_parar(prazo, parar): break
+            temperatura *= resfriamento
+
+            i = self.rng.choice(aulas)
+            atual = SLOTS[self.grade[i]]
+            destino = self.rng.choice(inst.slots_aula[i])
+            if destino is atual: continue
+
+            sorteio = self.rng.random()
+            outras = ocupantes[destino.id] - fixas if fixas else ocupantes[destino.id]
+            if sorteio < 1 / 3 or not outras:
+                movimentos = [(i, destino)]
+            elif sorteio < 2 / 3:
+                movimentos = [(i, destino), (self.rng.choice(tuple(outras)), atual)]
             else:
-                if s_cco == '' or ch_aula != duracao_cco: continue 
-            validos.append(n)
+                movimentos = self.cadeia_kempe(i, atual, destino, ocupantes)
+                if fixas and any(j in fixas for j, _ in movimentos): continue
 
-        #Se nenhuma aula serve para este slot, vai para o próximo slot
-        if not validos:
-            return self.dfs_slots(idx + 1, restantes)
+            score_antes = self.score
+            desfazer = self.realocar(movimentos)
+            if desfazer is None: continue
+            delta = self.score - score_antes
+            if delta < 0 and self.rng.random() >= math.exp(delta / temperatura):
+                self.realocar(desfazer)
+                continue
 
-        slot_real = f"{dia}_{s_sin if s_sin else s_cco}"
-        
-        #Tenta encontrar o maior grupo de aulas possível para colocar neste slot
-        clique = self.encontrar_clique_maximal(validos, dia, slot_real)
-        
-        #Se não conseguiu colocar nada, avança
-        if not clique:
-             return self.dfs_slots(idx + 1, restantes)
-
-        #Decide um clique
-        for n in clique:
-            eh_sin = 'SIN' in str(self.mapa[n]['Curso'])
-            self.grade[n] = f"{dia}_{s_sin}" if eh_sin else f"{dia}_{s_cco}"
-            self.carga_prof[self.mapa[n]['Professor']][dia] += self.mapa[n]['CH_Aula']
-        
-        
-        #Recursão tenta resolver o restante do problema com as aulas alocadas
-        if self.dfs_slots(idx + 1, restantes - set(clique)):
-            return True
-
-        #Desfaz a decisão, ou seja, Se a recursão falhou, desfaz as alocações deste passo e tenta outro caminho.
-        #Obs: Esta código é um híbrido Guloso/DFS. Ela é gulosa na escolha do clique por slot.
-        for n in clique:
-            del self.grade[n]
-            self.carga_prof[self.mapa[n]['Professor']][dia] -= self.mapa[n]['CH_Aula']
-            
+            est['movimentos'] += 1
+            for j, slot in desfazer: ocupantes[slot.id].discard(j)
+            for j, slot in movimentos: ocupantes[slot.id].add(j)
+            if self.score > melhor_score:
+                melhor_score, melhor_grade = self.score, dict(self.grade)
+
+        if self.score < melhor_score: self.carregar_grade(melhor_grade)
+
+    #Linha do tempo por slot usada pela busca com backjumping: cada passo de SLOTS_TEMPO vira uma
+    #decisão por turno, pois cliques de CCO e de SIN não interagem. Fica em cache enquanto a ordem
+    #de SLOTS_TEMPO não mudar. Contém:
+    #   ordem: slots na ordem de decisão;
+    #   elegiveis[i]: posições em que a aula i pode entrar (turno e duração), e a mesma informação
+    #                 como máscara de bits e agrupada por dia;
+    #   por_posicao[k]: aulas elegíveis na posição k;
+    #   relacionadas[i]: aulas que dividem professor, turma, lab ou disciplina com i, ou seja, as únicas
+    #                    cujos slots possíveis mudam quando i é alocada ou removida.
+    def linha_do_tempo(self):
+        chave = tuple((a.id if a else -1, b.id if b else -1) for _, a, b in SLOTS_TEMPO)
+        if self.cache_linha is None or self.cache_linha[0] != chave:
+            inst = self.inst
+            ordem = [s for _, s_cco, s_sin in SLOTS_TEMPO for s in (s_cco, s_sin) if s is not None]
+            elegiveis = [[k for k, s in enumerate(ordem) if inst.mascara_slots[i] >> s.id & 1]
+                         for i in range(len(inst))]
+            mascara_elegivel = [sum(1 << k for k in posicoes) for posicoes in elegiveis]
+            elegiveis_dia = []
+            for posicoes in elegiveis:
+                por_dia = defaultdict(list)
+                for k in posicoes: por_dia[ordem[k].dia].append(k)
+                elegiveis_dia.append(dict(por_dia))
+            por_posicao = [[] for _ in ordem]
+            for i, posicoes in enumerate(elegiveis):
+                for k in posicoes: por_posicao[k].append(i)
+
+            grupos = defaultdict(list)
+            for i in range(len(inst)):
+                grupos[('prof', inst.prof[i])].append(i)
+                grupos[('turma', inst.turma[i])].append(i)
+                grupos[('disciplina', inst.disciplina[i])].append(i)
+                if inst.lab[i] >= 0: grupos[('lab', inst.lab[i])].append(i)
+            relacionadas = [set() for _ in range(len(inst))]
+            for membros in grupos.values():
+                for i in membros: relacionadas[i].update(membros)
+
+            self.cache_linha = (chave, (ordem, elegiveis, mascara_elegivel, elegiveis_dia, por_posicao,
+                                        [list(r) for r in relacionadas]))
+        return self.cache_linha[1]
+
+    #Níveis da pilha cujas aulas alocadas impedem a aula i de ser colocada no slot.
+    def culpados(self, i, slot, nivel_aula):
+        inst = self.inst
+        niveis = set()
+        prof = inst.prof[i]
+        limite = self.excede_limites_prof(i, slot)
+        excede_carga = limite == 'carga_prof'
+        excede_dias = limite == 'dias_prof'
+        trilha = inst.trilha[i]
+        sem_sala = inst.salas_aula[i] and not self.sala_livre(i, slot)
+        for j, slot_id in self.grade.items():
+            sj = SLOTS[slot_id]
+            mesmo_prof = inst.prof[j] == prof
+            if sj.dia != slot.dia:
+                # Com o professor no limite de dias, qualquer aula dele em outro dia bloqueia o slot
+                if excede_dias and mesmo_prof: niveis.add(nivel_aula[j])
+                continue
+            if (excede_carga and mesmo_prof) or inst.disciplina[j] == inst.disciplina[i]:
+                niveis.add(nivel_aula[j])
+            elif sj.mascara & slot.mascara:
+                if mesmo_prof or (inst.lab[i] >= 0 and inst.lab[j] == inst.lab[i]) or \
+                   (inst.turma[j] == inst.turma[i] and (trilha is None or inst.trilha[j] in (None, trilha))) or \
+                   (sem_sala and j in self.sala and inst.salas_aula[i] >> self.sala[j] & 1):
+                    niveis.add(nivel_aula[j])
+        return niveis
+
+    #Conjunto de conflito da aula i que ficou sem nenhum slot possível a partir da posição k:
+    #os níveis que decidiram posições passadas em que ela poderia ter entrado, mais os níveis das
+    #aulas que a bloqueiam nas demais posições. Desfazer qualquer um deles pode reabrir um slot.
+    def conjunto_conflito(self, i, k, ordem, elegiveis, nivel_posicao, nivel_aula):
+        niveis = set()
+        for kk in elegiveis[i]:
+            if kk < k and kk in nivel_posicao:
+                niveis.add(nivel_posicao[kk])
+            else:
+                niveis |= self.culpados(i, ordem[kk], nivel_aula)
+        return niveis
+
+    #Próximo clique alternativo de um nível, seguindo o ranking da fila. Primeiro força a aula que
+    #causou a falha (se ela é candidata neste slot); depois, em ordem, a primeira candidata que ainda
+    #não apareceu em nenhuma alternativa. Cliques repetidos são descartados.
+    def proxima_alternativa(self, nivel, falha, max_alternativas):
+        fila = nivel['fila']
+        while len(nivel['tentadas']) < max_alternativas:
+            usadas = set().union(*nivel['tentadas'])
+            if falha in fila and falha not in nivel['forcadas']:
+                forcar = falha
+            else:
+                forcar = next((i for i in fila if i not in usadas and i not in nivel['forcadas']), None)
+            if forcar is None: return None
+            nivel['forcadas'].add(forcar)
+            clique = self.montar_clique([forcar] + [i for i in fila if i != forcar], nivel['slot'], nivel['slot'])
+            if clique and frozenset(clique) not in nivel['tentadas']:
+                nivel['tentadas'].add(frozenset(clique))
+                return clique
+        return None
+
+    #Busca com retrocesso real sobre cliques alternativos e backjumping dirigido por conflitos.
+    #   - Cada nível da pilha é uma posição da linha_do_tempo com até max_alternativas cliques,
+    #     ranqueados pela mesma pontuação de encontrar_clique_maximal.
+    #   - Antes de cada decisão, uma verificação adiante calcula o domínio (slots ainda possíveis) de
+    #     cada aula restante. Aulas com menos slots possíveis entram primeiro no clique (MRV), e um
+    #     domínio vazio é uma falha imediata.
+    #   - Na falha, a busca salta direto para o nível mais profundo do conjunto de conflito da aula,
+    #     pulando os níveis que não têm relação com ela, e tenta lá o próximo clique alternativo.
+    #Cada tentativa é limitada a limite_nos nós e é abandonada pela poda de limite_score; a
+    #diversidade entre tentativas continua vindo dos reinícios aleatórios.
+    def dfs_backjumping(self, restantes, prazo=None, parar=None, limite_score=None,
+                        max_alternativas=ALTERNATIVAS_POR_SLOT, limite_nos=LIMITE_NOS_BACKJUMP):
+        inst = self.inst
+        est = self.estatisticas
+        ordem, elegiveis, mascara_elegivel, elegiveis_dia, por_posicao, relacionadas = self.linha_do_tempo()
+        restantes = set(restantes)
+        pilha = []
+        nivel_posicao = {} # posição da linha do tempo -> nível da pilha que a decidiu
+        nivel_aula = {}    # aula alocada -> nível da pilha
+        # viaveis[i]: bit k ligado se a aula i cabe no slot da posição k. Como as restrições entre aulas
+        # valem dentro de um mesmo dia, alocar ou remover um clique só invalida os bits daquele dia para
+        # as aulas relacionadas aos seus membros; a exceção é o limite de dias do professor (max_dias),
+        # e um membro com esse limite invalida todos os dias. Essas invalidações ficam marcadas em
+        # sujos[i] (um bit por dia) e só são recalculadas quando o valor é realmente necessário.
+        viaveis = list(mascara_elegivel)
+        sujos = [0] * len(inst)
+        k = 0
+        # As salas não entram em relacionadas (seriam todas as aulas do turno, O(n²)): um clique que
+        # ocupa ou libera salas invalida o dia de todas as aulas que disputam sala.
+        com_sala = [j for j in range(len(inst)) if inst.salas_aula[j]]
+
+        todos_dias = (1 << len(DIAS)) - 1
+        def reavaliar(clique, dia):
+            bit = 1 << dia
+            for c in clique:
+                bits = todos_dias if inst.max_dias[inst.prof[c]] else bit
+                for j in relacionadas[c]: sujos[j] |= bits
+            if com_sala and any(inst.salas_aula[c] for c in clique):
+                for j in com_sala: sujos[j] |= bit
+
+        def limpar(j):
+            for dia, posicoes in elegiveis_dia[j].items():
+                if sujos[j] >> dia & 1:
+                    for kk in posicoes:
+                        if self.cabe_no_slot(j, ordem[kk]): viaveis[j] |= 1 << kk
+                        else: viaveis[j] &= ~(1 << kk)
+            sujos[j] = 0
+
+        #Os bits de dias ainda não invalidados já provam que o domínio não é vazio?
+        def tem_slot_limpo(j):
+            limpos = viaveis[j]
+            for dia, posicoes in elegiveis_dia[j].items():
+                if sujos[j] >> dia & 1:
+                    for kk in posicoes: limpos &= ~(1 << kk)
+            return limpos >> k != 0
+
+        def aplicar(nivel):
+            n = len(pilha) - 1
+            for i in nivel['clique']:
+                self.atualizar_ocupacao(i, nivel['slot'], True)
+                nivel_aula[i] = n
+            restantes.difference_update(nivel['clique'])
+            nivel_posicao[nivel['k']] = n
+            reavaliar(nivel['clique'], nivel['slot'].dia)
+
+        def desfazer(nivel):
+            for i in nivel['clique']:
+                self.atualizar_ocupacao(i, nivel['slot'], False)
+                del nivel_aula[i]
+            restantes.update(nivel['clique'])
+            del nivel_posicao[nivel['k']]
+            reavaliar(nivel['clique'], nivel['slot'].dia)
+
+        while True:
+            if self.sem_chance(limite_score):
+                est['podas'] += 1
+                break
+            if not restantes: return True
+            est['nos'] += 1
+            if est['nos'] % INTERVALO_VERIFICACAO == 0 and self.deve_parar(prazo, parar):
+                est['interrompidas'] += 1
+                break
+            if est['nos'] > limite_nos: break
+
+            # Verificação adiante: domínio (slots ainda possíveis a partir de k) de cada aula restante.
+            # As candidatas desta posição guardam o domínio exato para o MRV; domínio vazio é falha.
+            candidatas = set(por_posicao[k]) & restantes if k < len(ordem) else set()
+            dominio = {}
+            falha = None
+            for i in restantes:
+                if sujos[i] and (i in candidatas or not tem_slot_limpo(i)): limpar(i)
+                d = (viaveis[i] >> k).bit_count()
+                if not d:
+                    falha = i
+                    break
+                if i in candidatas: dominio[i] = d
+
+            if falha is None:
+                if not candidatas:
+                    k += 1
+                    continue
+                slot = ordem[k]
+                fila = list(candidatas)
+                self.rng.shuffle(fila)
+                fila.sort(key=lambda i: (dominio[i], -self.pontuacao(i, slot)))
+                clique = self.montar_clique(fila, slot, slot)
+                if not clique:
+                    k += 1
+                    continue
+                pilha.append({'k': k, 'slot': slot, 'fila': fila, 'clique': clique,
+                              'tentadas': {frozenset(clique)}, 'forcadas': set(), 'conflitos': set()})
+                aplicar(pilha[-1])
+                est['profundidade_max'] = max(est['profundidade_max'], len(pilha))
+                k += 1
+                continue
+
+            # Backjumping: volta ao nível mais profundo do conjunto de conflito e tenta a próxima
+            # alternativa; se o nível se esgotar, seu conjunto de conflito acumulado sobe para o anterior.
+            conflitos = self.conjunto_conflito(falha, k, ordem, elegiveis, nivel_posicao, nivel_aula)
+            while conflitos:
+                alvo = max(conflitos)
+                if len(pilha) - 1 > alvo: est['saltos'] += 1
+                while len(pilha) - 1 > alvo:
+                    desfazer(pilha.pop())
+                    est['backtracks'] += 1
+                nivel = pilha[alvo]
+                desfazer(nivel)
+                est['backtracks'] += 1
+                nivel['conflitos'] |= conflitos - {alvo}
+                clique = self.proxima_alternativa(nivel, falha, max_alternativas)
+                if clique:
+                    nivel['clique'] = clique
+                    aplicar(nivel)
+                    k = nivel['k'] + 1
+                    break
+                conflitos = nivel['conflitos']
+                pilha.pop()
+            else:
+                # Conjunto de conflito vazio: nenhuma decisão anterior explica a falha.
+                break
+
+        #Desfaz as decisões restantes da pilha
+        while pilha:
+            desfazer(pilha.pop())
+            est['backtracks'] += 1
         return False
 
-def executar():
-    df = carregar_dados()
-    if df is None: return
-    
-    prefs = gerar_preferencias_ficticias(df)
-    G, G_comp = construir_grafos_multicamadas(df)
-    
-    #Ordenacao dos slots:
-    # Para maximizar a satisfação dos professores, tentamos preencher primeiro os slots, que são mais populares.
-    # Isso aumenta a chance de um professor conseguir seu horário preferido antes que ele seja ocupado.
+
+#Perfil de desempenho da busca (opt-in, ver --perfil): segundos e chamadas por fase do solucionador e
+#candidatos considerados, aceitos e rejeitados por motivo na montagem dos cliques. Só tem dicts e
+#números, então atravessa a fila dos trabalhadores e vai direto para JSON.
+def novo_perfil():
+    return {'segundos': defaultdict(float), 'chamadas': defaultdict(int), 'candidatos': defaultdict(int),
+            'rejeitados': defaultdict(int)}
+
+
+def somar_perfis(total, parcial):
+    for secao, valores in parcial.items():
+        for chave, valor in valores.items(): total[secao][chave] += valor
+
+
+#Solucionador com o perfil ligado. Sobrescreve as fases do laço de busca para medir o tempo de cada uma
+#(os tempos são inclusivos: 'clique', medido em montar_clique, que as duas buscas usam, contém
+#'validacao_grade', o teste de cada candidato do clique) e, por motivo_rejeicao, conta por que cada
+#candidato ficou fora do clique: 'clique' (conflito com uma aula já escolhida no mesmo passo),
+#'carga_prof' (limite de 8h por dia), 'dias_prof' (limite de dias na semana), 'sala' (salas já
+#reservadas pelo clique) ou o motivo devolvido por conflita_com_grade. O SolucionadorTimetabling normal
+#não paga nada por isso.
+class SolucionadorInstrumentado(SolucionadorTimetabling):
+
+    def __init__(self, instancia, seed=None):
+        self.perfil = novo_perfil()
+        super().__init__(instancia, seed)
+
+    def medir(self, fase, inicio):
+        self.perfil['segundos'][fase] += time.perf_counter() - inicio
+        self.perfil['chamadas'][fase] += 1
+
+    def reset(self, aulas=None):
+        inicio = time.perf_counter()
+        super().reset(aulas)
+        self.medir('reset', inicio)
+
+    def filtrar_candidatos(self, pendentes, s_cco, s_sin):
+        inicio = time.perf_counter()
+        validos = super().filtrar_candidatos(pendentes, s_cco, s_sin)
+        self.medir('filtro', inicio)
+        return validos
+
+    def montar_clique(self, fila, slot_cco, slot_sin):
+        inicio = time.perf_counter()
+        clique = super().montar_clique(fila, slot_cco, slot_sin)
+        self.medir('clique', inicio)
+        return clique
+
+    def motivo_rejeicao(self, i, slot, mascara_clique, reservadas):
+        inicio = time.perf_counter()
+        motivo = super().motivo_rejeicao(i, slot, mascara_clique, reservadas)
+        self.medir('validacao_grade', inicio)
+        self.perfil['candidatos']['considerados'] += 1
+        if motivo: self.perfil['rejeitados'][motivo] += 1
+        else: self.perfil['candidatos']['aceitos'] += 1
+        return motivo
+
+    def dfs_slots(self, idx, restantes, prazo=None, parar=None, limite_score=None):
+        inicio = time.perf_counter()
+        sucesso = super().dfs_slots(idx, restantes, prazo, parar, limite_score)
+        self.medir('construcao', inicio)
+        return sucesso
+
+    def dfs_backjumping(self, restantes, prazo=None, parar=None, limite_score=None, **opcoes):
+        inicio = time.perf_counter()
+        sucesso = super().dfs_backjumping(restantes, prazo, parar, limite_score, **opcoes)
+        self.medir('construcao', inicio)
+        return sucesso
+
+    def melhorar(self, *args, **opcoes):
+        inicio = time.perf_counter()
+        super().melhorar(*args, **opcoes)
+        self.medir('busca_local', inicio)
+
+
+TEMPO_LIMITE_SEGUNDOS = 15
+
+# Com um motor exato, fração do tempo limite dada antes à busca heurística, cuja melhor grade serve de
+# solução inicial (warm start) para o motor.
+FRACAO_AQUECIMENTO = 0.2
+
+
+#Reinícios aleatórios em sequência até o prazo (time.time() absoluto).
+#Como o algoritmo tem componentes aleatórios (shuffle nos candidatos),
+# rodamos várias vezes dentro do tempo limite para tentar encontrar a melhor solução.
+#Tentativas que já não podem superar o melhor score desta busca são podadas (ver podar), então ao_encontrar
+#(score, grade) é chamado para cada solução completa que supera o melhor local. Retorna as estatísticas somadas
+#de todas as tentativas (tentativas, nós, backtracks, saltos, profundidade máxima e interrupções).
+#modo: 'gulosa' (dfs_slots, um clique por slot) ou 'backjumping' (dfs_backjumping).
+#melhoria: se True, cada grade completa passa pela busca local (melhorar) antes de ser reportada. Nesse
+#caso a construção não é podada, pois a busca local pode levar um ponto de partida pior além do melhor.
+#aulas: subconjunto independente das aulas a alocar (um componente); por padrão, todas.
+#grade_inicial (aula -> id do slot), se dada, é a primeira tentativa no lugar de uma construção: a
+#busca retoma dessa grade (ex.: a melhor de um checkpoint) e a refina com a busca local.
+#seed: semente do solucionador. max_tentativas: encerra antes do prazo após esse número de tentativas;
+#com a mesma semente, a busca repete exatamente as mesmas tentativas, sem depender do relógio.
+#instrumentar: usa o SolucionadorInstrumentado e devolve o perfil da busca em 'perfil'.
+#podar: sem busca local, abandona a tentativa que já não pode superar o melhor score encontrado (as
+#podas contam como falhas). Com podar=False toda tentativa vai até uma grade completa ou um beco sem
+#saída, para medir a taxa de sucesso da construção (ver benchmark.py).
+def busca_multistart(instancia, prazo, ao_encontrar, parar=None, modo='gulosa', melhoria=False, aulas=None,
+                     grade_inicial=None, seed=None, max_tentativas=None, instrumentar=False, podar=True):
+    if aulas is None: aulas = instancia.aulas
+    totais = novas_estatisticas()
+    solver = (SolucionadorInstrumentado if instrumentar else SolucionadorTimetabling)(instancia, seed)
+    melhor_score = None
+    while time.time() < prazo and not (parar is not None and parar.is_set()) \
+            and (max_tentativas is None or totais['tentativas'] < max_tentativas):
+        totais['tentativas'] += 1
+        solver.reset(aulas)
+        limite = melhor_score if podar and not melhoria else None
+        if grade_inicial is not None:
+            solver.carregar_grade({i: s for i, s in grade_inicial.items() if i in aulas})
+            grade_inicial, sucesso = None, True
+        elif modo == 'backjumping':
+            sucesso = solver.dfs_backjumping(aulas, prazo, parar, limite)
+        else:
+            sucesso = solver.dfs_slots(0, aulas, prazo, parar, limite)
+        if sucesso and melhoria:
+            solver.melhorar(prazo=prazo, parar=parar)
+        somar_estatisticas(totais, solver.estatisticas)
+        if sucesso:
+            score = solver.calcular_pontuacao_global()
+            ao_encontrar(score, solver.grade)
+            if melhor_score is None or score > melhor_score: melhor_score = score
+        else:
+            totais['falhas'] += 1
+    if instrumentar: totais['perfil'] = solver.perfil
+    return totais
+
+
+#falhas: tentativas que terminaram sem grade completa (sem saída, podadas ou interrompidas).
+def novas_estatisticas():
+    return {'tentativas': 0, 'falhas': 0, 'nos': 0, 'backtracks': 0, 'saltos': 0, 'profundidade_max': 0,
+            'interrompidas': 0, 'podas': 0, 'movimentos': 0}
+
+
+def somar_estatisticas(totais, parciais):
+    totais['tentativas'] += parciais.get('tentativas', 0)
+    totais['falhas'] += parciais.get('falhas', 0)
+    totais['nos'] += parciais['nos']
+    totais['backtracks'] += parciais['backtracks']
+    totais['saltos'] += parciais['saltos']
+    totais['profundidade_max'] = max(totais['profundidade_max'], parciais['profundidade_max'])
+    totais['interrompidas'] += parciais['interrompidas']
+    totais['podas'] += parciais['podas']
+    totais['movimentos'] += parciais['movimentos']
+    if 'perfil' in parciais:
+        somar_perfis(totais.setdefault('perfil', novo_perfil()), parciais['perfil'])
+
+
+#Processo trabalhador do modo paralelo. Recebe a instância já construída (uma vez por trabalhador) e as
+#tarefas (semente, c, aulas) que lhe cabem: busca as aulas de cada componente c, um após o outro, com a
+#semente da tarefa e uma fatia do tempo proporcional ao número de aulas, e envia para o processo
+#principal cada solução encontrada. A grade só é enviada quando melhora o melhor score local do
+#componente, para não inundar a fila.
+def trabalhador_busca(tarefas, instancia, ordem_slots, prazo, fila, parar, modo, melhoria, grade_inicial,
+                      max_tentativas, instrumentar, podar):
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    SLOTS_TEMPO[:] = ordem_slots
+    inicio = fim = time.time()
+    total_aulas = sum(len(aulas) for _, _, aulas in tarefas)
+    for seed, c, aulas in tarefas:
+        fim += (prazo - inicio) * len(aulas) / total_aulas
+        melhor_local = [-float('inf')]
+
+        def enviar(score, grade, c=c, melhor_local=melhor_local):
+            nova_melhor = score > melhor_local[0]
+            if nova_melhor: melhor_local[0] = score
+            fila.put(('solucao', c, score, dict(grade) if nova_melhor else None))
+
+        estatisticas = novas_estatisticas()
+        try:
+            estatisticas = busca_multistart(instancia, fim, enviar, parar, modo, melhoria, aulas, grade_inicial, seed,
+                                            max_tentativas, instrumentar, podar)
+        finally:
+            fila.put(('fim', c, estatisticas))
+
+
+#Quantos processos cada componente recebe: ao menos um, e os demais vão um a um para o componente
+#com mais aulas por processo.
+def distribuir_workers(componentes, workers):
+    alocados = [1] * len(componentes)
+    for _ in range(workers - len(componentes)):
+        c = max(range(len(componentes)), key=lambda c: len(componentes[c]) / alocados[c])
+        alocados[c] += 1
+    return alocados
+
+
+#Componentes de cada processo do modo paralelo, como listas de (c, k): o processo busca os componentes c,
+#um após o outro, como o k-ésimo trabalhador de cada um. Nunca passa de workers processos. Com ao menos
+#um processo por componente, cada processo fica com um só (ver distribuir_workers); com menos, os
+#componentes são agrupados, do maior para o menor, no processo com menos aulas até ali.
+def agrupar_componentes(componentes, workers):
+    if workers >= len(componentes):
+        return [[(c, k)] for c, n in enumerate(distribuir_workers(componentes, workers)) for k in range(n)]
+    grupos = [[] for _ in range(max(1, workers))]
+    aulas = [0] * len(grupos)
+    for c in sorted(range(len(componentes)), key=lambda c: len(componentes[c]), reverse=True):
+        g = min(range(len(grupos)), key=aulas.__getitem__)
+        grupos[g].append((c, 0))
+        aulas[g] += len(componentes[c])
+    return grupos
+
+
+#Distribui os reinícios de cada componente entre processos (ver agrupar_componentes) e repassa as
+#soluções para ao_encontrar(c, score, grade) no processo principal. No prazo, sinaliza a parada (os
+#trabalhadores também conferem o prazo durante a busca); os que não responderem em
+#PRAZO_ENCERRAMENTO segundos são interrompidos. Retorna as estatísticas somadas de cada componente.
+PRAZO_ENCERRAMENTO = 2.0
+
+def busca_paralela(instancia, prazo, ao_encontrar, workers, modo='gulosa', melhoria=False, componentes=None,
+                   grade_inicial=None, seed=0, max_tentativas=None, instrumentar=False, podar=True):
+    if componentes is None: componentes = [instancia.aulas]
+    ctx = mp.get_context()
+    fila = ctx.Queue()
+    parar = ctx.Event()
+    # O k-ésimo trabalhador do componente c usa semente_derivada(seed, c, k).
+    grupos = agrupar_componentes(componentes, workers)
+    processos = [ctx.Process(target=trabalhador_busca, daemon=True,
+                             args=([(semente_derivada(seed, c, k), c, componentes[c]) for c, k in grupo], instancia,
+                                   list(SLOTS_TEMPO), prazo, fila, parar, modo, melhoria, grade_inicial,
+                                   max_tentativas, instrumentar, podar))
+                 for grupo in grupos]
+    for p in processos: p.start()
+
+    por_componente = [novas_estatisticas() for _ in componentes]
+    ativos = sum(len(grupo) for grupo in grupos)  # um 'fim' por componente de cada processo
+    try:
+        while ativos:
+            agora = time.time()
+            if agora < prazo:
+                espera = prazo - agora
+            else:
+                parar.set()
+                espera = prazo + PRAZO_ENCERRAMENTO - agora
+                if espera <= 0: break
+            try:
+                msg = fila.get(timeout=espera)
+            except queue.Empty:
+                continue
+            if msg[0] == 'solucao':
+                ao_encontrar(msg[1], msg[2], msg[3])
+            else:
+                somar_estatisticas(por_componente[msg[1]], msg[2])
+                ativos -= 1
+    finally:
+        # Também numa interrupção (Ctrl+C ou SIGTERM no modo checkpoint), nenhum trabalhador fica para trás.
+        parar.set()
+        for p in processos:
+            if p.is_alive(): p.terminate()
+            p.join()
+    return por_componente
+
+
+#Une as melhores grades de cada componente em uma grade completa. Assim que todos os componentes têm
+#solução, cada nova solução de um componente é repassada a ao_encontrar com o seu score somado ao
+#melhor score dos demais; a grade unida só é montada quando o componente melhora (senão vai None).
+class CombinadorComponentes:
+
+    def __init__(self, n_componentes, ao_encontrar):
+        self.melhores = [None] * n_componentes # componente -> (score, grade) da melhor solução
+        self.ao_encontrar = ao_encontrar
+
+    def registrar(self, c, score, grade):
+        melhora = self.melhores[c] is None or score > self.melhores[c][0]
+        if melhora: self.melhores[c] = (score, dict(grade))
+        if any(m is None for m in self.melhores): return
+
+        total = score + sum(m[0] for k, m in enumerate(self.melhores) if k != c)
+        grade_total = None
+        if melhora:
+            grade_total = {}
+            for _, g in self.melhores: grade_total.update(g)
+        self.ao_encontrar(total, grade_total)
+
+
+#componentes: partição das aulas em componentes independentes (ver decompor_componentes), cada um
+#buscado separadamente; por padrão, um único componente com todas as aulas. Em série, cada componente
+#recebe uma fatia do tempo proporcional ao número de aulas; em paralelo, todos usam o tempo inteiro.
+#Retorna as estatísticas somadas, com as de cada componente (e o seu melhor score) em 'por_componente'.
+#grade_inicial: grade completa de onde cada busca parte (ver busca_multistart).
+#seed: semente da execução, da qual sai a semente de cada busca (ver semente_derivada); None sorteia uma.
+#max_tentativas: tentativas por busca, instrumentar: perfil da busca e podar: poda pelo melhor score
+#(ver busca_multistart).
+def otimizar(instancia, tempo_limite, ao_encontrar, workers=1, modo='gulosa', melhoria=False, componentes=None,
+             grade_inicial=None, seed=None, max_tentativas=None, instrumentar=False, podar=True):
+    if componentes is None: componentes = [instancia.aulas]
+    if seed is None: seed = random.randrange(2**31)
+    inicio = time.time()
+    combinador = CombinadorComponentes(len(componentes), ao_encontrar)
+    if workers <= 1:
+        por_componente = []
+        total_aulas = sum(len(aulas) for aulas in componentes)
+        prazo = inicio
+        for c, aulas in enumerate(componentes):
+            prazo += tempo_limite * len(aulas) / total_aulas
+            registrar = lambda score, grade, c=c: combinador.registrar(c, score, grade)
+            por_componente.append(busca_multistart(instancia, prazo, registrar, modo=modo, melhoria=melhoria,
+                                                   aulas=aulas, grade_inicial=grade_inicial,
+                                                   seed=semente_derivada(seed, c, 0), max_tentativas=max_tentativas,
+                                                   instrumentar=instrumentar, podar=podar))
+    else:
+        por_componente = busca_paralela(instancia, inicio + tempo_limite, combinador.registrar, workers, modo,
+                                        melhoria, componentes, grade_inicial, seed, max_tentativas, instrumentar,
+                                        podar)
+
+    totais = novas_estatisticas()
+    for est, melhor in zip(por_componente, combinador.melhores):
+        somar_estatisticas(totais, est)
+        est['melhor_score'] = melhor[0] if melhor else None
+    totais['por_componente'] = por_componente
+    return totais
+
+
+#Ordenacao dos slots:
+# Para maximizar a satisfação dos professores, tentamos preencher primeiro os slots, que são mais populares.
+# Isso aumenta a chance de um professor conseguir seu horário preferido antes que ele seja ocupado.
+# A popularidade de cada slot (professores com peso positivo nele) já vem compilada na instância.
+def ordenar_slots_por_popularidade(instancia):
+    popularidade = instancia.popularidade_slot
+
     def calcular_popularidade_slot(slot_tuple):
         dia, s_cco, s_sin = slot_tuple
-        slot_real = f"{dia}_{s_sin if s_sin else s_cco}"
-        
-        popularidade = 0
-        for prof, p_data in prefs.items():
-            if slot_real in p_data.get('preferir', []):
-                popularidade += 1
-        return popularidade
+        return popularidade[(s_sin if s_sin else s_cco).id]
 
     #Ordena SLOTS_TEMPO. Os Slots com mais populares aparecem primeiro na lista
     SLOTS_TEMPO.sort(key=calcular_popularidade_slot, reverse=True)
+
+
+#Reparo incremental: o catálogo mudou pouco (um professor trocado, uma turma nova) e a grade anterior
+#deve ser preservada ao máximo. Só as aulas alteradas ou novas são desalocadas; se não houver como
+#encaixá-las com o resto fixo, a vizinhança de conflito das desalocadas também é liberada, um raio
+#por vez, até a grade inteira. No fim, a busca local melhora o score movendo só as aulas liberadas.
+TEMPO_REPARO = 1.0
+TENTATIVAS_POR_RAIO = 20
+
+#Aulas novas ou alteradas (qualquer coluna, inclusive a trilha recalculada) e aulas removidas entre
+#duas versões do catálogo, já processadas por processar_trilhas_optativas.
+def diferenca_catalogo(df_anterior, df_novo):
+    def por_aula(df):
+        return {linha['ID_Aula']: linha for linha in tabela_aulas(df).registros()}
+    anterior, novo = por_aula(df_anterior), por_aula(df_novo)
+    alteradas = {nid for nid, linha in novo.items() if anterior.get(nid) != linha}
+    removidas = set(anterior) - set(novo)
+    return alteradas, removidas
+
+
+#Aulas que conflitam com alguma de `aulas`: vizinhas no grafo de conflitos, mesma disciplina
+#(regra de um dia por disciplina) ou mesmo professor em qualquer turno (limite diário de horas).
+def vizinhanca_conflito(instancia, aulas):
+    mascara = 0
+    for i in aulas: mascara |= instancia.conflitos[i]
+    profs = {instancia.prof[i] for i in aulas}
+    disciplinas = {instancia.disciplina[i] for i in aulas}
+    return {j for j in range(len(instancia))
+            if mascara >> j & 1 or instancia.prof[j] in profs or instancia.disciplina[j] in disciplinas} - set(aulas)
+
+
+#grade_anterior: ID_Aula -> nome do slot (ex.: lida de grade_final.csv); alteradas: IDs das aulas
+#novas ou alteradas. Retorna a grade reparada (posição -> id do slot, ou None se não houve como
+#encaixar tudo no tempo) e um resumo do reparo.
+def reparar_grade(instancia, grade_anterior, alteradas, tempo_limite=TEMPO_REPARO, seed=None):
+    inicio = time.time()
+    prazo = inicio + tempo_limite
+    solver = SolucionadorTimetabling(instancia, seed)
+
+    # Aulas que continuam no mesmo slot, conferidas contra a grade já montada; aulas alteradas, novas,
+    # em slot que não existe mais ou que deixou de caber (ex.: nova duração) ficam liberadas.
+    no_slot_anterior = {}
+    for i, nid in enumerate(instancia.ids):
+        slot_id = SLOT_POR_NOME.get(grade_anterior.get(nid))
+        if nid not in alteradas and slot_id is not None: no_slot_anterior[i] = slot_id
+    liberadas = (set(instancia.aulas) - set(no_slot_anterior)) | solver.carregar_grade_salva(no_slot_anterior)
+
+    raio = 0
+    while True:
+        sucesso = False
+        for _ in range(TENTATIVAS_POR_RAIO):
+            if solver.dfs_slots(0, liberadas, prazo):
+                sucesso = True
+                break
+            if time.time() >= prazo: break
+        if sucesso or time.time() >= prazo or len(liberadas) == len(instancia): break
+        # Amplia o reparo: libera também as vizinhas de conflito das aulas liberadas.
+        for j in vizinhanca_conflito(instancia, liberadas):
+            if j in solver.grade: solver.atualizar_ocupacao(j, SLOTS[solver.grade[j]], False)
+            liberadas.add(j)
+        raio += 1
+
+    if sucesso:
+        solver.melhorar(prazo=prazo, aulas=liberadas)
+        # Devolve ao horário anterior as aulas liberadas sem alteração que ainda cabem lá sem perder score.
+        for i in liberadas:
+            anterior = SLOT_POR_NOME.get(grade_anterior.get(instancia.ids[i]))
+            if anterior is None or instancia.ids[i] in alteradas or solver.grade[i] == anterior: continue
+            score = solver.score
+            desfazer = solver.realocar([(i, SLOTS[anterior])])
+            if desfazer is not None and solver.score < score: solver.realocar(desfazer)
+    grade = dict(solver.grade) if sucesso else None
+    mantidas = [nid for nid in instancia.ids if nid in grade_anterior and nid not in alteradas]
+    movidas = 0
+    if grade is not None:
+        movidas = sum(1 for nid in mantidas
+                      if SLOTS[grade[instancia.posicao[nid]]].nome != grade_anterior[nid])
+    resumo = {'liberadas': len(liberadas), 'raio': raio, 'movidas': movidas,
+              'novas': sum(1 for nid in instancia.ids if nid not in grade_anterior),
+              'score': solver.calcular_pontuacao_global() if sucesso else None, 'tempo': time.time() - inicio}
+    return grade, resumo
+
+
+#Etapa de atribuição de salas de uma grade (aula -> id do slot), independente de como ela foi obtida
+#(busca, motor exato, checkpoint ou reparo). As aulas de cada grupo de slots sobrepostos disputam as
+#mesmas salas, e cada grupo é um emparelhamento bipartido aula-sala resolvido por caminhos aumentantes
+#(BFS): as aulas com menos salas possíveis entram primeiro e cada uma prefere a menor sala que serve.
+#Um grupo com slots que não se sobrepõem dois a dois é tratado como se todos se sobrepusessem (na
+#tabela de slots atual isso não acontece). Devolve aula -> índice da sala; as aulas que disputam sala
+#e ficam de fora não aparecem.
+def atribuir_salas(instancia, grade):
+    grupos = defaultdict(list)
+    for i, slot_id in grade.items():
+        if instancia.salas_aula[i]: grupos[(SLOTS[slot_id].dia, GRUPO_SOBREPOSICAO[slot_id])].append(i)
+    sala_da_aula = {}
+    for aulas in grupos.values():
+        dona = {} # sala -> aula
+        for i in sorted(aulas, key=lambda i: (instancia.salas_aula[i].bit_count(), i)):
+            anterior = {} # sala -> aula de onde o caminho chegou nela
+            visitadas, fila, livre = 0, [i], None
+            while fila and livre is None:
+                proxima = []
+                for a in fila:
+                    opcoes = instancia.salas_aula[a] & ~visitadas
+                    while opcoes:
+                        bit = opcoes & -opcoes
+                        opcoes ^= bit
+                        visitadas |= bit
+                        r = bit.bit_length() - 1
+                        anterior[r] = a
+                        if r not in dona:
+                            livre = r
+                            break
+                        proxima.append(dona[r])
+                    if livre is not None: break
+                fila = proxima
+            # Caminho aumentante: cada aula do caminho passa para a sala seguinte.
+            r = livre
+            while r is not None:
+                a = anterior[r]
+                antiga = sala_da_aula.get(a)
+                dona[r], sala_da_aula[a] = a, r
+                if a == i: break
+                r = antiga
+    return sala_da_aula
+
+
+#Grava em arquivo temporário e renomeia, para quem lê a grade durante a busca (ou depois de uma
+#execução interrompida) nunca encontrar um arquivo pela metade.
+def salvar_grade(instancia, grade, caminho=ARQUIVO_GRADE):
+    salas = atribuir_salas(instancia, grade)
+    def nome_sala(i):
+        if i in salas: return instancia.nomes_sala[salas[i]]
+        return instancia.nomes_lab[instancia.lab[i]] if instancia.lab[i] >= 0 and not instancia.salas_aula[i] else ''
+    linhas = [(instancia.ids[i], SLOTS[slot_id].nome, nome_sala(i)) for i, slot_id in grade.items()]
+    sem_sala = sum(1 for i in grade if instancia.salas_aula[i] and i not in salas)
+    if sem_sala: print(f"Aviso: {sem_sala} aula(s) ficaram sem sala livre que sirva no seu horário.")
+    temporario = caminho + ".tmp"
+    with open(temporario, 'w', newline='', encoding='utf-8') as f:
+        escritor = csv.writer(f, lineterminator='\n')
+        escritor.writerow(['Aula', 'Horario', 'Sala'])
+        escritor.writerows(linhas)
+    os.replace(temporario, caminho)
+
+
+#Grade salva por salvar_grade, como aula -> nome do slot.
+def ler_grade(caminho):
+    with open(caminho, newline='', encoding='utf-8') as f:
+        return {linha['Aula']: linha['Horario'] for linha in csv.DictReader(f)}
+
+
+#Cadastro de salas de um caminho (None: sem salas). Devolve (salas, ok); ok é False se houve erro.
+def ler_salas(caminho):
+    if caminho is None: return None, True
+    import catalogo
+    salas = catalogo.carregar_salas(caminho)
+    return salas, salas is not None
+
+
+#Aulas que não cabem em nenhuma sala cadastrada tornam a instância inviável: avisa e devolve False.
+def conferir_salas(instancia):
+    if instancia.nomes_sala:
+        print(f"{len(instancia.nomes_sala)} salas cadastradas; "
+              f"{sum(1 for m in instancia.salas_aula if m)} aulas disputam sala.")
+    if instancia.sem_sala:
+        print(f"Erro: {len(instancia.sem_sala)} aula(s) sem nenhuma sala com capacidade e recursos suficientes: "
+              + ", ".join(instancia.sem_sala[:10]) + (" ..." if len(instancia.sem_sala) > 10 else ""))
+        return False
+    return True
+
+
+#Condições necessárias de viabilidade que as preferências podem quebrar, conferidas antes da busca:
+#   toda aula tem algum slot possível (turno, duração e disponibilidade do professor);
+#   cada professor tem horas possíveis para a sua carga: em cada dia, as unidades de hora cobertas pelos
+#   slots possíveis das suas aulas, até 8, somadas nos seus max_dias melhores dias;
+#   cada disciplina tem, para as suas aulas, tantos dias com algum slot possível quanto aulas, contando
+#   no máximo os max_dias de cada um dos seus professores.
+#Avisa e devolve False se alguma falha.
+def conferir_disponibilidade(instancia):
+    def erro(mensagem, itens):
+        if itens: print(f"Erro: {len(itens)} {mensagem}: " + ", ".join(itens[:10]) + (" ..." if len(itens) > 10 else ""))
+        return bool(itens)
+
+    if erro("aula(s) sem nenhum horário em que o professor esteja disponível", instancia.sem_horario): return False
+    unidades = defaultdict(lambda: [0] * len(DIAS))   # professor -> unidades possíveis em cada dia
+    carga = defaultdict(int)                           # professor -> horas de aula na semana
+    dias = defaultdict(int)                            # disciplina -> dias com algum slot possível
+    aulas = defaultdict(int)                           # disciplina -> aulas
+    profs = defaultdict(set)                           # disciplina -> professores
+    for i in instancia.aulas:
+        p, d = instancia.prof[i], instancia.disciplina[i]
+        for s in instancia.slots_aula[i]:
+            unidades[p][s.dia] |= s.mascara
+            dias[d] |= 1 << s.dia
+        carga[p] += instancia.duracao[i]
+        aulas[d] += 1
+        profs[d].add(p)
+    sem_horas = []
+    for p, por_dia in unidades.items():
+        horas = sorted((min(8, m.bit_count()) for m in por_dia), reverse=True)
+        if carga[p] > sum(horas[:instancia.max_dias[p] or len(DIAS)]): sem_horas.append(instancia.nomes_prof[p])
+    sem_dias = [instancia.nomes_disciplina[d] for d in aulas
+                if aulas[d] > min(dias[d].bit_count(), sum(instancia.max_dias[p] or len(DIAS) for p in profs[d]))]
+    return not (erro("professor(es) com mais horas de aula que horas disponíveis na semana", sorted(sem_horas))
+                or erro("disciplina(s) com mais aulas que dias disponíveis", sorted(sem_dias)))
+
+
+#Modo de reparo da linha de comando: compara o catálogo anterior com o atual (ARQUIVO_DADOS) e
+#repara a grade salva em caminho_grade, sobrescrevendo-a.
+def executar_reparo(caminho_anterior, caminho_grade=ARQUIVO_GRADE, tempo_limite=TEMPO_REPARO, usar_cache=True,
+                    seed=None, arquivo_salas=None, arquivo_preferencias=None):
+    df_anterior, _ = carregar_catalogo(caminho_anterior, usar_cache)
+    df, indice = carregar_catalogo(usar_cache=usar_cache)
+    salas, ok = ler_salas(arquivo_salas)
+    if df is None or df_anterior is None or not ok: return
+    prefs, ok = ler_preferencias(arquivo_preferencias, df)
+    if not ok: return
+    try:
+        grade_anterior = ler_grade(caminho_grade)
+    except Exception as e:
+        print(f"Erro ao carregar a grade anterior: {e}")
+        return
+
+    inicio = time.time()
+    alteradas, removidas = diferenca_catalogo(df_anterior, df)
+    instancia = construir_instancia(df, prefs, indice, salas)
+    if not conferir_salas(instancia) or not conferir_disponibilidade(instancia): return
+    print(f"Catálogo: {len(alteradas)} aula(s) nova(s) ou alterada(s), {len(removidas)} removida(s).")
+
+    grade, resumo = reparar_grade(instancia, grade_anterior, alteradas, tempo_limite, seed)
+    if grade is None:
+        print(f"FALHA: reparo sem solução em {resumo['tempo']:.2f}s ({resumo['liberadas']} aulas liberadas). "
+              "Rode a otimização completa.")
+        return
+    print(f"Reparo em {(time.time() - inicio) * 1000:.0f} ms ({resumo['tempo'] * 1000:.0f} ms de busca): "
+          f"{resumo['liberadas']} aula(s) liberada(s), raio {resumo['raio']}, "
+          f"{resumo['movidas']} aula(s) já alocada(s) mudaram de horário, {resumo['novas']} nova(s). "
+          f"Score: {resumo['score']}")
+    salvar_grade(instancia, grade, caminho_grade)
+    print(f"Grade reparada salva em '{caminho_grade}'.")
+
+
+#Modo anytime (--checkpoint): cada nova melhor grade é gravada em ARQUIVO_GRADE durante a busca (no
+#máximo a cada INTERVALO_CHECKPOINT segundos, e sempre no fim ou numa interrupção), e o log de soluções
+#recebe uma linha JSON por grade gravada, com instante, score, rodada e semente. Cada execução (rodada)
+#registra também o seu início, para que --retomar continue com a rodada e a semente seguintes.
+ARQUIVO_LOG_SOLUCOES = os.path.join(BASE_DIR, "solucoes.jsonl")
+INTERVALO_CHECKPOINT = 1.0
+
+def registrar_no_log(caminho, registro):
+    registro = {'evento': registro.pop('evento'), 'instante': datetime.now().isoformat(timespec='seconds'), **registro}
+    with open(caminho, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(registro) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+#Devolve o registro de início da última rodada e o registro da melhor solução do log (None se não houver).
+def ler_log_solucoes(caminho):
+    inicio, melhor = None, None
+    with open(caminho, encoding='utf-8') as f:
+        for linha in f:
+            try:
+                r = json.loads(linha)
+            except ValueError:
+                continue # linha cortada por uma interrupção no meio da escrita
+            if r.get('evento') == 'inicio':
+                inicio = r
+            elif r.get('evento') == 'solucao' and (melhor is None or r['score'] > melhor['score']):
+                melhor = r
+    return inicio, melhor
+
+
+#Semente da rodada seguinte, derivada da semente da rodada anterior.
+def proxima_semente(seed):
+    return random.Random(seed).randrange(2**31)
+
+
+#Grade salva em um checkpoint (aula -> id do slot) e o seu score, conferida contra o catálogo atual.
+#Devolve None se faltar alguma aula ou se alguma não couber mais no slot salvo (ex.: o catálogo mudou).
+def carregar_checkpoint(instancia, caminho_grade=ARQUIVO_GRADE):
+    try:
+        salva = ler_grade(caminho_grade)
+    except Exception as e:
+        print(f"Erro ao carregar a grade do checkpoint: {e}")
+        return None
+    grade = {i: SLOT_POR_NOME.get(salva.get(nid)) for i, nid in enumerate(instancia.ids)}
+    if None in grade.values(): return None
+    solver = SolucionadorTimetabling(instancia)
+    if solver.carregar_grade_salva(grade): return None
+    return dict(solver.grade), solver.calcular_pontuacao_global()
+
+
+#No modo checkpoint, SIGTERM (o sinal que gerenciadores de filas mandam ao cancelar um job ou ao
+#estourar o seu tempo) interrompe a busca como um Ctrl+C, para a melhor grade ser gravada antes de sair.
+def interromper(sinal, quadro):
+    raise KeyboardInterrupt
+
+
+#Relatório de perfil (--perfil): tempo de cada fase da execução e, da busca, os contadores, o tempo e as
+#chamadas de cada fase do solucionador e os candidatos rejeitados por motivo (ver SolucionadorInstrumentado).
+#Com vários processos, os tempos do solucionador são a soma dos trabalhadores, não o tempo de parede.
+def gravar_perfil(caminho, relatorio):
+    temporario = caminho + ".tmp"
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, indent=2, ensure_ascii=False)
+    os.replace(temporario, caminho)
+
+
+def imprimir_perfil(relatorio):
+    print("Perfil por fase: " + ", ".join(f"{fase} {s:.2f}s" for fase, s in relatorio['fases'].items()))
+    solucionador = relatorio.get('solucionador')
+    if not solucionador: return
+    print("Solucionador: " + ", ".join(f"{fase} {s:.2f}s ({solucionador['chamadas'][fase]}x)"
+                                       for fase, s in solucionador['segundos'].items()))
+    candidatos = relatorio['candidatos']
+    if candidatos['considerados']:
+        taxa = candidatos['aceitos'] / candidatos['considerados']
+        print(f"Candidatos: {candidatos['considerados']} considerados, {taxa:.1%} aceitos. Rejeitados por "
+              + ", ".join(f"{m}: {n}" for m, n in sorted(relatorio['rejeitados'].items(), key=lambda x: -x[1])))
+
+
+#decompor: busca cada componente independente da instância separadamente (ver decompor_componentes).
+#motor: 'heuristica' ou um dos motores exatos de exato.py ('cpsat', 'cbc'), que recebe a melhor grade
+#       da heurística como solução inicial e reporta o limitante provado e o gap.
+#usar_cache: lê o catálogo processado e o índice de conflitos do cache em disco (ver carregar_catalogo).
+#checkpoint: caminho do log de soluções do modo anytime (None desliga). retomar: continua o checkpoint
+#anterior, partindo da grade em ARQUIVO_GRADE e da semente seguinte à da última rodada do log.
+#seed: semente da execução (None sorteia uma, que é impressa para a execução poder ser repetida).
+#max_tentativas: tentativas por busca, para repetir uma execução sem depender do relógio.
+#perfil: caminho do relatório de perfil em JSON (None desliga a instrumentação; ver gravar_perfil).
+#arquivo_salas: cadastro de salas (None: aulas sem sala, ver InstanciaProblema).
+def executar(workers=None, tempo_limite=TEMPO_LIMITE_SEGUNDOS, modo='gulosa', melhoria=True, decompor=True,
+             motor='heuristica', usar_cache=True, checkpoint=None, retomar=False, seed=None, max_tentativas=None,
+             perfil=None, arquivo_salas=None, arquivo_preferencias=None):
+    if motor != 'heuristica':
+        import exato
+        if not exato.motor_disponivel(motor):
+            print(f"Erro: o motor '{motor}' precisa do pacote '{exato.DEPENDENCIAS[motor]}' "
+                  f"(pip install {exato.DEPENDENCIAS[motor]}).")
+            return
+
+    fases, tempos_catalogo = {}, {}
+    relogio = time.perf_counter()
+    def marcar(fase):
+        nonlocal relogio
+        agora = time.perf_counter()
+        fases[fase] = fases.get(fase, 0.0) + agora - relogio
+        relogio = agora
+
+    df, indice = carregar_catalogo(usar_cache=usar_cache, tempos=tempos_catalogo)
+    salas, ok = ler_salas(arquivo_salas)
+    if df is None or not ok: return
+    marcar('catalogo')
+    
+    prefs, ok = ler_preferencias(arquivo_preferencias, df)
+    if not ok: return
+    instancia = construir_instancia(df, prefs, indice, salas)
+    if not conferir_salas(instancia) or not conferir_disponibilidade(instancia): return
     
-    TEMPO_LIMITE_SEGUNDOS = 15
+    ordenar_slots_por_popularidade(instancia)
+    marcar('instancia')
+    
+    if workers is None: workers = os.cpu_count() or 1
     inicio = time.time()
     
     melhor_grade = None
     melhor_score = -float('inf')
     solucoes_encontradas = 0
-    tentativas = 0
+
+    if seed is None: seed = random.randrange(2**31)
+    rodada, grade_inicial = 1, None
+    if retomar:
+        inicio_anterior, melhor_anterior = ler_log_solucoes(checkpoint) if os.path.exists(checkpoint) else (None, None)
+        if inicio_anterior is None:
+            print(f"Nenhum checkpoint em '{checkpoint}'; a busca começa do zero.")
+        else:
+            seed, rodada = proxima_semente(inicio_anterior['seed']), inicio_anterior['rodada'] + 1
+            salva = carregar_checkpoint(instancia)
+            if salva is None:
+                print(f"A grade de '{ARQUIVO_GRADE}' não vale para o catálogo atual; a busca começa do zero "
+                      "(use --reparar para aproveitá-la).")
+            else:
+                melhor_grade, melhor_score = salva
+                grade_inicial = dict(melhor_grade)
+                print(f"Retomando o checkpoint na rodada {rodada}, a partir da grade salva (score {melhor_score}; "
+                      f"melhor do log: {melhor_anterior['score'] if melhor_anterior else '-'}).")
+
+    pendente = False # melhor grade ainda não gravada no checkpoint
+    ultima_gravacao = 0.0
+    if checkpoint:
+        registrar_no_log(checkpoint, {'evento': 'inicio', 'rodada': rodada, 'seed': seed, 'tempo_limite': tempo_limite})
+        sinal_anterior = signal.signal(signal.SIGTERM, interromper)
+
+    def gravar_checkpoint():
+        nonlocal pendente, ultima_gravacao
+        salvar_grade(instancia, melhor_grade)
+        registrar_no_log(checkpoint, {'evento': 'solucao', 't': round(time.time() - inicio, 3), 'score': melhor_score,
+                                      'rodada': rodada, 'seed': seed})
+        pendente, ultima_gravacao = False, time.time()
     
-    print(f"Iniciando Otimização por {TEMPO_LIMITE_SEGUNDOS} segundos...")
+    componentes = decompor_componentes(instancia) if decompor else [instancia.aulas]
+    marcar('decomposicao')
     
-  
-    #Como o algoritmo tem componentes aleatórios (shuffle nos candidatos),
-    # rodamos várias vezes dentro do tempo limite para tentar encontrar a melhor solução.
-    while (time.time() - inicio) < TEMPO_LIMITE_SEGUNDOS:
-        tentativas += 1
-        solver = SolucionadorTimetabling(G_comp, df, prefs)
-        sucesso = solver.dfs_slots(0, set(G_comp.nodes))
-        
-        if sucesso:
-            solucoes_encontradas += 1
-            score_atual = solver.calcular_pontuacao_global()
-            tempo_decorrido = time.time() - inicio
-            print(f"[T+{tempo_decorrido:.1f}s] Solução #{solucoes_encontradas} encontrada. Score: {score_atual}")
-            
-            if score_atual > melhor_score:
-                melhor_score = score_atual
-                melhor_grade = solver.grade.copy()
-                print(f"   >>> NOVA MELHOR GRADE! (Score: {melhor_score})")
+    print(f"Iniciando Otimização por {tempo_limite} segundos com {workers} processo(s), semente {seed}..."
+          + (f" Checkpoint em '{checkpoint}' (rodada {rodada})." if checkpoint else ""))
+    if len(componentes) > 1:
+        print(f"Instância decomposta em {len(componentes)} componentes independentes: "
+              + ", ".join(nome_componente(instancia, c) for c in componentes))
+
+    def registrar(score_atual, grade):
+        nonlocal melhor_grade, melhor_score, solucoes_encontradas, pendente
+        solucoes_encontradas += 1
+        tempo_decorrido = time.time() - inicio
+        print(f"[T+{tempo_decorrido:.1f}s] Solução #{solucoes_encontradas} encontrada. Score: {score_atual}")
         
-    print("\n" + "="*40)
-    print(f"FIM. Soluções: {solucoes_encontradas}. Melhor Score: {melhor_score}")
+        if score_atual > melhor_score:
+            melhor_score = score_atual
+            melhor_grade = dict(grade)
+            pendente = True
+            print(f"   >>> NOVA MELHOR GRADE! (Score: {melhor_score})")
+        if checkpoint and pendente and time.time() - ultima_gravacao >= INTERVALO_CHECKPOINT:
+            gravar_checkpoint()
+
+    est = None
+    try:
+        tempo_heuristica = tempo_limite if motor == 'heuristica' else tempo_limite * FRACAO_AQUECIMENTO
+        relogio = time.perf_counter()
+        est = otimizar(instancia, tempo_heuristica, registrar, workers, modo, melhoria, componentes, grade_inicial,
+                       seed, max_tentativas, instrumentar=perfil is not None)
+        marcar('busca')
+
+        print("\n" + "="*40)
+        print(f"FIM. Tentativas: {est['tentativas']}. Soluções: {solucoes_encontradas}. Melhor Score: {melhor_score}")
+        print(f"Busca: {est['nos']} nós, {est['backtracks']} backtracks ({est['saltos']} saltos), "
+              f"profundidade máxima {est['profundidade_max']}, "
+              f"{est['interrompidas']} tentativa(s) interrompida(s) pelo prazo, {est['podas']} podada(s) pelo score, "
+              f"{est['movimentos']} movimento(s) aceito(s) na busca local.")
+        if len(componentes) > 1:
+            for c, est_c in zip(componentes, est['por_componente']):
+                print(f"  {nome_componente(instancia, c)}: {est_c['tentativas']} tentativas, {est_c['nos']} nós, "
+                      f"melhor score {est_c['melhor_score']}")
+
+        if motor != 'heuristica':
+            print(f"\nMotor exato '{motor}' partindo da melhor grade da heurística (score {melhor_score})...")
+            relogio = time.perf_counter()
+            r = exato.resolver_exato(instancia, motor, tempo_limite - (time.time() - inicio), registrar, workers,
+                                     melhor_grade, seed)
+            marcar('motor_exato')
+            gap = '-' if r.gap is None else f"{r.gap:.1%}"
+            primeira = '-' if r.tempo_primeira is None else f"{r.tempo_primeira:.1f}s"
+            print(f"Motor {motor}: {r.status}. Score {r.score}, limitante {r.limite}, gap {gap}, "
+                  f"primeira solução em {primeira}, {r.tempo:.1f}s no total.")
+    except KeyboardInterrupt:
+        print(f"\nBusca interrompida em T+{time.time() - inicio:.1f}s. Melhor Score: {melhor_score}")
+        marcar('busca' if est is None else 'motor_exato')
+    finally:
+        if checkpoint: signal.signal(signal.SIGTERM, sinal_anterior)
     
     if melhor_grade:
-        caminho_saida = os.path.join(BASE_DIR, "grade_final.csv")
-        pd.DataFrame(list(melhor_grade.items()), columns=['Aula', 'Horario']).to_csv(caminho_saida, index=False)
-        print(f"Melhor grade salva em '{caminho_saida}'.")
+        if not checkpoint:
+            salvar_grade(instancia, melhor_grade)
+        elif pendente:
+            gravar_checkpoint()
+        print(f"Melhor grade salva em '{ARQUIVO_GRADE}'.")
     else:
         print("FALHA: Nenhuma solução encontrada.")
+    marcar('gravacao')
+
+    if perfil:
+        relatorio = {'seed': seed, 'workers': workers, 'modo': modo, 'melhoria': melhoria, 'motor': motor,
+                     'tempo_limite': tempo_limite, 'aulas': len(instancia.ids), 'melhor_score': melhor_score if melhor_grade else None,
+                     'solucoes': solucoes_encontradas, 'fases': fases, 'catalogo': tempos_catalogo}
+        if est is not None:
+            estatisticas = dict(est)
+            perfil_busca = estatisticas.pop('perfil', novo_perfil())
+            relatorio['solucionador'] = {'segundos': perfil_busca['segundos'], 'chamadas': perfil_busca['chamadas']}
+            relatorio['candidatos'] = perfil_busca['candidatos']
+            relatorio['rejeitados'] = perfil_busca['rejeitados']
+            relatorio['componentes'] = [dict({k: v for k, v in est_c.items() if k != 'perfil'},
+                                             nome=nome_componente(instancia, c))
+                                        for c, est_c in zip(componentes, estatisticas.pop('por_componente'))]
+            relatorio['busca'] = estatisticas
+        gravar_perfil(perfil, relatorio)
+        imprimir_perfil(relatorio)
+        print(f"Perfil salvo em '{perfil}'.")
+
+
+#Roda funcao() sob um profiler de Python e grava o resultado em saida: 'cprofile' (biblioteca padrão;
+#grava as estatísticas para pstats/snakeviz e imprime as funções de maior tempo acumulado) ou
+#'pyinstrument' (opcional, pip install pyinstrument; grava o relatório em HTML). Os dois só enxergam o
+#processo principal: com --workers > 1, a busca roda nos trabalhadores e fica de fora.
+def executar_com_profiler(profiler, saida, funcao):
+    if profiler == 'pyinstrument':
+        if importlib.util.find_spec('pyinstrument') is None:
+            print("Erro: --pyinstrument precisa do pacote 'pyinstrument' (pip install pyinstrument).")
+            return
+        from pyinstrument import Profiler
+        perfilador = Profiler()
+        perfilador.start()
+        try:
+            funcao()
+        finally:
+            perfilador.stop()
+            with open(saida, 'w', encoding='utf-8') as f: f.write(perfilador.output_html())
+    else:
+        import cProfile
+        import pstats
+        perfilador = cProfile.Profile()
+        perfilador.enable()
+        try:
+            funcao()
+        finally:
+            perfilador.disable()
+            perfilador.dump_stats(saida)
+            pstats.Stats(perfilador).sort_stats('cumulative').print_stats(20)
+    print(f"Perfil do {profiler} salvo em '{saida}'.")
 
 if __name__ == "__main__":
-    executar()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="University Timetabling Solver")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="processos de busca em paralelo (padrão: número de CPUs)")
+    parser.add_argument('--tempo', type=float,
+                        help=f"tempo limite em segundos (padrão: {TEMPO_LIMITE_SEGUNDOS}, ou {TEMPO_REPARO} no modo de reparo)")
+    parser.add_argument('--busca', choices=['gulosa', 'backjumping'], default='gulosa',
+                        help="gulosa: um clique por slot e reinícios; backjumping: cliques alternativos com backjumping")
+    parser.add_argument('--melhoria', choices=['recozimento', 'nenhuma'], default='recozimento',
+                        help="busca local aplicada a cada grade completa (recozimento simulado) ou só reinícios")
+    parser.add_argument('--decomposicao', choices=['componentes', 'nenhuma'], default='componentes',
+                        help="busca cada componente independente (ex.: turnos CCO e SIN) em separado ou a instância inteira")
+    parser.add_argument('--motor', choices=['heuristica', 'cpsat', 'cbc'], default='heuristica',
+                        help="heuristica: só a busca; cpsat (ortools) ou cbc (pulp): motor exato com limitante e gap, "
+                             "partindo da melhor grade da busca")
+    parser.add_argument('--reparar', metavar='CATALOGO_ANTERIOR',
+                        help="modo de reparo: repara grade_final.csv (ou --grade) após as mudanças entre "
+                             "CATALOGO_ANTERIOR e o catálogo atual, movendo o mínimo de aulas")
+    parser.add_argument('--grade', default=ARQUIVO_GRADE, help="grade anterior usada no modo de reparo")
+    parser.add_argument('--checkpoint', nargs='?', const=ARQUIVO_LOG_SOLUCOES, metavar='LOG',
+                        help="modo anytime: grava cada nova melhor grade em grade_final.csv durante a busca e "
+                             "registra instante, score e semente em LOG (padrão: solucoes.jsonl)")
+    parser.add_argument('--retomar', action='store_true',
+                        help="continua um checkpoint a partir de grade_final.csv, com a rodada e a semente "
+                             "seguintes do log (implica --checkpoint)")
+    parser.add_argument('--seed', type=int,
+                        help="semente da busca; a execução imprime a semente usada, para poder ser repetida")
+    parser.add_argument('--tentativas', type=int,
+                        help="tentativas por busca (por componente e processo); com --seed, repete a execução "
+                             "exatamente, sem depender do relógio")
+    parser.add_argument('--perfil', metavar='ARQUIVO.json',
+                        help="instrumenta a busca e grava em JSON o tempo de cada fase, os contadores da busca e "
+                             "os candidatos rejeitados por motivo")
+    parser.add_argument('--cprofile', metavar='ARQUIVO.prof',
+                        help="roda sob o cProfile, grava as estatísticas (pstats/snakeviz) e imprime as funções "
+                             "mais caras; só mede o processo principal (use --workers 1)")
+    parser.add_argument('--pyinstrument', metavar='ARQUIVO.html',
+                        help="roda sob o pyinstrument (pip install pyinstrument) e grava o relatório em HTML; "
+                             "só mede o processo principal (use --workers 1)")
+    parser.add_argument('--salas', default=ARQUIVO_SALAS,
+                        help="cadastro de salas (Sala, Capacidade, Recursos) usado para atribuir uma sala a cada "
+                             "aula; padrão: salas.csv, se existir")
+    parser.add_argument('--sem-salas', action='store_true', help="não atribui salas (só horários)")
+    parser.add_argument('--preferencias', metavar='PREFERENCIAS.csv',
+                        help="preferências reais dos professores (Professor, Horario, Peso e Max_Dias): pesos por "
+                             "horário, horários indisponíveis e máximo de dias na semana; sem ela, as preferências "
+                             "são simuladas")
+    parser.add_argument('--sem-cache', action='store_true',
+                        help="processa o catálogo e o grafo de conflitos do zero, sem ler nem gravar o cache em .cache/")
+    args = parser.parse_args()
+    arquivo_salas = None
+    if not args.sem_salas and (args.salas != ARQUIVO_SALAS or os.path.exists(ARQUIVO_SALAS)):
+        arquivo_salas = args.salas
+    if args.reparar:
+        tarefa = lambda: executar_reparo(args.reparar, args.grade, args.tempo or TEMPO_REPARO, not args.sem_cache,
+                                         args.seed, arquivo_salas, args.preferencias)
+    else:
+        tarefa = lambda: executar(workers=args.workers, tempo_limite=args.tempo or TEMPO_LIMITE_SEGUNDOS,
+                                  modo=args.busca, melhoria=args.melhoria == 'recozimento',
+                                  decompor=args.decomposicao == 'componentes', motor=args.motor,
+                                  usar_cache=not args.sem_cache,
+                                  checkpoint=args.checkpoint or (ARQUIVO_LOG_SOLUCOES if args.retomar else None),
+                                  retomar=args.retomar, seed=args.seed, max_tentativas=args.tentativas,
+                                  perfil=args.perfil, arquivo_salas=arquivo_salas,
+                                  arquivo_preferencias=args.preferencias)
+    if args.cprofile or args.pyinstrument:
+        if args.workers > 1 and not args.reparar:
+            print(f"Aviso: o profiler só mede o processo principal; com {args.workers} processos a busca fica "
+                  "de fora (use --workers 1).")
+        if args.cprofile: executar_com_profiler('cprofile', args.cprofile, tarefa)
+        else: executar_com_profiler('pyinstrument', args.pyinstrument, tarefa)
+    else:
+        tarefa()
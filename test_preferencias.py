@@ -0,0 +1,92 @@
+# test_preferencias.py
+# Regressão das preferências reais (main.py --preferencias) em um catálogo mínimo: pesos, horários
+# indisponíveis e Max_Dias respeitados na grade, e os erros de arquivos inválidos, contraditórios ou
+# que tornam a instância inviável.
+# Uso: python -m pytest test_preferencias.py
+import pytest
+
+import main
+
+
+# Prof_A dá duas aulas de CCO_P1_OB_01 (em dias diferentes) e uma de CCO_P1_OB_02; Prof_B, duas de
+# CCO_P2_OB_01. Todas de 2h, no turno diurno.
+CATALOGO = """ID_Aula,ID_Disciplina,Nome,Curso,Periodo,Professor,Lab_Requerido,CH_Aula
+CCO_P1_OB_01_A,CCO_P1_OB_01,CCO_P1_OB_01,CCO,1,Prof_A,,2
+CCO_P1_OB_01_B,CCO_P1_OB_01,CCO_P1_OB_01,CCO,1,Prof_A,,2
+CCO_P1_OB_02_A,CCO_P1_OB_02,CCO_P1_OB_02,CCO,1,Prof_A,,2
+CCO_P2_OB_01_A,CCO_P2_OB_01,CCO_P2_OB_01,CCO,2,Prof_B,,2
+CCO_P2_OB_01_B,CCO_P2_OB_01,CCO_P2_OB_01,CCO,2,Prof_B,,2
+"""
+
+CABECALHO = "Professor,Horario,Peso,Max_Dias\n"
+
+
+def escrever(pasta, nome, texto):
+    caminho = pasta / nome
+    caminho.write_text(texto, encoding='utf-8')
+    return str(caminho)
+
+
+#Catálogo mínimo e as preferências lidas de um arquivo com as linhas dadas: (df, índice, prefs, ok).
+def carregar(pasta, linhas):
+    df, indice = main.carregar_catalogo(escrever(pasta, "catalogo.csv", CATALOGO), False)
+    prefs, ok = main.ler_preferencias(escrever(pasta, "preferencias.csv", CABECALHO + linhas), df)
+    return df, indice, prefs, ok
+
+
+def melhor_grade(instancia):
+    melhor = {'score': None, 'grade': None}
+    def registrar(score, grade):
+        if grade is not None and (melhor['score'] is None or score > melhor['score']):
+            melhor['score'], melhor['grade'] = score, dict(grade)
+    main.otimizar(instancia, 1.0, registrar, melhoria=True, seed=1)
+    return melhor['score'], melhor['grade']
+
+
+def test_grade_respeita_pesos_indisponibilidade_e_max_dias(tmp_path):
+    df, indice, prefs, ok = carregar(tmp_path, "Prof_A,SEX,indisponivel,\n"
+                                               "Prof_A,M1_M2,20,\n"
+                                               "Prof_A,,,2\n"
+                                               "Prof_B,SEG_T3_T4,50,\n")
+    assert ok
+    instancia = main.construir_instancia(df, prefs, indice)
+    assert main.conferir_disponibilidade(instancia)
+    score, grade = melhor_grade(instancia)
+    assert grade is not None and len(grade) == len(instancia)
+
+    slots = {instancia.ids[i]: main.SLOTS[s] for i, s in grade.items()}
+    do_a = [slots[a] for a in ('CCO_P1_OB_01_A', 'CCO_P1_OB_01_B', 'CCO_P1_OB_02_A')]
+    assert all(main.DIAS[s.dia] != 'SEX' for s in do_a)
+    assert len({s.dia for s in do_a}) <= 2
+    # O score é a soma dos pesos dos slots ocupados. No ótimo, Prof_A tem M1_M2 nos seus dois dias
+    # (só um M1_M2 por dia) e Prof_B tem SEG_T3_T4 em uma das suas aulas.
+    pesos = {'M1_M2': 20}
+    esperado = sum(pesos.get(s.nome.split('_', 1)[1], 0) for s in do_a) \
+        + sum(50 for a in ('CCO_P2_OB_01_A', 'CCO_P2_OB_01_B') if slots[a].nome == 'SEG_T3_T4')
+    assert score == esperado == 90
+
+
+@pytest.mark.parametrize('linhas', [
+    "Prof_A,SAB_M1_M2,10,\n",                                   # dia que não existe
+    "Prof_A,SEG_M1,10,\n",                                      # peso em horário sem nenhum slot
+    "Prof_A,SEG_M1_M2,muito,\n",                                # peso que não é inteiro
+    "Prof_A,SEG_M1_M2,500,\n",                                  # peso fora de ±PESO_MAXIMO
+    "Prof_A,,,6\n",                                             # Max_Dias acima do número de dias
+    "Prof_A,,,2\nProf_A,,,3\n",                                 # Max_Dias diferentes
+    "Prof_A,SEG_M1_M2,10,\nProf_A,seg_m1_m2,-10,\n",            # horário repetido
+    "Prof_A,SEX,indisponivel,\nProf_A,SEX_M1_M2,10,\n",         # peso positivo onde está indisponível
+])
+def test_arquivo_invalido_ou_contraditorio_e_recusado(tmp_path, linhas):
+    _, _, prefs, ok = carregar(tmp_path, linhas)
+    assert not ok and prefs is None
+
+
+@pytest.mark.parametrize('linhas', [
+    "".join(f"Prof_A,{d},indisponivel,\n" for d in main.DIAS),        # nenhum horário possível
+    "".join(f"Prof_A,{d},indisponivel,\n" for d in main.DIAS[:4]),    # CCO_P1_OB_01 em um dia só
+    "Prof_A,,,1\n",                                                   # idem, pelo Max_Dias
+])
+def test_preferencias_que_tornam_a_instancia_inviavel(tmp_path, linhas):
+    df, indice, prefs, ok = carregar(tmp_path, linhas)
+    assert ok
+    assert not main.conferir_disponibilidade(main.construir_instancia(df, prefs, indice))
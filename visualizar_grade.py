@@ -1,232 +1,379 @@
 # visualizar_grade.py
-import pandas as pd
+# O pandas (e o leitor do catálogo) só é importado ao gerar a visualização, não ao carregar o módulo.
 import os
+import re
+import argparse
+import hashlib
+import json
+from collections import defaultdict
+from html import escape
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__)) 
+import main
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 ARQUIVO_DADOS = os.path.join(BASE_DIR, "dataset_processado.csv")
 ARQUIVO_GRADE = os.path.join(BASE_DIR, "grade_final.csv")
 
-# Cria a pasta 'visualizar'
+# Página única com todas as turmas
 output_dir = os.path.join(BASE_DIR)
 os.makedirs(output_dir, exist_ok=True)
 ARQUIVO_SAIDA = os.path.join(output_dir, "grade_visual.html")
 
-# Configurações de Slots
-ORDEM_SLOTS = ['M1_M2', 'M3_M4', 'T1_T2', 'T3_T4', 'N1_N2', 'N3_N4', 'N3_N4_N5']
-ORDEM_DIAS = ['SEG', 'TER', 'QUA', 'QUI', 'SEX']
-
-def aplicar_trilhas(df):
-    """Recalcula a lógica de trilhas para visualização"""
-    df['Tipo_Real'] = df['Nome'].apply(lambda x: 'OP' if '_OP_' in x else 'OB')
-    df['Trilha'] = 0 # 0 = Nenhuma/Obrigatória
-    
-    # Agrupa e aplica a mesma lógica do main.py
-    grupos = df[df['Tipo_Real'] == 'OP'].groupby(['Curso', 'Periodo'])
-    
-    for (curso, periodo), grupo in grupos:
-        if int(periodo) >= 5:
-            disciplinas_unicas = grupo['ID_Disciplina'].unique()
-            # Mapa determinístico: índice par = Trilha 1, ímpar = Trilha 2
-            mapa_trilha = {disc: (i % 2) + 1 for i, disc in enumerate(disciplinas_unicas)}
-            
-            for idx, row in grupo.iterrows():
-                if row['ID_Disciplina'] in mapa_trilha:
-                    df.at[idx, 'Trilha'] = mapa_trilha[row['ID_Disciplina']]
-    return df
-
-def gerar_visualizacao():
-    if not os.path.exists(ARQUIVO_GRADE): 
-        print("Arquivo grade_final.csv não encontrado!")
-        return
-        
-    df_dados = pd.read_csv(ARQUIVO_DADOS)
-    df_grade = pd.read_csv(ARQUIVO_GRADE)
-    
-    # Merge
-    df = pd.merge(df_grade, df_dados, left_on='Aula', right_on='ID_Aula', how='left')
-    
-    # Aplica identificação de Trilhas
-    df = aplicar_trilhas(df)
-    
-    # Extrai slot e dia
-    df['Dia'] = df['Horario'].apply(lambda x: x.split('_')[0])
-    df['Slot'] = df['Horario'].apply(lambda x: '_'.join(x.split('_')[1:]))
-    
-    grupos = df.groupby(['Curso', 'Periodo'])
-    
-    # --- HTML ---
-    html = """
-    <!DOCTYPE html>
-    <html lang="pt-br">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>Grade Universitária - Trilhas de Optativas</title>
-        <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-        <style>
-            body { background-color: #f0f2f5; padding-top: 20px; font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; }
-            
-            /* Estilo Base do Card */
-            .aula-card { 
-                background-color: #fff; 
-                border-left: 5px solid #0d6efd; /* Azul padrão (OB) */
-                padding: 10px; 
-                margin-bottom: 8px; 
-                box-shadow: 0 2px 5px rgba(0,0,0,0.08);
-                border-radius: 6px;
-                font-size: 0.85rem;
-                position: relative;
-                transition: transform 0.2s;
-            }
-            .aula-card:hover { transform: scale(1.02); box-shadow: 0 4px 10px rgba(0,0,0,0.15); z-index: 10; }
-            
-            /* Estilos de Trilha */
-            .aula-card.trilha-1 { 
-                border-left-color: #0dcaf0; /* Ciano */
-                background-color: #faffff;
-            }
-            .aula-card.trilha-2 { 
-                border-left-color: #ffc107; /* Amarelo/Laranja */
-                background-color: #fffff5;
-            }
-            
-            /* Tipografia */
-            .materia { font-weight: 700; color: #343a40; display: block; margin-bottom: 4px; line-height: 1.2; }
-            .prof { font-size: 0.8rem; color: #6c757d; display: block; }
-            .lab { font-size: 0.75rem; color: #dc3545; font-weight: bold; display: block; margin-top: 4px; }
-            
-            /* Badges */
-            .badge-trilha {
-                position: absolute;
-                top: 5px;
-                right: 5px;
-                font-size: 0.65rem;
-                padding: 3px 6px;
-                border-radius: 4px;
-                text-transform: uppercase;
-                font-weight: bold;
-            }
-            .bg-t1 { background-color: #0dcaf0; color: #000; }
-            .bg-t2 { background-color: #ffc107; color: #000; }
-            
-            /* Tabela */
-            .slot-cell { 
-                vertical-align: middle; 
-                font-weight: bold; 
-                background-color: #e9ecef; 
-                color: #495057;
-                width: 100px; 
-                text-align: center; 
-                font-size: 0.8rem;
-            }
-            .table th { text-align: center; background-color: #212529; color: white; border: none;}
-            
-            /* Navegação */
-            .nav-pills .nav-link.active { background-color: #0d6efd; }
-            .tab-content { background-color: white; padding: 20px; border-radius: 0 0 8px 8px; border: 1px solid #dee2e6; border-top: none; }
-        </style>
-    </head>
-    <body>
-    <div class="container-fluid px-4">
-        <h2 class="text-center mb-4">Grade Horária Otimizada <small class="text-muted fs-6">Com Visualização de Trilhas</small></h2>
-    """
+# Pasta das visões separadas (--dividir), com uma página por curso, turma, professor, lab ou sala e o índice.
+PASTA_VISOES = os.path.join(BASE_DIR, "visualizar")
 
-    # --- NAVEGAÇÃO POR CURSO ---
+# Assinatura (hash das aulas exibidas) de cada página já gerada: uma página só é refeita quando a
+# assinatura muda. Incremente VERSAO_MODELOS ao mudar os modelos de HTML, para refazer todas.
+ARQUIVO_ASSINATURAS = os.path.join(BASE_DIR, ".cache", "visualizacao.json")
+VERSAO_MODELOS = 2
+
+# Dias e blocos de horário exibidos, tirados da tabela de slots de main.py (um dia ou bloco novo em
+# main.OFERTA aparece aqui sem mudança). Os blocos vão na ordem do dia: pela primeira unidade de hora e,
+# no empate, o mais curto primeiro (N3_N4 antes de N3_N4_N5).
+ORDEM_DIAS = [d for i, d in enumerate(main.DIAS) if any(s.dia == i for s in main.SLOTS)]
+ORDEM_SLOTS = sorted({s.nome.split('_', 1)[1] for s in main.SLOTS},
+                     key=lambda b: (main.UNIDADES_HORA.index(b.split('_')[0]), b.count('_')))
+
+# Colunas que aparecem nas páginas; a assinatura de cada página é calculada só sobre elas.
+COLUNAS_VISAO = ['Aula', 'Horario', 'Sala', 'Nome', 'Curso', 'Periodo', 'Professor', 'Lab_Requerido', 'Trilha']
+
+DIVISOES = ['curso', 'periodo', 'professor', 'lab', 'sala']
+
+
+# --- MODELOS DE HTML ---
+ESTILO = """
+    body { background-color: #f0f2f5; padding-top: 20px; font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; }
+
+    /* Estilo Base do Card */
+    .aula-card {
+        background-color: #fff;
+        border-left: 5px solid #0d6efd; /* Azul padrão (OB) */
+        padding: 10px;
+        margin-bottom: 8px;
+        box-shadow: 0 2px 5px rgba(0,0,0,0.08);
+        border-radius: 6px;
+        font-size: 0.85rem;
+        position: relative;
+        transition: transform 0.2s;
+    }
+    .aula-card:hover { transform: scale(1.02); box-shadow: 0 4px 10px rgba(0,0,0,0.15); z-index: 10; }
+
+    /* Estilos de Trilha */
+    .aula-card.trilha-1 {
+        border-left-color: #0dcaf0; /* Ciano */
+        background-color: #faffff;
+    }
+    .aula-card.trilha-2 {
+        border-left-color: #ffc107; /* Amarelo/Laranja */
+        background-color: #fffff5;
+    }
+
+    /* Tipografia */
+    .materia { font-weight: 700; color: #343a40; display: block; margin-bottom: 4px; line-height: 1.2; }
+    .prof { font-size: 0.8rem; color: #6c757d; display: block; }
+    .lab { font-size: 0.75rem; color: #dc3545; font-weight: bold; display: block; margin-top: 4px; }
+    .sala { font-size: 0.75rem; color: #495057; font-weight: bold; display: block; margin-top: 4px; }
+
+    /* Badges */
+    .badge-trilha {
+        position: absolute;
+        top: 5px;
+        right: 5px;
+        font-size: 0.65rem;
+        padding: 3px 6px;
+        border-radius: 4px;
+        text-transform: uppercase;
+        font-weight: bold;
+    }
+    .bg-t1 { background-color: #0dcaf0; color: #000; }
+    .bg-t2 { background-color: #ffc107; color: #000; }
+
+    /* Tabela */
+    .slot-cell {
+        vertical-align: middle;
+        font-weight: bold;
+        background-color: #e9ecef;
+        color: #495057;
+        width: 100px;
+        text-align: center;
+        font-size: 0.8rem;
+    }
+    .table th { text-align: center; background-color: #212529; color: white; border: none;}
+
+    /* Navegação */
+    .nav-pills .nav-link.active { background-color: #0d6efd; }
+    .tab-content { background-color: white; padding: 20px; border-radius: 0 0 8px 8px; border: 1px solid #dee2e6; border-top: none; }
+"""
+
+CABECALHO = """<!DOCTYPE html>
+<html lang="pt-br">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{titulo}</title>
+    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
+    <style>{estilo}</style>
+</head>
+<body>
+<div class="container-fluid px-4">
+    <h2 class="text-center mb-4">{titulo} <small class="text-muted fs-6">{subtitulo}</small></h2>
+"""
+
+RODAPE = """
+</div>
+<script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
+</body>
+</html>
+"""
+
+CARTAO = """
+    <div class='aula-card {classe}'>{badge}
+        <span class='materia'>{nome}</span>
+        <span class='prof'>{detalhe}</span>{local}
+    </div>"""
+
+BADGE_TRILHA = {
+    1: ("trilha-1", "<span class='badge-trilha bg-t1'>Trilha 1</span>"),
+    2: ("trilha-2", "<span class='badge-trilha bg-t2'>Trilha 2</span>"),
+}
+
+ABA_CURSO = """
+    <li class="nav-item">
+        <button class="nav-link {ativo}" id="{curso}-tab" data-bs-toggle="tab" data-bs-target="#{curso}-pane" type="button" role="tab">{curso}</button>
+    </li>"""
+
+BOTAO_PERIODO = """
+    <button class="nav-link {ativo} text-start" id="v-pills-{curso}-{periodo}-tab" data-bs-toggle="pill" data-bs-target="#v-pills-{curso}-{periodo}" type="button" role="tab">Periodo {periodo}</button>"""
+
+
+#Card de uma aula. Nas páginas de turma o detalhe é o professor; nas de professor, lab e sala, que
+#misturam turmas, o detalhe inclui também o curso e o período. O local é a sala da aula (ou o lab, em
+#grades sem salas), em vermelho só quando a aula é de laboratório. Os nulos da aula já vêm como None
+#(ver tabela).
+def cartao(aula, mostrar_turma):
+    classe, badge = BADGE_TRILHA.get(int(aula.Trilha) if aula.Trilha is not None else 0, ("", ""))
+    detalhe = f"{aula.Professor} · {aula.Curso} P{aula.Periodo}" if mostrar_turma else aula.Professor
+    local = aula.Sala if aula.Sala is not None else aula.Lab_Requerido
+    estilo = 'lab' if aula.Lab_Requerido is not None else 'sala'
+    local = f"\n        <span class='{estilo}'>{escape(str(local))}</span>" if local is not None else ""
+    return CARTAO.format(classe=classe, badge=badge, nome=escape(str(aula.Nome)), detalhe=escape(str(detalhe)),
+                         local=local)
+
+
+#Blocos de horário exibidos: os oferecidos ao turno de cada curso presente (SIN noturno, os demais CCO).
+def slots_dos_cursos(cursos):
+    turnos = {'SIN' if 'SIN' in str(c) else 'CCO' for c in cursos}
+    blocos = {s.nome.split('_', 1)[1] for s in main.SLOTS if s.turno in turnos}
+    return [b for b in ORDEM_SLOTS if b in blocos]
+
+
+#Tabela dias × horários de um conjunto de aulas, gerada em pedaços. Os nulos (NaN, NA) viram None de uma
+#vez para a página, para que cartao não dependa do pandas.
+def tabela(aulas, mostrar_turma=False):
+    celulas = defaultdict(list)
+    for aula in aulas.astype(object).where(aulas.notna(), None).itertuples(index=False):
+        celulas[(aula.Slot, aula.Dia)].append(aula)
+
+    yield '\n<div class="table-responsive"><table class="table table-bordered mb-0">'
+    yield '<thead><tr><th>Horário</th>' + "".join(f"<th>{d}</th>" for d in ORDEM_DIAS) + '</tr></thead><tbody>'
+    for slot in slots_dos_cursos(aulas['Curso'].unique()):
+        nome_vis = "N3 - N5<br>(3h)" if slot == 'N3_N4_N5' else slot.replace('_', '<br>')
+        yield f"\n<tr><td class='slot-cell'>{nome_vis}</td>"
+        for d in ORDEM_DIAS:
+            yield "<td style='min-width: 140px; vertical-align: top;'>"
+            for aula in celulas.get((slot, d), ()):
+                yield cartao(aula, mostrar_turma)
+            yield "</td>"
+        yield "</tr>"
+    yield '</tbody></table></div>'
+
+
+#Abas por curso e, dentro de cada curso, uma aba por período com a tabela da turma.
+def abas_turmas(df):
+    turmas = dict(iter(df.groupby(['Curso', 'Periodo'], observed=True)))
     cursos = sorted(df['Curso'].unique())
-    html += '<ul class="nav nav-tabs" id="cursoTabs" role="tablist">'
+
+    # --- NAVEGAÇÃO POR CURSO ---
+    yield '\n<ul class="nav nav-tabs" id="cursoTabs" role="tablist">'
     for i, curso in enumerate(cursos):
-        active = 'active' if i == 0 else ''
-        html += f"""
-        <li class="nav-item">
-            <button class="nav-link {active}" id="{curso}-tab" data-bs-toggle="tab" data-bs-target="#{curso}-pane" type="button" role="tab">{curso}</button>
-        </li>"""
-    html += '</ul>'
-    
-    html += '<div class="tab-content">'
+        yield ABA_CURSO.format(ativo='active' if i == 0 else '', curso=curso)
+    yield '\n</ul>'
+
+    yield '\n<div class="tab-content">'
     for i, curso in enumerate(cursos):
-        active = 'show active' if i == 0 else ''
-        html += f'<div class="tab-pane fade {active}" id="{curso}-pane" role="tabpanel">'
-        
+        yield f'\n<div class="tab-pane fade {"show active" if i == 0 else ""}" id="{curso}-pane" role="tabpanel">'
+
         # --- NAVEGAÇÃO POR PERÍODO ---
-        periodos = sorted(df[df['Curso'] == curso]['Periodo'].unique())
-        html += f'<div class="d-flex align-items-start mt-3"><div class="nav flex-column nav-pills me-3" role="tablist" aria-orientation="vertical">'
-        
+        periodos = sorted(p for c, p in turmas if c == curso)
+        yield '<div class="d-flex align-items-start mt-3"><div class="nav flex-column nav-pills me-3" role="tablist" aria-orientation="vertical">'
         for j, p in enumerate(periodos):
-            p_active = 'active' if j == 0 else ''
-            html += f'<button class="nav-link {p_active} text-start" id="v-pills-{curso}-{p}-tab" data-bs-toggle="pill" data-bs-target="#v-pills-{curso}-{p}" type="button" role="tab">Periodo {p}</button>'
-        
-        html += '</div><div class="tab-content w-100">'
-        
+            yield BOTAO_PERIODO.format(ativo='active' if j == 0 else '', curso=curso, periodo=p)
+        yield '\n</div><div class="tab-content w-100">'
+
         for j, p in enumerate(periodos):
-            p_active = 'show active' if j == 0 else ''
-            html += f'<div class="tab-pane fade {p_active}" id="v-pills-{curso}-{p}" role="tabpanel">'
-            
-            # --- CONSTRUÇÃO DOS CARDS ---
-            grupo = grupos.get_group((curso, p))
-            mapa_aulas = {}
-            
-            for _, row in grupo.iterrows():
-                key = (row['Slot'], row['Dia'])
-                if key not in mapa_aulas: mapa_aulas[key] = []
-                
-                # Definição visual baseada na Trilha
-                classe_css = ""
-                badge_html = ""
-                
-                trilha = int(row['Trilha']) if pd.notna(row['Trilha']) else 0
-                
-                if trilha == 1:
-                    classe_css = "trilha-1"
-                    badge_html = "<span class='badge-trilha bg-t1'>Trilha 1</span>"
-                elif trilha == 2:
-                    classe_css = "trilha-2"
-                    badge_html = "<span class='badge-trilha bg-t2'>Trilha 2</span>"
-                
-                lab_html = f"<span class='lab'>{row['Lab_Requerido']}</span>" if pd.notna(row['Lab_Requerido']) else ""
-                
-                card = f"""
-                <div class='aula-card {classe_css}'>
-                    {badge_html}
-                    <span class='materia'>{row['Nome']}</span>
-                    <span class='prof'>{row['Professor']}</span>
-                    {lab_html}
-                </div>
-                """
-                mapa_aulas[key].append(card)
-            
-            # --- TABELA HTML ---
-            html += '<div class="table-responsive"><table class="table table-bordered mb-0">'
-            html += '<thead><tr><th>Horário</th>' + "".join([f"<th>{d}</th>" for d in ORDEM_DIAS]) + '</tr></thead><tbody>'
-            
-            slots_ver = [s for s in ORDEM_SLOTS if ('N' in s) == ('SIN' in curso)]
-            
-            for slot in slots_ver:
-                nome_vis = slot.replace('_', '<br>')
-                if slot == 'N3_N4_N5': nome_vis = "N3 - N5<br>(3h)"
-                
-                html += f"<tr><td class='slot-cell'>{nome_vis}</td>"
-                for d in ORDEM_DIAS:
-                    key = (slot, d)
-                    content = "".join(mapa_aulas.get(key, []))
-                    html += f"<td style='min-width: 140px; vertical-align: top;'>{content}</td>"
-                html += "</tr>"
-            
-            html += '</tbody></table></div>'
-            html += '</div>' # Fim Tab Pane Periodo
-            
-        html += '</div></div>' # Fim Layout Flex
-        html += '</div>' # Fim Tab Pane Curso
-
-    html += """
-    </div></div>
-    <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
-    </body>
-    </html>
-    """
-    
-    with open(ARQUIVO_SAIDA, "w", encoding="utf-8") as f: f.write(html)
-    print(f"Visualização salva em {ARQUIVO_SAIDA}")
+            yield f'\n<div class="tab-pane fade {"show active" if j == 0 else ""}" id="v-pills-{curso}-{p}" role="tabpanel">'
+            yield from tabela(turmas[(curso, p)])
+            yield '</div>' # Fim Tab Pane Periodo
+
+        yield '</div></div>' # Fim Layout Flex
+        yield '</div>' # Fim Tab Pane Curso
+    yield '\n</div>'
+
+
+def pagina(titulo, subtitulo, corpo):
+    yield CABECALHO.format(titulo=escape(titulo), subtitulo=escape(subtitulo), estilo=ESTILO)
+    yield from corpo
+    yield RODAPE
+
+
+#Página de índice com um link para cada página de visão registrada nas assinaturas, agrupadas por
+#divisão: as refeitas agora e as de outras divisões, de execuções anteriores, que continuam no disco.
+def indice(assinaturas):
+    por_divisao = defaultdict(list)
+    for caminho, registro in sorted(assinaturas.items()):
+        if os.path.dirname(caminho) == PASTA_VISOES and os.path.exists(caminho):
+            por_divisao[registro['divisao']].append((os.path.basename(caminho), registro))
+    yield '\n<div class="tab-content">'
+    for divisao in DIVISOES:
+        if not por_divisao[divisao]: continue
+        yield f'\n<h4 class="mt-3">{divisao.capitalize()}</h4>\n<ul>'
+        for arquivo, r in por_divisao[divisao]:
+            yield f"\n    <li><a href=\"{escape(arquivo)}\">{escape(r['titulo'])}</a> ({r['aulas']} aulas)</li>"
+        yield '\n</ul>'
+    yield '\n</div>'
+
+
+def nome_arquivo(*partes):
+    return re.sub(r'[^A-Za-z0-9_-]+', '_', '_'.join(str(p) for p in partes)) + ".html"
+
+
+#Lista as visões (uma página cada) de uma divisão: arquivo, título, aulas exibidas e o gerador do corpo.
+def montar_visoes(df, divisao):
+    visoes = []
+    def adicionar(arquivo, titulo, aulas, corpo):
+        visoes.append({'divisao': divisao, 'arquivo': arquivo, 'titulo': titulo, 'aulas': aulas, 'corpo': corpo})
+
+    if divisao == 'curso':
+        for curso, aulas in df.groupby('Curso', observed=True):
+            adicionar(nome_arquivo('curso', curso), f"Curso {curso}", aulas, lambda a=aulas: abas_turmas(a))
+    elif divisao == 'periodo':
+        for (curso, periodo), aulas in df.groupby(['Curso', 'Periodo'], observed=True):
+            adicionar(nome_arquivo('periodo', curso, periodo), f"{curso} - Período {periodo}", aulas,
+                      lambda a=aulas: tabela(a))
+    elif divisao == 'professor':
+        for prof, aulas in df.groupby('Professor', observed=True):
+            adicionar(nome_arquivo('professor', prof), f"Professor {prof}", aulas, lambda a=aulas: tabela(a, True))
+    elif divisao == 'lab':
+        for lab, aulas in df.dropna(subset=['Lab_Requerido']).groupby('Lab_Requerido', observed=True):
+            adicionar(nome_arquivo('lab', lab), f"Lab {lab}", aulas, lambda a=aulas: tabela(a, True))
+    elif divisao == 'sala':
+        for sala, aulas in df.dropna(subset=['Sala']).groupby('Sala', observed=True):
+            adicionar(nome_arquivo('sala', sala), f"Sala {sala}", aulas, lambda a=aulas: tabela(a, True))
+    return visoes
+
+
+def assinatura(titulo, aulas):
+    conteudo = aulas[COLUNAS_VISAO].sort_values('Aula').to_csv(index=False)
+    return hashlib.sha256(f"{VERSAO_MODELOS}|{titulo}|{conteudo}".encode()).hexdigest()
+
+
+#Grava a página pedaço a pedaço em um arquivo temporário e renomeia no final, para que uma
+#execução interrompida nunca deixe uma página pela metade.
+def gravar_pagina(caminho, pedacos):
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.writelines(pedacos)
+    os.replace(temporario, caminho)
+
+
+#Registro de cada página já gerada (caminho -> assinatura, divisão, título e número de aulas). Um
+#arquivo de uma versão anterior, só com as assinaturas, é ignorado, e as páginas são refeitas.
+def ler_assinaturas():
+    try:
+        with open(ARQUIVO_ASSINATURAS, encoding="utf-8") as f: assinaturas = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return assinaturas if all(isinstance(r, dict) for r in assinaturas.values()) else {}
+
+
+def gravar_assinaturas(assinaturas):
+    os.makedirs(os.path.dirname(ARQUIVO_ASSINATURAS), exist_ok=True)
+    gravar_pagina(ARQUIVO_ASSINATURAS, [json.dumps(assinaturas, indent=1, sort_keys=True)])
+
+
+#Gera a página, a menos que ela já exista com a mesma assinatura. Devolve True se a página foi gerada.
+#divisao: a divisão da página de visão, registrada com o título para o índice (None na página única).
+def renderizar(caminho, titulo, subtitulo, aulas, corpo, assinaturas, forcar, divisao=None):
+    registro = {'assinatura': assinatura(titulo, aulas), 'divisao': divisao, 'titulo': titulo, 'aulas': len(aulas)}
+    if not forcar and assinaturas.get(caminho) == registro and os.path.exists(caminho):
+        return False
+    gravar_pagina(caminho, pagina(titulo, subtitulo, corpo))
+    assinaturas[caminho] = registro
+    return True
+
+
+#divisoes: lista de DIVISOES; vazia gera a página única grade_visual.html com todas as turmas.
+#forcar: refaz todas as páginas, mesmo as que não mudaram desde a última execução.
+def gerar_visualizacao(divisoes=None, forcar=False):
+    if not os.path.exists(ARQUIVO_GRADE):
+        print("Arquivo grade_final.csv não encontrado!")
+        return
+    import pandas as pd
+    from catalogo import carregar_dados
+
+    # Catálogo lido pelo mesmo carregador do solucionador, já com as Trilhas das optativas
+    df_dados = carregar_dados(ARQUIVO_DADOS)
+    if df_dados is None: return
+    df_grade = pd.read_csv(ARQUIVO_GRADE)
+    if 'Sala' not in df_grade: df_grade['Sala'] = None # grade gerada sem cadastro de salas
+
+    # Merge
+    df = pd.merge(df_grade, df_dados, left_on='Aula', right_on='ID_Aula', how='left')
+
+    # Extrai slot e dia
+    partes = df['Horario'].str.split('_', n=1)
+    df['Dia'] = partes.str[0]
+    df['Slot'] = partes.str[1]
+
+    assinaturas = ler_assinaturas()
+
+    if not divisoes:
+        gerada = renderizar(ARQUIVO_SAIDA, "Grade Horária Otimizada", "Com Visualização de Trilhas", df,
+                            abas_turmas(df), assinaturas, forcar)
+        gravar_assinaturas(assinaturas)
+        print(f"Visualização {'salva' if gerada else 'sem mudanças'} em {ARQUIVO_SAIDA}")
+        return
+
+    os.makedirs(PASTA_VISOES, exist_ok=True)
+    visoes = [v for divisao in divisoes for v in montar_visoes(df, divisao)]
+    geradas = 0
+    for v in visoes:
+        caminho = os.path.join(PASTA_VISOES, v['arquivo'])
+        geradas += renderizar(caminho, v['titulo'], "Grade Horária Otimizada", v['aulas'], v['corpo'](),
+                              assinaturas, forcar, v['divisao'])
+
+    # Páginas de visões que deixaram de existir (um professor ou lab que saiu da grade) são apagadas. Só
+    # as das divisões refeitas agora: as páginas de outras divisões, de execuções anteriores, ficam.
+    atuais = {os.path.join(PASTA_VISOES, v['arquivo']) for v in visoes}
+    prefixos = tuple(f"{divisao}_" for divisao in divisoes) # nome_arquivo começa pela divisão
+    for caminho in [c for c in assinaturas if os.path.dirname(c) == PASTA_VISOES and c not in atuais
+                    and os.path.basename(c).startswith(prefixos)]:
+        if os.path.exists(caminho): os.remove(caminho)
+        del assinaturas[caminho]
+
+    gravar_pagina(os.path.join(PASTA_VISOES, "index.html"),
+                  pagina("Grade Horária Otimizada", "Índice das visões", indice(assinaturas)))
+    gravar_assinaturas(assinaturas)
+    print(f"{geradas} de {len(visoes)} página(s) gerada(s), {len(visoes) - geradas} sem mudanças. "
+          f"Índice em {os.path.join(PASTA_VISOES, 'index.html')}")
 
 if __name__ == "__main__":
-    gerar_visualizacao()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Visualização em HTML da grade gerada por main.py")
+    parser.add_argument('--dividir', nargs='+', choices=DIVISOES, default=[],
+                        help="gera uma página por curso, período (turma), professor, lab e/ou sala em "
+                             "visualizar/, com um índice, em vez da página única grade_visual.html")
+    parser.add_argument('--forcar', action='store_true',
+                        help="refaz todas as páginas, mesmo as que não mudaram desde a última execução")
+    args = parser.parse_args()
+    gerar_visualizacao(args.dividir, args.forcar)